@@ -0,0 +1,65 @@
+"""
+Real-time ingestion endpoints.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import List, Union
+
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+
+from app.dependencies import CursorStoreDep, DatasetDep, DatasetsDep, DefaultRecommenderDep, EventLogDep
+from ..models.schemas import RatingEventAck, RatingEventPayload
+from ..services.events import RatingEvent, RatingEventLog
+from ..services.recommender import RecommenderService
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+@router.post("/rating", response_model=RatingEventAck, status_code=202, summary="Ingest a user rating")
+async def ingest_rating(
+    payload: Union[RatingEventPayload, List[RatingEventPayload]],
+    recommender: DefaultRecommenderDep,
+    event_log: EventLogDep,
+    cursors: CursorStoreDep,
+    datasets: DatasetsDep,
+    dataset: DatasetDep,
+) -> RatingEventAck:
+    """
+    Append ratings to the event log and apply them to the users' in-memory histories.
+
+    The body is one rating or a list of them; batching amortizes the HTTP
+    overhead for high-rate producers. Later recommendations reflect the
+    ratings immediately, and stored result pages ranked from the old
+    histories are dropped. Ratings apply to the default dataset, whose
+    build the event log feeds, so naming any other ``dataset`` is rejected.
+    Process executor workers receive the user's new ratings along with each
+    of their scoring calls.
+    """
+
+    if dataset != datasets.default:
+        raise HTTPException(status_code=400, detail="Rating events apply to the default dataset only.")
+
+    received = int(time.time())
+    payloads = payload if isinstance(payload, list) else [payload]
+    events = [
+        RatingEvent(
+            user_id=item.user_id,
+            movie_id=item.movie_id,
+            rating=item.rating,
+            timestamp=item.timestamp if item.timestamp is not None else received,
+        )
+        for item in payloads
+    ]
+    # Log writes block, so they run on the thread pool; the cursor store stays on the event loop.
+    await run_in_threadpool(_record, events, event_log, recommender)
+    invalidated = sum(cursors.invalidate_user(event.user_id) for event in events)
+    return RatingEventAck(accepted=len(events), invalidated=invalidated)
+
+
+def _record(events: List[RatingEvent], event_log: RatingEventLog, recommender: RecommenderService) -> None:
+    for event in events:
+        event_log.append(event)
+        recommender.record_rating(event)
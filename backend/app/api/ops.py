@@ -0,0 +1,46 @@
+"""
+Operational endpoints (metrics, health) for the recommendation service.
+"""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from ..core.metrics import metrics
+
+router = APIRouter(tags=["ops"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def prometheus_metrics() -> PlainTextResponse:
+    """Expose in-process counters and histograms in Prometheus text format."""
+
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/health", summary="Liveness probe")
+async def health() -> JSONResponse:
+    """Answer as soon as the process serves HTTP."""
+
+    return JSONResponse({"status": "ok"})
+
+
+@router.get("/health/ready", summary="Readiness probe")
+async def health_ready(request: Request) -> JSONResponse:
+    """Return 200 once artifacts are loaded and warm-up finished, 503 before."""
+
+    state = request.app.state
+    if not getattr(state, "ready", False) or getattr(state, "recommender", None) is None:
+        return JSONResponse({"status": "warming_up"}, status_code=503)
+    return JSONResponse({"status": "ready", "warmup": getattr(state, "warmup", None)})
+
+
+@router.get("/datasets", summary="Configured artifact sets and their memory use")
+async def datasets(request: Request) -> JSONResponse:
+    """List dataset names with the bytes each loaded set holds (0 when not loaded)."""
+
+    manager = request.app.state.datasets
+    return JSONResponse(
+        {"default": manager.default, "budget_bytes": manager.budget_bytes, "datasets": manager.sizes()}
+    )
@@ -4,17 +4,90 @@ HTTP route definitions for the recommendation service.
 
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+from typing import Any, Optional
 
-from app.dependencies import RecommenderDep
-from ..models.schemas import (
-    RecommendationPayload,
-    RecommendationResponse,
-    RecommendationsEnvelope,
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from app.dependencies import (
+    CursorStoreDep,
+    DatasetDep,
+    ExecutorDep,
+    FiltersDep,
+    SingleFlightDep,
+    get_dataset_recommender,
 )
+from ..core.metrics import stage
+from ..models.schemas import RecommendationPayload, RecommendationsEnvelope, SessionPayload
+from ..services.executor import ScoringExecutor
+from ..services.pagination import CursorStore, InvalidCursor
+from ..services.recommender import DEFAULT_HYBRID_WEIGHTS
+from ..services.singleflight import SingleFlight
+from ..utils.serialization import ResultsLike, as_batch, envelope_response
 
 router = APIRouter(prefix="/recommend", tags=["recommendations"])
 
+# Recommender keyword arguments only passed on when set.
+OPTIONAL_PARAMS = ("filters", "diversity")
+
+
+async def _dispatch(
+    recommender: Any,
+    executor: ScoringExecutor,
+    flights: SingleFlight,
+    method: str,
+    **params: Any,
+) -> Any:
+    """
+    Run a recommender method off the event loop, sharing identical in-flight calls.
+
+    ``params`` must already be normalized and hashable; together with the
+    method name and the loaded artifact version they form the coalescing key.
+    Empty ``filters`` and zero ``diversity`` arguments are dropped, so plain
+    requests keep the plain method signature.
+    """
+
+    for name in OPTIONAL_PARAMS:
+        if name in params and not params[name]:
+            del params[name]
+    key = (method, getattr(recommender, "version", None), tuple(sorted(params.items())))
+    return await flights.do(key, lambda: executor.run(recommender, method, **params))
+
+
+def _depth(cursors: CursorStore, k: int, diversity: float) -> int:
+    """
+    Candidates to rank for a first page.
+
+    Plain lists are ranked a few pages deep so later pages are slices. MMR
+    picks one item at a time, so a diversified list is only re-ranked as far
+    as the requested page and comes without a cursor.
+    """
+
+    return k if diversity > 0 else cursors.ranking_depth(k)
+
+
+def _first_page(
+    cursors: CursorStore, user_id: Optional[int], algorithm: str, results: ResultsLike, k: int, dataset: str
+) -> Response:
+    """Serialize the first ``k`` ranked candidates, keeping the rest behind a cursor."""
+
+    with stage(algorithm, "serialization"):
+        page, next_cursor = cursors.first_page(algorithm, user_id, as_batch(results), k, dataset)
+        return envelope_response(user_id, algorithm, page, next_cursor)
+
+
+def _next_page(cursors: CursorStore, cursor: str, algorithm: str, k: int, dataset: str) -> Response:
+    """Serve a later page by slicing the stored candidates; nothing is rescored or loaded."""
+
+    try:
+        page = cursors.next_page(cursor, algorithm, k, dataset)
+    except InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if page is None:
+        raise HTTPException(status_code=410, detail="Cursor expired; request the first page again.")
+    user_id, batch, next_cursor = page
+    with stage(algorithm, "serialization"):
+        return envelope_response(user_id, algorithm, batch, next_cursor)
+
 
 @router.get(
     "/popular",
@@ -22,18 +95,33 @@ router = APIRouter(prefix="/recommend", tags=["recommendations"])
     summary="Retrieve globally popular movies",
 )
 async def recommend_popular(
-    recommender: RecommenderDep,
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
     user_id: int | None = Query(None, description="User identifier for logging."),
     k: int = Query(10, ge=1, le=200),
-) -> RecommendationsEnvelope:
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+) -> Response:
     """Return the top-k popular movies computed offline."""
 
-    results = recommender.recommend_popular(user_id=user_id, k=k)
-    return RecommendationsEnvelope(
+    if cursor is not None:
+        return _next_page(cursors, cursor, "popular", k, dataset)
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_popular",
         user_id=user_id,
-        algorithm="popular",
-        items=[RecommendationResponse(**item) for item in results],
+        k=_depth(cursors, k, diversity),
+        filters=filters,
+        diversity=diversity,
     )
+    return _first_page(cursors, user_id, "popular", results, k, dataset)
 
 
 @router.get(
@@ -42,20 +130,159 @@ async def recommend_popular(
     summary="Retrieve personalized item-based collaborative filtering results",
 )
 async def recommend_item_cf(
-    recommender: RecommenderDep,
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
     user_id: int = Query(..., ge=1),
     k: int = Query(10, ge=1, le=200),
-) -> RecommendationsEnvelope:
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+) -> Response:
     """Return personalized recommendations using item-based CF."""
 
-    results = recommender.recommend_item_cf(user_id=user_id, k=k)
+    if cursor is not None:
+        return _next_page(cursors, cursor, "item_cf", k, dataset)
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_item_cf",
+        user_id=user_id,
+        k=_depth(cursors, k, diversity),
+        filters=filters,
+        diversity=diversity,
+    )
     if not results:
         raise HTTPException(status_code=404, detail=f"No history found for user {user_id}.")
-    return RecommendationsEnvelope(
+    return _first_page(cursors, user_id, "item_cf", results, k, dataset)
+
+
+@router.get(
+    "/als",
+    response_model=RecommendationsEnvelope,
+    summary="Retrieve personalized matrix-factorization results",
+)
+async def recommend_als(
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
+    user_id: int = Query(..., ge=1),
+    k: int = Query(10, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+) -> Response:
+    """Return personalized recommendations from the implicit ALS factors."""
+
+    if cursor is not None:
+        return _next_page(cursors, cursor, "als", k, dataset)
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_als",
         user_id=user_id,
-        algorithm="item_cf",
-        items=[RecommendationResponse(**item) for item in results],
+        k=_depth(cursors, k, diversity),
+        filters=filters,
+        diversity=diversity,
     )
+    if not results:
+        raise HTTPException(status_code=404, detail=f"No ALS factors found for user {user_id}.")
+    return _first_page(cursors, user_id, "als", results, k, dataset)
+
+
+@router.get(
+    "/hybrid",
+    response_model=RecommendationsEnvelope,
+    summary="Retrieve a weighted blend of popularity, item-CF and content scores",
+)
+async def recommend_hybrid(
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
+    user_id: int = Query(..., ge=1),
+    k: int = Query(10, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+    popularity_weight: float = Query(DEFAULT_HYBRID_WEIGHTS[0], ge=0),
+    item_cf_weight: float = Query(DEFAULT_HYBRID_WEIGHTS[1], ge=0),
+    content_weight: float = Query(DEFAULT_HYBRID_WEIGHTS[2], ge=0),
+) -> Response:
+    """Return personalized recommendations blending the three models' normalized scores."""
+
+    if cursor is not None:
+        return _next_page(cursors, cursor, "hybrid", k, dataset)
+    weights = (popularity_weight, item_cf_weight, content_weight)
+    if not sum(weights) > 0:
+        raise HTTPException(status_code=422, detail="At least one hybrid weight must be positive.")
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_hybrid",
+        user_id=user_id,
+        k=_depth(cursors, k, diversity),
+        weights=weights,
+        filters=filters,
+        diversity=diversity,
+    )
+    if not results:
+        raise HTTPException(status_code=404, detail=f"No history found for user {user_id}.")
+    return _first_page(cursors, user_id, "hybrid", results, k, dataset)
+
+
+@router.post(
+    "/session",
+    response_model=RecommendationsEnvelope,
+    summary="Recommend for an anonymous visitor from recently viewed movies",
+)
+async def recommend_session(
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
+    payload: SessionPayload,
+    k: int = Query(10, ge=1, le=200),
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+) -> Response:
+    """Return item-CF recommendations for posted movie ids, without an offline profile."""
+
+    if cursor is not None:
+        return _next_page(cursors, cursor, "session", k, dataset)
+    timestamps = None
+    if payload.timestamps is not None:
+        if len(payload.timestamps) != len(payload.movie_ids):
+            raise HTTPException(status_code=422, detail="timestamps must have one entry per movie id.")
+        timestamps = tuple(payload.timestamps)
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_session",
+        movie_ids=tuple(payload.movie_ids),
+        timestamps=timestamps,
+        k=_depth(cursors, k, diversity),
+        filters=filters,
+        diversity=diversity,
+    )
+    if not results:
+        raise HTTPException(status_code=404, detail="None of the posted movies are known to the model.")
+    return _first_page(cursors, None, "session", results, k, dataset)
 
 
 @router.post(
@@ -64,17 +291,33 @@ async def recommend_item_cf(
     summary="Recommend similar movies based on input titles",
 )
 async def recommend_by_titles(
-    recommender: RecommenderDep,
+    request: Request,
+    dataset: DatasetDep,
+    executor: ExecutorDep,
+    flights: SingleFlightDep,
+    filters: FiltersDep,
+    cursors: CursorStoreDep,
     payload: RecommendationPayload,
     k: int = Query(10, ge=1, le=200),
-) -> RecommendationsEnvelope:
+    cursor: str | None = Query(None, description="next_cursor of the previous page."),
+    diversity: float = Query(0.0, ge=0.0, le=1.0, description="MMR trade-off; 0 keeps the relevance order."),
+) -> Response:
     """Return content-based similar movies based on submitted titles."""
 
-    results = recommender.recommend_by_titles(payload.titles, k=k)
+    if cursor is not None:
+        return _next_page(cursors, cursor, "content", k, dataset)
+    titles = tuple(" ".join(title.split()) for title in payload.titles)
+    recommender = await get_dataset_recommender(request, dataset)
+    results = await _dispatch(
+        recommender,
+        executor,
+        flights,
+        "recommend_by_titles",
+        titles=titles,
+        k=_depth(cursors, k, diversity),
+        filters=filters,
+        diversity=diversity,
+    )
     if not results:
         raise HTTPException(status_code=404, detail="No matching titles found.")
-    return RecommendationsEnvelope(
-        user_id=None,
-        algorithm="content",
-        items=[RecommendationResponse(**item) for item in results],
-    )
+    return _first_page(cursors, None, "content", results, k, dataset)
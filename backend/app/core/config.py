@@ -7,6 +7,7 @@ from __future__ import annotations
 import os
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Literal
 
 from pydantic_settings import BaseSettings
 
@@ -17,16 +18,51 @@ class Settings(BaseSettings):
     artifact_dir: Path = Path(os.getenv("ARTIFACT_DIR", "./data/artifacts/ml-1m")).resolve()
     popularity_path: Path = Path(os.getenv("POPULARITY_PATH", artifact_dir / "pop_score.parquet")).resolve()
     item_neighbors_path: Path = Path(os.getenv("ITEM_NEIGHBORS_PATH", artifact_dir / "item_neighbors.npz")).resolve()
-    item_index_path: Path = Path(os.getenv("ITEM_INDEX_PATH", artifact_dir / "item_index.json")).resolve()
+    item_index_path: Path = Path(os.getenv("ITEM_INDEX_PATH", artifact_dir / "item_index.npy")).resolve()
     content_neighbors_path: Path = Path(os.getenv("CONTENT_NEIGHBORS_PATH", artifact_dir / "content_neighbors.npz")).resolve()
-    content_index_path: Path = Path(os.getenv("CONTENT_INDEX_PATH", artifact_dir / "content_index.json")).resolve()
+    content_index_path: Path = Path(os.getenv("CONTENT_INDEX_PATH", artifact_dir / "content_index.npy")).resolve()
     user_history_path: Path = Path(os.getenv("USER_HISTORY_PATH", artifact_dir / "user_history.parquet")).resolve()
     movie_meta_path: Path = Path(os.getenv("MOVIE_META_PATH", artifact_dir / "movie_meta.parquet")).resolve()
+    als_user_factors_path: Path = Path(os.getenv("ALS_USER_FACTORS_PATH", artifact_dir / "als_user_factors.npy")).resolve()
+    als_item_factors_path: Path = Path(os.getenv("ALS_ITEM_FACTORS_PATH", artifact_dir / "als_item_factors.npy")).resolve()
+    als_user_index_path: Path = Path(os.getenv("ALS_USER_INDEX_PATH", artifact_dir / "als_user_index.npy")).resolve()
+    als_item_index_path: Path = Path(os.getenv("ALS_ITEM_INDEX_PATH", artifact_dir / "als_item_index.npy")).resolve()
+    events_log_path: Path = Path(os.getenv("EVENTS_LOG_PATH", artifact_dir / "rating_events.csv")).resolve()
+    liked_rating_threshold: float = 4.0
+    overlay_max_users: int = 100_000
+    lazy_artifacts: bool = False
+    executor_kind: Literal["thread", "process"] = "thread"
+    executor_workers: int = 4
+    executor_queue_size: int = 64
+    request_timeout_seconds: float = 10.0
+    retry_after_seconds: int = 1
+    cursor_depth: int = 200
+    # First pages rank this many times k (at most cursor_depth) to keep for later pages.
+    cursor_overfetch: int = 5
+    cursor_ttl_seconds: float = 300.0
+    cursor_max_entries: int = 1024
+    warmup_enabled: bool = True
+    warmup_hot_users: int = 200
+    warmup_titles: int = 50
+    # Extra named artifact sets, e.g. RECSYS_DATASETS='{"ml-32m": "/data/artifacts/ml-32m"}'.
+    datasets: Dict[str, Path] = {}
+    default_dataset: str = "default"
+    dataset_memory_budget_mb: float = 0.0
 
     class Config:
         env_prefix = "RECSYS_"
         case_sensitive = False
 
+    def for_artifact_dir(self, artifact_dir: Path) -> "Settings":
+        """Copy of these settings with every path inside ``artifact_dir`` moved to another directory."""
+
+        artifact_dir = Path(artifact_dir).resolve()
+        update: Dict[str, object] = {"artifact_dir": artifact_dir}
+        for name, value in self:
+            if name.endswith("_path") and isinstance(value, Path) and value.is_relative_to(self.artifact_dir):
+                update[name] = artifact_dir / value.relative_to(self.artifact_dir)
+        return self.model_copy(update=update)
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -4,11 +4,18 @@ Shared FastAPI dependencies for the recommender service.
 
 from __future__ import annotations
 
-from typing import Annotated
+from typing import Annotated, List, Optional
 
-from fastapi import Depends, Request
+from fastapi import Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 
+from .services.datasets import DatasetManager, UnknownDataset
+from .services.events import RatingEventLog
+from .services.executor import ScoringExecutor
+from .services.filters import ItemFilter
+from .services.pagination import CursorStore
 from .services.recommender import RecommenderService
+from .services.singleflight import SingleFlight
 
 
 def get_recommender(request: Request) -> RecommenderService:
@@ -22,5 +29,136 @@ def get_recommender(request: Request) -> RecommenderService:
     return recommender
 
 
-RecommenderDep = Annotated[RecommenderService, Depends(get_recommender)]
+DefaultRecommenderDep = Annotated[RecommenderService, Depends(get_recommender)]
 
+
+def get_datasets(request: Request) -> DatasetManager:
+    """
+    Retrieve the manager of named artifact sets.
+    """
+
+    datasets: DatasetManager | None = getattr(request.app.state, "datasets", None)
+    if datasets is None:
+        raise RuntimeError("DatasetManager has not been initialized.")
+    return datasets
+
+
+DatasetsDep = Annotated[DatasetManager, Depends(get_datasets)]
+
+
+def get_dataset(
+    request: Request,
+    dataset: Optional[str] = Query(None, description="Named artifact set; the default one when omitted."),
+) -> str:
+    """
+    Resolve the requested dataset name without loading it; unknown names are 404.
+    """
+
+    try:
+        return get_datasets(request).resolve(dataset)
+    except UnknownDataset as exc:
+        raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+DatasetDep = Annotated[str, Depends(get_dataset)]
+
+
+async def get_dataset_recommender(request: Request, dataset: str) -> RecommenderService:
+    """
+    Retrieve the RecommenderService for a resolved dataset name, loading it on first use.
+
+    Routes call this only once they need to score, so cursor pages never
+    load a dataset. The default and already loaded sets are returned on the
+    event loop; only an actual load is handed to the thread pool, so it does
+    not block other requests.
+    """
+
+    datasets = get_datasets(request)
+    if dataset == datasets.default:
+        return get_recommender(request)
+    recommender = datasets.loaded(dataset)
+    if recommender is None:
+        recommender = await run_in_threadpool(datasets.get, dataset)
+    return recommender
+
+
+def get_executor(request: Request) -> ScoringExecutor:
+    """
+    Retrieve the scoring executor that runs recommender calls off the event loop.
+    """
+
+    executor: ScoringExecutor | None = getattr(request.app.state, "executor", None)
+    if executor is None:
+        raise RuntimeError("ScoringExecutor has not been initialized.")
+    return executor
+
+
+ExecutorDep = Annotated[ScoringExecutor, Depends(get_executor)]
+
+
+def get_single_flight(request: Request) -> SingleFlight:
+    """
+    Retrieve the coalescer shared by all recommendation routes.
+    """
+
+    flights: SingleFlight | None = getattr(request.app.state, "single_flight", None)
+    if flights is None:
+        raise RuntimeError("SingleFlight has not been initialized.")
+    return flights
+
+
+SingleFlightDep = Annotated[SingleFlight, Depends(get_single_flight)]
+
+
+def get_cursor_store(request: Request) -> CursorStore:
+    """
+    Retrieve the store of ranked candidate lists that backs cursor pagination.
+    """
+
+    cursors: CursorStore | None = getattr(request.app.state, "cursors", None)
+    if cursors is None:
+        raise RuntimeError("CursorStore has not been initialized.")
+    return cursors
+
+
+CursorStoreDep = Annotated[CursorStore, Depends(get_cursor_store)]
+
+
+def get_event_log(request: Request) -> RatingEventLog:
+    """
+    Retrieve the append-only log that records ingested ratings.
+    """
+
+    event_log: RatingEventLog | None = getattr(request.app.state, "event_log", None)
+    if event_log is None:
+        raise RuntimeError("RatingEventLog has not been initialized.")
+    return event_log
+
+
+EventLogDep = Annotated[RatingEventLog, Depends(get_event_log)]
+
+
+def get_filters(
+    genre: Optional[List[str]] = Query(None, description="Keep titles having any of these genres."),
+    year_min: Optional[int] = Query(None, description="Earliest release year (inclusive)."),
+    year_max: Optional[int] = Query(None, description="Latest release year (inclusive)."),
+    exclude: Optional[List[int]] = Query(None, description="Movie ids that must not be returned."),
+) -> ItemFilter:
+    """
+    Normalize the optional filter query parameters shared by all recommendation routes.
+
+    Genres are casefolded and ids deduplicated and sorted, so equivalent
+    requests produce equal (and equally coalesced) filters.
+    """
+
+    if year_min is not None and year_max is not None and year_min > year_max:
+        raise HTTPException(status_code=422, detail="year_min must not exceed year_max.")
+    return ItemFilter(
+        genres=tuple(sorted({value.strip().casefold() for value in genre or () if value.strip()})),
+        year_min=year_min,
+        year_max=year_max,
+        exclude=tuple(sorted(set(exclude or ()))),
+    )
+
+
+FiltersDep = Annotated[ItemFilter, Depends(get_filters)]
@@ -4,29 +4,135 @@ FastAPI application that exposes recommendation endpoints.
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from concurrent.futures import Future
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 
+from .api.events import router as events_router
+from .api.ops import router as ops_router
 from .api.routes import router
 from .core.config import settings
+from .core.metrics import ARTIFACT_BYTES, ARTIFACT_LOAD_SECONDS, DATASET_BYTES, REQUEST_LATENCY, metrics
+from .services.datasets import DatasetManager
+from .services.events import RatingEventLog
+from .services.executor import ScoringExecutor, ScoringTimeout, ServiceOverloaded
+from .services.pagination import CursorStore
 from .services.recommender import RecommenderService
+from .services.singleflight import SingleFlight
+from .services.warmup import warm_up
 
 logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="MovieLens Recommender",
-    description="Unified API for popularity, item-based CF, and content similarity recommendations.",
+    description="Unified API for popularity, item-based CF, ALS, and content similarity recommendations.",
     version="0.1.0",
 )
+app.state.recommender = None
+app.state.ready = False
+app.state.warmup = None
+app.state.executor = ScoringExecutor.from_settings(settings)
+app.state.single_flight = SingleFlight()
+app.state.cursors = CursorStore.from_settings(settings)
+app.state.event_log = RatingEventLog(settings.events_log_path)
+app.state.datasets = DatasetManager.from_settings(settings)
+
+SCORING_IN_FLIGHT = metrics.gauge(
+    "recsys_scoring_in_flight", "Scoring calls currently running or queued."
+)
+
+
+def _collect_state_metrics() -> None:
+    """Refresh gauges that mirror application state right before a scrape."""
+
+    SCORING_IN_FLIGHT.set(getattr(app.state.executor, "in_flight", 0))
+    artifacts = getattr(app.state.recommender, "artifacts", None)
+    if artifacts is not None:
+        for family, size in artifacts.sizes().items():
+            ARTIFACT_BYTES.set(size, artifact=family)
+        for family, seconds in artifacts.timings.items():
+            ARTIFACT_LOAD_SECONDS.set(seconds, artifact=family)
+    for dataset, size in app.state.datasets.sizes().items():
+        DATASET_BYTES.set(size, dataset=dataset)
+
+
+metrics.add_collector(_collect_state_metrics)
+
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """Observe end-to-end latency per route template and status code."""
+
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            endpoint=getattr(route, "path", "unmatched"),
+            method=request.method,
+            status=status,
+        )
+
+
+@app.exception_handler(ServiceOverloaded)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloaded) -> JSONResponse:
+    """Shed load with a retryable 503 once the scoring queue is full."""
+
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.exception_handler(ScoringTimeout)
+async def scoring_timeout_handler(request: Request, exc: ScoringTimeout) -> JSONResponse:
+    """Report scoring calls that exceeded the per-request timeout."""
+
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
 
 
 @app.on_event("startup")
 async def startup_event() -> None:
-    """Load artifacts into memory when the server starts."""
+    """
+    Load artifacts into memory when the server starts, then warm up in the background.
+
+    ``/health/ready`` reports not-ready until the warm-up has finished, so a
+    load balancer holds traffic while ``/health`` already answers. Other
+    configured datasets are loaded on their first request.
+    """
 
     logger.info("Loading artifacts from %s", settings.artifact_dir)
+    app.state.ready = False
     app.state.recommender = RecommenderService.from_settings(settings)
+    app.state.datasets.attach(settings.default_dataset, app.state.recommender)
+    if not settings.warmup_enabled:
+        app.state.ready = True
+        return
+    warmup = asyncio.get_running_loop().run_in_executor(None, warm_up, app.state.recommender, settings)
+    warmup.add_done_callback(_finish_warmup)
+
+
+def _finish_warmup(future: "asyncio.Future | Future") -> None:
+    """Mark the app ready; a failed warm-up only costs a cold start, so it is logged, not fatal."""
+
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error("Warm-up failed; serving cold", exc_info=error)
+    else:
+        app.state.warmup = future.result().as_dict()
+    app.state.ready = True
 
 
 @app.on_event("shutdown")
@@ -36,6 +142,13 @@ async def shutdown_event() -> None:
     recommender: RecommenderService | None = getattr(app.state, "recommender", None)
     if recommender:
         recommender.close()
+    app.state.datasets.close()
+    app.state.executor.shutdown()
+    app.state.event_log.close()
+    flights: SingleFlight = app.state.single_flight
+    logger.info("Served %d computations, coalesced %d duplicate requests", flights.leaders, flights.coalesced)
 
 
 app.include_router(router)
+app.include_router(events_router)
+app.include_router(ops_router)
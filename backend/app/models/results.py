@@ -0,0 +1,88 @@
+"""
+Columnar result containers produced by the service layer.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class RecommendationBatch:
+    """
+    Recommendation results stored column by column.
+
+    Keeping ids and scores as NumPy arrays lets the service slice and rank
+    without materializing one object per item; the API layer serializes the
+    columns straight to JSON bytes.
+    """
+
+    movie_ids: np.ndarray
+    scores: np.ndarray
+    titles: List[str]
+    genres: List[List[str]]
+    reasons: List[Optional[str]]
+    source: str
+
+    def __len__(self) -> int:
+        return int(self.movie_ids.size)
+
+    @classmethod
+    def empty(cls, source: str) -> "RecommendationBatch":
+        return cls(
+            movie_ids=np.empty(0, dtype=np.int64),
+            scores=np.empty(0, dtype=np.float64),
+            titles=[],
+            genres=[],
+            reasons=[],
+            source=source,
+        )
+
+    @classmethod
+    def from_records(cls, records: Sequence[Mapping[str, object]]) -> "RecommendationBatch":
+        """Build a batch from row-oriented dictionaries."""
+
+        return cls(
+            movie_ids=np.array([record["movie_id"] for record in records], dtype=np.int64),
+            scores=np.array([record["score"] for record in records], dtype=np.float64),
+            titles=[record["title"] for record in records],
+            genres=[list(record.get("genres") or []) for record in records],
+            reasons=[record.get("reason") for record in records],
+            source=str(records[0]["source"]) if records else "",
+        )
+
+    def slice(self, start: int, stop: int) -> "RecommendationBatch":
+        """Return the items ranked in ``[start, stop)``."""
+
+        return RecommendationBatch(
+            movie_ids=self.movie_ids[start:stop],
+            scores=self.scores[start:stop],
+            titles=self.titles[start:stop],
+            genres=self.genres[start:stop],
+            reasons=self.reasons[start:stop],
+            source=self.source,
+        )
+
+    def to_records(self) -> List[Dict[str, object]]:
+        """Return row-oriented dictionaries matching ``RecommendationResponse``."""
+
+        return [
+            {
+                "movie_id": movie_id,
+                "title": title,
+                "genres": genres,
+                "score": score,
+                "source": self.source,
+                "reason": reason,
+            }
+            for movie_id, title, genres, score, reason in zip(
+                self.movie_ids.tolist(),
+                self.titles,
+                self.genres,
+                self.scores.tolist(),
+                self.reasons,
+            )
+        ]
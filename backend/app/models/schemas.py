@@ -26,6 +26,7 @@ class RecommendationsEnvelope(BaseModel):
     user_id: Optional[int]
     algorithm: str
     items: List[RecommendationResponse]
+    next_cursor: Optional[str] = Field(None, description="Opaque token for the next page, if any.")
 
 
 class RecommendationPayload(BaseModel):
@@ -33,3 +34,28 @@ class RecommendationPayload(BaseModel):
 
     titles: List[str] = Field(..., min_items=1, description="Seed movie titles to base recommendations on.")
 
+
+class RatingEventPayload(BaseModel):
+    """A rating submitted for real-time ingestion."""
+
+    user_id: int = Field(..., ge=1)
+    movie_id: int = Field(..., ge=1)
+    rating: float = Field(..., ge=0.5, le=5.0)
+    timestamp: Optional[int] = Field(None, description="Unix seconds; defaults to the time of receipt.")
+
+
+class RatingEventAck(BaseModel):
+    """Acknowledgement of ingested ratings."""
+
+    accepted: int
+    invalidated: int = Field(..., description="Stored result pages dropped for the rating users.")
+
+
+class SessionPayload(BaseModel):
+    """Request payload for recommending from an anonymous session."""
+
+    movie_ids: List[int] = Field(..., min_items=1, description="Recently viewed or liked movie ids.")
+    timestamps: Optional[List[float]] = Field(
+        None, description="Unix seconds per movie id; recent items weigh more when given."
+    )
+
@@ -0,0 +1,183 @@
+"""
+Named artifact sets served side by side under a shared memory budget.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from ..core.config import Settings
+from ..core.metrics import DATASET_EVICTIONS, record_cache
+from .recommender import RecommenderService
+
+logger = logging.getLogger(__name__)
+
+
+class UnknownDataset(KeyError):
+    """Raised for a dataset name that is not configured."""
+
+    def __str__(self) -> str:
+        return str(self.args[0])
+
+
+def footprint(service: RecommenderService) -> int:
+    """Approximate bytes held by the artifact families a service has loaded."""
+
+    return sum(service.artifacts.sizes().values())
+
+
+@dataclass
+class _Slot:
+    service: Optional[RecommenderService] = None
+    # Last measured footprint; kept after eviction to make room before a reload.
+    nbytes: int = 0
+    pinned: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class DatasetManager:
+    """
+    Load named artifact sets on first use and evict the least recently used ones.
+
+    Each dataset is a full :class:`RecommenderService` built from its own
+    settings. After a set is loaded, unpinned sets are dropped oldest-use
+    first until everything loaded fits ``budget_bytes`` (0 disables the
+    budget). The footprint a set had last time is freed before it is loaded
+    again, so reloads stay within the budget too. A set larger than the
+    whole budget is still served on its own. Requests already holding an
+    evicted service finish normally; its memory goes once they let go.
+    """
+
+    def __init__(
+        self,
+        settings: Mapping[str, Settings],
+        default: str,
+        budget_bytes: int = 0,
+        loader: Callable[[Settings], RecommenderService] = RecommenderService.from_settings,
+    ) -> None:
+        if default not in settings:
+            raise ValueError(f"Default dataset {default!r} has no settings.")
+        self.default = default
+        self.budget_bytes = budget_bytes
+        self._settings = dict(settings)
+        self._loader = loader
+        self._slots = {name: _Slot() for name in self._settings}
+        # Loaded dataset names, least recently used first.
+        self._recent: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "DatasetManager":
+        named = {name: settings.for_artifact_dir(path) for name, path in settings.datasets.items()}
+        named[settings.default_dataset] = settings
+        budget = int(settings.dataset_memory_budget_mb * 1024**2)
+        return cls(named, default=settings.default_dataset, budget_bytes=budget)
+
+    @property
+    def names(self) -> Tuple[str, ...]:
+        return tuple(self._settings)
+
+    def resolve(self, name: Optional[str]) -> str:
+        """``name``, or the default dataset when it is ``None``; raises :class:`UnknownDataset`."""
+
+        if name is None:
+            return self.default
+        self._slot(name)
+        return name
+
+    def sizes(self) -> Dict[str, int]:
+        """Last measured bytes per dataset; 0 for sets that are not loaded."""
+
+        with self._lock:
+            return {name: slot.nbytes if slot.service else 0 for name, slot in self._slots.items()}
+
+    def attach(self, name: str, service: RecommenderService) -> None:
+        """Serve an already loaded service as ``name`` and pin it, so it is never evicted."""
+
+        slot = self._slot(name)
+        service.dataset = name
+        with self._lock:
+            slot.service, slot.nbytes, slot.pinned = service, footprint(service), True
+            self._recent[name] = None
+            self._recent.move_to_end(name)
+
+    def loaded(self, name: str) -> Optional[RecommenderService]:
+        """The service for ``name`` if it is in memory, marked as recently used; never loads."""
+
+        slot = self._slot(name)
+        with self._lock:
+            service = slot.service
+            if service is not None:
+                self._recent.move_to_end(name)
+        if service is not None:
+            record_cache("dataset", hit=True)
+        return service
+
+    def get(self, name: str) -> RecommenderService:
+        """Return the service for ``name``, loading it (and evicting others) on first use."""
+
+        service = self.loaded(name)
+        if service is not None:
+            return service
+        slot = self._slots[name]
+        with slot.lock:
+            service = slot.service
+            if service is not None:
+                return service
+            record_cache("dataset", hit=False)
+            with self._lock:
+                self._evict_for(slot.nbytes, keep=name)
+            logger.info("Loading dataset %s from %s", name, self._settings[name].artifact_dir)
+            service = self._loader(self._settings[name])
+            service.dataset = name
+            nbytes = footprint(service)
+            with self._lock:
+                slot.service, slot.nbytes = service, nbytes
+                self._recent[name] = None
+                self._evict_for(0, keep=name)
+        return service
+
+    def close(self) -> None:
+        """Close every set the manager loaded itself; attached services belong to their owner."""
+
+        with self._lock:
+            services = [slot.service for slot in self._slots.values() if slot.service and not slot.pinned]
+        for service in services:
+            service.close()
+
+    def _slot(self, name: str) -> _Slot:
+        try:
+            return self._slots[name]
+        except KeyError:
+            raise UnknownDataset(f"Unknown dataset {name!r}; configured: {', '.join(self.names)}.") from None
+
+    def _evict_for(self, incoming: int, keep: str) -> None:
+        """Drop least recently used sets until ``incoming`` more bytes fit; caller holds the lock."""
+
+        if self.budget_bytes <= 0:
+            return
+        # Lazily loaded sets grow after their first measurement.
+        for name in self._recent:
+            slot = self._slots[name]
+            slot.nbytes = footprint(slot.service)
+        total = incoming + sum(self._slots[name].nbytes for name in self._recent)
+        for name in list(self._recent):
+            if total <= self.budget_bytes:
+                break
+            slot = self._slots[name]
+            if name == keep or slot.pinned:
+                continue
+            total -= slot.nbytes
+            logger.info("Evicting dataset %s (%.1f MB) to stay within budget", name, slot.nbytes / 1024**2)
+            slot.service.close()
+            slot.service = None
+            del self._recent[name]
+            DATASET_EVICTIONS.inc(dataset=name)
+        if total > self.budget_bytes:
+            logger.warning(
+                "Datasets use %.1f MB, over the %.1f MB budget", total / 1024**2, self.budget_bytes / 1024**2
+            )
@@ -0,0 +1,129 @@
+"""
+Real-time rating ingestion: an append-only event log and an in-memory history overlay.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOG_COLUMNS = ("userId", "movieId", "rating", "timestamp")
+
+
+@dataclass(frozen=True)
+class RatingEvent:
+    """One rating submitted through the API."""
+
+    user_id: int
+    movie_id: int
+    rating: float
+    timestamp: int
+
+
+class RatingEventLog:
+    """
+    Append-only CSV log of rating events.
+
+    Columns match the MovieLens ratings table, so the offline pipeline can
+    read the log as an extra ratings source (``--events``). Each event is a
+    single buffered write flushed at the end of the line; no fsync is done.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._fp: Optional[IO[str]] = None
+        self.appended = 0
+
+    def append(self, event: RatingEvent) -> None:
+        line = f"{event.user_id},{event.movie_id},{event.rating:g},{event.timestamp}\n"
+        with self._lock:
+            if self._fp is None:
+                self._fp = self._open()
+            self._fp.write(line)
+            self.appended += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+    def _open(self) -> IO[str]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fp = self.path.open("a", encoding="utf-8", buffering=1)
+        if fp.tell() == 0:
+            fp.write(",".join(EVENT_LOG_COLUMNS) + "\n")
+        logger.info("Appending rating events to %s", self.path)
+        return fp
+
+
+class HistoryOverlay:
+    """
+    Per-user ratings received since the history artifact was built.
+
+    :meth:`merge` layers them over a user's offline liked and watched lists:
+    new titles are appended, and a re-rating moves a title in or out of the
+    liked list according to ``liked_threshold``. At most ``max_users`` users
+    are kept; beyond that the user who rated least recently is dropped and
+    served from the artifact again until the next build folds in the log.
+    """
+
+    def __init__(self, liked_threshold: float = 4.0, max_users: int = 100_000) -> None:
+        self.liked_threshold = liked_threshold
+        self.max_users = max_users
+        # Users in order of their latest rating, oldest first.
+        self._ratings: "OrderedDict[int, Dict[int, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ratings)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._ratings
+
+    def apply(self, event: RatingEvent) -> None:
+        with self._lock:
+            self._ratings.setdefault(event.user_id, {})[event.movie_id] = event.rating
+            self._touch(event.user_id)
+
+    def ratings(self, user_id: int) -> Dict[int, float]:
+        """A copy of the ratings received for ``user_id``, by movie id."""
+
+        with self._lock:
+            return dict(self._ratings.get(user_id, ()))
+
+    def replace(self, user_id: int, ratings: Mapping[int, float]) -> None:
+        """Set all of a user's ratings at once, e.g. to mirror another process's overlay."""
+
+        with self._lock:
+            self._ratings[user_id] = dict(ratings)
+            self._touch(user_id)
+
+    def merge(self, user_id: int, liked: List[int], watched: List[int]) -> Tuple[List[int], List[int]]:
+        """Return ``(liked, watched)`` with the user's newer ratings applied."""
+
+        ratings = self.ratings(user_id)
+        if not ratings:
+            return liked, watched
+        threshold = self.liked_threshold
+        known_watched = set(watched)
+        known_liked = set(liked)
+        watched = watched + [movie_id for movie_id in ratings if movie_id not in known_watched]
+        liked = [movie_id for movie_id in liked if ratings.get(movie_id, threshold) >= threshold] + [
+            movie_id for movie_id, rating in ratings.items() if rating >= threshold and movie_id not in known_liked
+        ]
+        return liked, watched
+
+    def _touch(self, user_id: int) -> None:
+        """Mark ``user_id`` as the latest to rate and drop the oldest users beyond the bound; lock held."""
+
+        self._ratings.move_to_end(user_id)
+        while len(self._ratings) > self.max_users:
+            self._ratings.popitem(last=False)
@@ -0,0 +1,170 @@
+"""
+Bounded executor that keeps CPU-bound scoring off the event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from ..core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+_worker_datasets: Any = None
+
+
+class ServiceOverloaded(RuntimeError):
+    """Raised when every worker is busy and the waiting queue is full."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Recommendation workers are saturated.")
+        self.retry_after = retry_after
+
+
+class ScoringTimeout(RuntimeError):
+    """Raised when a scoring call exceeds the per-request timeout."""
+
+
+def _init_worker(settings: Settings) -> None:
+    """Load private datasets inside each worker process, starting with the default one."""
+
+    from .datasets import DatasetManager
+
+    global _worker_datasets
+    _worker_datasets = DatasetManager.from_settings(settings)
+    _worker_datasets.get(settings.default_dataset)
+
+
+def _call_worker(
+    dataset: Optional[str], method: str, kwargs: Dict[str, Any], ratings: Optional[Dict[int, float]] = None
+) -> Any:
+    recommender = _worker_datasets.get(dataset or _worker_datasets.default)
+    if ratings:
+        recommender.sync_ratings(kwargs["user_id"], ratings)
+    return getattr(recommender, method)(**kwargs)
+
+
+def _overlay_ratings(recommender: Any, kwargs: Dict[str, Any]) -> Optional[Dict[int, float]]:
+    """Ratings the API process has ingested for the call's user, which workers do not see otherwise."""
+
+    overlay = getattr(recommender, "overlay", None)
+    user_id = kwargs.get("user_id")
+    if overlay is None or user_id is None:
+        return None
+    return overlay.ratings(user_id) or None
+
+
+class ScoringExecutor:
+    """
+    Dispatch recommender calls to a thread or process pool.
+
+    At most ``max_workers`` calls run at once and up to ``max_queue`` more may
+    wait; anything beyond that is rejected immediately with
+    :class:`ServiceOverloaded` instead of piling up behind slow requests.
+    Threads suit the NumPy/SciPy scoring paths, which release the GIL for most
+    of their work. Process workers each load their own copy of the artifacts
+    from ``settings`` and only take the dataset name from the service passed
+    to :meth:`run`, plus the ratings it has ingested for the call's user.
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        max_workers: int = 4,
+        max_queue: int = 64,
+        timeout: Optional[float] = 10.0,
+        retry_after: int = 1,
+        settings: Optional[Settings] = None,
+    ) -> None:
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        if kind == "process" and settings is None:
+            raise ValueError("Process executors need settings to load worker artifacts.")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self._settings = settings
+        self._pool: Optional[Executor] = None
+        self._pool_lock = threading.Lock()
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "ScoringExecutor":
+        return cls(
+            kind=settings.executor_kind,
+            max_workers=settings.executor_workers,
+            max_queue=settings.executor_queue_size,
+            timeout=settings.request_timeout_seconds,
+            retry_after=settings.retry_after_seconds,
+            settings=settings,
+        )
+
+    @property
+    def in_flight(self) -> int:
+        """Calls currently running or queued."""
+
+        return self._in_flight
+
+    def _get_pool(self) -> Executor:
+        with self._pool_lock:
+            if self._pool is None:
+                if self.kind == "thread":
+                    self._pool = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="recsys-scoring"
+                    )
+                else:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        initializer=_init_worker,
+                        initargs=(self._settings,),
+                    )
+                logger.info(
+                    "Started %s scoring pool (workers=%d, queue=%d)",
+                    self.kind,
+                    self.max_workers,
+                    self.max_queue,
+                )
+            return self._pool
+
+    def _release(self, _: Future) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    async def run(self, recommender: Any, method: str, **kwargs: Any) -> Any:
+        """Call ``recommender.<method>(**kwargs)`` on the pool and await the result."""
+
+        with self._in_flight_lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                raise ServiceOverloaded(self.retry_after)
+            self._in_flight += 1
+        try:
+            if self.kind == "thread":
+                future = self._get_pool().submit(getattr(recommender, method), **kwargs)
+            else:
+                dataset = getattr(recommender, "dataset", None)
+                ratings = _overlay_ratings(recommender, kwargs)
+                future = self._get_pool().submit(_call_worker, dataset, method, kwargs, ratings)
+        except BaseException:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+            raise
+        # The slot is released when the work really finishes, so timed-out
+        # calls that are still running keep counting against the limit.
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError as exc:
+            raise ScoringTimeout(f"{method} exceeded {self.timeout}s") from exc
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
@@ -0,0 +1,91 @@
+"""
+Request-time item filters applied as boolean masks before top-k selection.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from ..utils.artifacts import IdIndex, MovieCatalog
+
+
+@dataclass(frozen=True)
+class ItemFilter:
+    """
+    Normalized, hashable filter parameters of one request.
+
+    ``genres`` keeps items having any of the listed genres (casefolded);
+    ``year_min``/``year_max`` are inclusive; ``exclude`` lists movie ids.
+    """
+
+    genres: Tuple[str, ...] = ()
+    year_min: Optional[int] = None
+    year_max: Optional[int] = None
+    exclude: Tuple[int, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.genres or self.exclude) or self.year_min is not None or self.year_max is not None
+
+
+@dataclass(frozen=True)
+class FilterMasks:
+    """
+    Per-genre masks and release years aligned to one model's item positions.
+
+    Built once per artifact index, so applying a filter is a handful of
+    vectorized boolean operations over arrays the size of the catalog.
+    """
+
+    movie_ids: np.ndarray
+    genres: Dict[str, np.ndarray]
+    years: np.ndarray
+
+    @classmethod
+    def build(cls, movie_ids: np.ndarray, catalog: MovieCatalog) -> "FilterMasks":
+        """Align catalog metadata to ``movie_ids`` (in the model's own row order)."""
+
+        movie_ids = np.asarray(movie_ids, dtype=np.int64)
+        positions = catalog.index.lookup(movie_ids)
+        known = positions >= 0
+        years = np.full(movie_ids.size, np.nan)
+        years[known] = catalog.years[positions[known]]
+
+        masks: Dict[str, np.ndarray] = {}
+        for row, position in zip(np.flatnonzero(known).tolist(), positions[known].tolist()):
+            for genre in catalog.genres[position]:
+                mask = masks.get(genre.casefold())
+                if mask is None:
+                    mask = masks[genre.casefold()] = np.zeros(movie_ids.size, dtype=bool)
+                mask[row] = True
+        return cls(movie_ids=movie_ids, genres=masks, years=years)
+
+    def allowed(self, item_filter: Optional[ItemFilter]) -> Optional[np.ndarray]:
+        """Boolean mask of items passing ``item_filter``, or ``None`` when nothing is filtered."""
+
+        if not item_filter:
+            return None
+        allowed = np.ones(self.movie_ids.size, dtype=bool)
+        if item_filter.genres:
+            matching = np.zeros(self.movie_ids.size, dtype=bool)
+            for genre in item_filter.genres:
+                mask = self.genres.get(genre)
+                if mask is not None:
+                    matching |= mask
+            allowed &= matching
+        # Comparisons with NaN are False, so items without a year fail year bounds.
+        if item_filter.year_min is not None:
+            allowed &= self.years >= item_filter.year_min
+        if item_filter.year_max is not None:
+            allowed &= self.years <= item_filter.year_max
+        if item_filter.exclude:
+            allowed &= ~np.isin(self.movie_ids, np.asarray(item_filter.exclude, dtype=np.int64))
+        return allowed
+
+
+def masks_for(index: IdIndex, catalog: MovieCatalog) -> FilterMasks:
+    """Filter masks aligned to a sorted id index."""
+
+    return FilterMasks.build(index.ids, catalog)
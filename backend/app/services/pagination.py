@@ -0,0 +1,162 @@
+"""
+Cursor pagination over ranked candidate lists computed once per query.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import logging
+import secrets
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from ..core.config import Settings
+from ..core.metrics import record_cache
+from ..models.results import RecommendationBatch
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded."""
+
+
+@dataclass
+class _Entry:
+    algorithm: str
+    user_id: Optional[int]
+    dataset: Optional[str]
+    batch: RecommendationBatch
+    expires_at: float
+
+
+class CursorStore:
+    """
+    Bounded, TTL-evicted store of ranked candidate lists.
+
+    The first page of ``k`` items ranks ``overfetch * k`` candidates, capped
+    at ``depth``, and keeps them here; later pages are slices of the stored
+    batch, so scrolling never rescores. A single-page request thus pays for a
+    few pages, not for the whole depth.
+    Cursors are opaque tokens naming an entry and an offset. Entries expire
+    ``ttl_seconds`` after they were stored and the oldest entry is evicted
+    beyond ``max_entries``; since entries are kept in insertion order, both
+    evictions only ever pop from the front. Must be used from a single event
+    loop.
+    """
+
+    def __init__(
+        self,
+        depth: int = 200,
+        overfetch: int = 5,
+        ttl_seconds: float = 300.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.depth = depth
+        self.overfetch = overfetch
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_user: Dict[Optional[int], Set[str]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "CursorStore":
+        return cls(
+            depth=settings.cursor_depth,
+            overfetch=settings.cursor_overfetch,
+            ttl_seconds=settings.cursor_ttl_seconds,
+            max_entries=settings.cursor_max_entries,
+        )
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ranking_depth(self, k: int) -> int:
+        """Candidates to rank for a first page of ``k`` items."""
+
+        return max(k, min(self.depth, self.overfetch * k))
+
+    def first_page(
+        self,
+        algorithm: str,
+        user_id: Optional[int],
+        batch: RecommendationBatch,
+        k: int,
+        dataset: Optional[str] = None,
+    ) -> Tuple[RecommendationBatch, Optional[str]]:
+        """Return the first ``k`` items and, if more were ranked, a cursor to the rest."""
+
+        if len(batch) <= k:
+            return batch, None
+        self._evict_expired()
+        entry_id = secrets.token_urlsafe(12)
+        self._entries[entry_id] = _Entry(
+            algorithm, user_id, dataset, batch, self._clock() + self.ttl_seconds
+        )
+        self._by_user.setdefault(user_id, set()).add(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._pop_oldest()
+        return batch.slice(0, k), self._encode(entry_id, k)
+
+    def next_page(
+        self, cursor: str, algorithm: str, k: int, dataset: Optional[str] = None
+    ) -> Optional[Tuple[Optional[int], RecommendationBatch, Optional[str]]]:
+        """
+        Return ``(user_id, page, next_cursor)`` for ``cursor``.
+
+        Gives ``None`` when the entry expired, was evicted or belongs to a
+        different algorithm or dataset; raises :class:`InvalidCursor` for
+        malformed tokens.
+        """
+
+        entry_id, offset = self._decode(cursor)
+        entry = self._entries.get(entry_id)
+        stale = entry is None or entry.expires_at <= self._clock()
+        if stale or (entry.algorithm, entry.dataset) != (algorithm, dataset):
+            record_cache("cursor", hit=False)
+            return None
+        record_cache("cursor", hit=True)
+        stop = offset + k
+        next_cursor = self._encode(entry_id, stop) if stop < len(entry.batch) else None
+        return entry.user_id, entry.batch.slice(offset, stop), next_cursor
+
+    def invalidate_user(self, user_id: int) -> int:
+        """Drop every stored list ranked for ``user_id``; returns how many were dropped."""
+
+        entry_ids = self._by_user.pop(user_id, set())
+        for entry_id in entry_ids:
+            del self._entries[entry_id]
+        return len(entry_ids)
+
+    def _pop_oldest(self) -> None:
+        entry_id, entry = self._entries.popitem(last=False)
+        owned = self._by_user[entry.user_id]
+        owned.discard(entry_id)
+        if not owned:
+            del self._by_user[entry.user_id]
+
+    def _evict_expired(self) -> None:
+        now = self._clock()
+        while self._entries and next(iter(self._entries.values())).expires_at <= now:
+            self._pop_oldest()
+
+    @staticmethod
+    def _encode(entry_id: str, offset: int) -> str:
+        return base64.urlsafe_b64encode(f"{entry_id}:{offset}".encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode(cursor: str) -> Tuple[str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+            entry_id, offset = raw.rsplit(":", 1)
+            position = int(offset)
+        except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+            raise InvalidCursor("Malformed cursor.") from exc
+        if position < 0:
+            raise InvalidCursor("Malformed cursor.")
+        return entry_id, position
@@ -5,15 +5,28 @@ Service for retrieving recommendations from offline artifacts.
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 from scipy import sparse
 
 from ..core.config import Settings
+from ..core.metrics import record_cache, stage
+from ..models.results import RecommendationBatch
+from .events import HistoryOverlay, RatingEvent
+from .filters import FilterMasks, ItemFilter, masks_for
 from ..utils.artifacts import (
+    ArtifactRegistry,
+    IdIndex,
+    artifact_version,
+    MovieCatalog,
+    load_als_factors,
     load_content_neighbors,
     load_item_neighbors,
     load_movie_metadata,
@@ -23,175 +36,790 @@ from ..utils.artifacts import (
 
 logger = logging.getLogger(__name__)
 
+TITLE_CACHE_SIZE = 4096
+
+# Popularity, item-CF and content weights used when a request does not set them.
+DEFAULT_HYBRID_WEIGHTS = (0.1, 0.6, 0.3)
+
+# Candidates re-ranked by MMR when a request asks for diversity.
+MMR_POOL_SIZE = 300
+
+# A session item viewed this long before the latest one counts half as much.
+SESSION_HALF_LIFE_SECONDS = 6 * 3600.0
+
+
+@dataclass(frozen=True)
+class CatalogAlignment:
+    """
+    Per-model vectors laid out on the catalog's sorted id index.
+
+    ``popularity`` holds min-max scaled Bayesian scores. ``item_cf`` and
+    ``content`` pair the neighbor-matrix positions of movies that have
+    metadata with their catalog positions.
+    """
+
+    popularity: np.ndarray
+    item_cf: Tuple[np.ndarray, np.ndarray]
+    content: Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class _HotBatch:
+    batch: RecommendationBatch
+    depth: int
+
 
 @dataclass
 class RecommenderService:
     """Facade around offline artifacts to produce API-ready responses."""
 
-    popularity_df: pd.DataFrame
-    item_similarity: sparse.csr_matrix
-    item_index: Dict[int, int]
-    index_item: Dict[int, int]
-    content_similarity: sparse.csr_matrix
-    content_index: Dict[int, int]
-    index_content: Dict[int, int]
-    movie_meta: pd.DataFrame
-    user_history: pd.DataFrame
+    artifacts: ArtifactRegistry
+    version: str = "in-memory"
+    # Name under which a DatasetManager serves this service.
+    dataset: Optional[str] = None
+    overlay: HistoryOverlay = field(default_factory=HistoryOverlay)
+    _title_cache: "OrderedDict[str, Optional[int]]" = field(
+        default_factory=OrderedDict, init=False, repr=False
+    )
+    _title_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    # Plain item-CF results precomputed for the most active users, keyed by user id.
+    _hot_item_cf: Dict[int, _HotBatch] = field(default_factory=dict, init=False, repr=False)
+    # Plain content results precomputed for popular titles, keyed by the requested titles.
+    _hot_titles: Dict[Tuple[str, ...], _HotBatch] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.artifacts.register("catalog", self._build_catalog)
+        self.artifacts.register("catalog_alignment", self._build_catalog_alignment)
+        # Filter masks per item index, so filtered requests never touch metadata frames.
+        self.artifacts.register("catalog_filters", lambda: masks_for(self.catalog.index, self.catalog))
+        self.artifacts.register("item_cf_filters", lambda: masks_for(self.item_ids, self.catalog))
+        self.artifacts.register("content_filters", lambda: masks_for(self.content_ids, self.catalog))
+        self.artifacts.register(
+            "popularity_filters",
+            lambda: FilterMasks.build(self.popularity_df["movieId"].to_numpy(), self.catalog),
+        )
+        if "als" in self.artifacts.families:
+            self.artifacts.register("als_filters", lambda: masks_for(self.als_model["items"], self.catalog))
 
     @classmethod
     def from_settings(cls, settings: Settings) -> "RecommenderService":
-        """Factory that loads all artifacts based on configured paths."""
+        """
+        Factory that registers all artifacts based on configured paths.
 
-        popularity_df = load_popularity_scores(settings.popularity_path)
-        item_artifacts = load_item_neighbors(
-            settings.item_neighbors_path, settings.item_index_path
-        )
-        content_artifacts = load_content_neighbors(
-            settings.content_neighbors_path, settings.content_index_path
-        )
-        movie_meta = load_movie_metadata(settings.movie_meta_path)
-        user_history = load_user_history(settings.user_history_path)
-        return cls(
-            popularity_df=popularity_df,
-            item_similarity=item_artifacts["matrix"],
-            item_index=item_artifacts["movie_index"],
-            index_item=item_artifacts["index_movie"],
-            content_similarity=content_artifacts["matrix"],
-            content_index=content_artifacts["movie_index"],
-            index_content=content_artifacts["index_movie"],
-            movie_meta=movie_meta,
-            user_history=user_history,
+        Artifacts are loaded up front unless ``settings.lazy_artifacts`` is
+        set, in which case each family is loaded on first use. The optional
+        ALS factors are only registered when the pipeline exported them.
+        """
+
+        registry = ArtifactRegistry(
+            {
+                "popularity": partial(load_popularity_scores, settings.popularity_path),
+                "item_cf": partial(
+                    load_item_neighbors, settings.item_neighbors_path, settings.item_index_path
+                ),
+                "content": partial(
+                    load_content_neighbors,
+                    settings.content_neighbors_path,
+                    settings.content_index_path,
+                ),
+                "movie_meta": partial(load_movie_metadata, settings.movie_meta_path),
+                "user_history": partial(load_user_history, settings.user_history_path),
+            }
         )
+        paths = [
+            settings.popularity_path,
+            settings.item_neighbors_path,
+            settings.item_index_path,
+            settings.content_neighbors_path,
+            settings.content_index_path,
+            settings.movie_meta_path,
+            settings.user_history_path,
+        ]
+        als_paths = [
+            settings.als_user_factors_path,
+            settings.als_item_factors_path,
+            settings.als_user_index_path,
+            settings.als_item_index_path,
+        ]
+        if all(path.exists() for path in als_paths):
+            registry.register("als", partial(load_als_factors, *als_paths))
+            paths += als_paths
+        version = artifact_version(paths)
+        overlay = HistoryOverlay(settings.liked_rating_threshold, settings.overlay_max_users)
+        service = cls(artifacts=registry, version=version, overlay=overlay)
+        if settings.lazy_artifacts:
+            logger.info("Lazy artifact loading enabled; deferring loads to first use.")
+        else:
+            start = time.perf_counter()
+            registry.load_all()
+            logger.info("Loaded all artifacts in %.3fs", time.perf_counter() - start)
+        return service
+
+    @property
+    def popularity_df(self) -> pd.DataFrame:
+        return self.artifacts.get("popularity")
+
+    @property
+    def item_similarity(self) -> sparse.csr_matrix:
+        return self.artifacts.get("item_cf")["matrix"]
+
+    @property
+    def item_ids(self) -> IdIndex:
+        return self.artifacts.get("item_cf")["index"]
+
+    @property
+    def content_similarity(self) -> sparse.csr_matrix:
+        return self.artifacts.get("content")["matrix"]
+
+    @property
+    def content_ids(self) -> IdIndex:
+        return self.artifacts.get("content")["index"]
+
+    @property
+    def als_model(self) -> Dict[str, object]:
+        return self.artifacts.get("als")
+
+    @property
+    def movie_meta(self) -> pd.DataFrame:
+        return self.artifacts.get("movie_meta")
+
+    @property
+    def user_history(self) -> pd.DataFrame:
+        return self.artifacts.get("user_history")
 
     def close(self) -> None:
         """Placeholder for compatibility with context managers."""
 
         logger.info("RecommenderService shutdown complete.")
 
-    def recommend_popular(self, user_id: Optional[int], k: int) -> List[Dict[str, object]]:
-        """Return top-k popular titles enriched with metadata."""
-
-        top_df = self.popularity_df.head(k).merge(
-            self.movie_meta[["movieId", "clean_title", "title", "genres_list", "year"]],
-            how="left",
-            left_on="movieId",
-            right_on="movieId",
-        )
-        return [
-            {
-                "movie_id": int(row.movieId),
-                "title": self._format_title(
-                    getattr(row, "clean_title", None) or getattr(row, "title", str(row.movieId))
-                ),
-                "genres": self._coerce_genres(getattr(row, "genres_list", None)),
-                "score": float(row.bayesian_score),
-                "source": "popular",
-                "reason": "Highly rated by the community.",
-            }
-            for row in top_df.itertuples()
-        ]
+    def user_items(self, user_id: int) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Liked and watched items of a known user.
 
-    def recommend_item_cf(self, user_id: int, k: int) -> List[Dict[str, object]]:
-        """Produce item-based collaborative filtering recommendations."""
+        Ratings ingested since the artifact was built are layered on top.
+        Users who liked nothing are seeded with their watched items; users
+        without history give ``None``.
+        """
 
         history_row = self.user_history[self.user_history["userId"] == user_id]
         if history_row.empty:
-            return []
-
-        liked_items = self._ensure_list(history_row.iloc[0]["liked_items"])
-        if not liked_items:
-            liked_items = self._ensure_list(history_row.iloc[0]["watched_items"])
+            if user_id not in self.overlay:
+                return None
+            liked_items, watched_items = self.overlay.merge(user_id, [], [])
+        else:
+            liked_items, watched_items = self.overlay.merge(
+                user_id,
+                self._ensure_list(history_row.iloc[0]["liked_items"]),
+                self._ensure_list(history_row.iloc[0]["watched_items"]),
+            )
+        liked_items = liked_items or watched_items
         if not liked_items:
-            return []
+            return None
+        return liked_items, watched_items
+
+    def record_rating(self, event: RatingEvent) -> None:
+        """Apply a freshly ingested rating to the user's in-memory history."""
+
+        self.overlay.apply(event)
+        self._hot_item_cf.pop(event.user_id, None)
+
+    def sync_ratings(self, user_id: int, ratings: Mapping[int, float]) -> None:
+        """Adopt another process's overlay entry for ``user_id`` if it differs from ours."""
+
+        if self.overlay.ratings(user_id) != ratings:
+            self.overlay.replace(user_id, ratings)
+            self._hot_item_cf.pop(user_id, None)
+
+    def precompute_item_cf(self, user_ids: Sequence[int], depth: int) -> int:
+        """
+        Rank ``depth`` item-CF results for each user ahead of time.
+
+        Later unfiltered, undiversified requests for these users with
+        ``k <= depth`` are slices of the stored batch. A user's entry is
+        dropped when a new rating arrives for them. Returns how many users
+        were stored.
+        """
+
+        for user_id in user_ids:
+            batch = self.recommend_item_cf(int(user_id), depth)
+            if len(batch):
+                self._hot_item_cf[int(user_id)] = _HotBatch(batch, depth)
+        return len(self._hot_item_cf)
+
+    def precompute_by_titles(self, titles: Sequence[str], depth: int) -> int:
+        """
+        Rank ``depth`` content results for each single title ahead of time.
+
+        Later unfiltered, undiversified requests for exactly that title with
+        ``k <= depth`` are slices of the stored batch. Content similarity does
+        not depend on users, so entries never go stale. Returns how many
+        titles were stored.
+        """
+
+        for title in titles:
+            batch = self.recommend_by_titles([title], depth)
+            if len(batch):
+                self._hot_titles[(title,)] = _HotBatch(batch, depth)
+        return len(self._hot_titles)
+
+    def precomputed_users(self) -> List[int]:
+        """Users whose item-CF results are currently stored by :meth:`precompute_item_cf`."""
+
+        return sorted(self._hot_item_cf)
+
+    def precomputed_titles(self) -> List[str]:
+        """Titles whose content results are stored by :meth:`precompute_by_titles`."""
+
+        return sorted(key[0] for key in self._hot_titles)
+
+    def recommend_popular(
+        self,
+        user_id: Optional[int],
+        k: int,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
+        """Return top-k popular titles enriched with metadata."""
+
+        with stage("popular", "ranking"):
+            allowed = self._allowed("popularity_filters", filters)
+            depth = max(k, MMR_POOL_SIZE) if diversity > 0 else k
+            if allowed is None:
+                top_df = self.popularity_df.head(depth)
+            else:
+                # Rows are already in popularity order; keep the first ones that pass.
+                top_df = self.popularity_df.iloc[np.flatnonzero(allowed)[:depth]]
+            movie_ids = top_df["movieId"].to_numpy(dtype=np.int64)
+            scores = top_df["bayesian_score"].to_numpy(dtype=np.float64)
+            if diversity > 0:
+                order = self._mmr(scores, movie_ids, k, diversity)
+                movie_ids, scores = movie_ids[order], scores[order]
+        with stage("popular", "enrichment"):
+            return self._enrich(
+                movie_ids, scores, source="popular", reason="Highly rated by the community."
+            )
 
-        scores = np.zeros(self.item_similarity.shape[0])
-        for movie_id in liked_items:
-            idx = self.item_index.get(movie_id)
-            if idx is None:
-                continue
-            scores += self.item_similarity[idx].toarray().ravel()
-
-        # Remove already seen items
-        seen = set(self._ensure_list(history_row.iloc[0]["watched_items"]))
-        ranked_indices = np.argsort(scores)[::-1]
-        recommendations: List[Dict[str, object]] = []
-        for idx in ranked_indices:
-            movie_id = self.index_item.get(idx)
-            if movie_id is None or movie_id in seen:
-                continue
-            metadata = self._lookup_metadata(movie_id)
-            seed_info = self._lookup_metadata(liked_items[0]) if liked_items else {}
-            recommendations.append(
-                {
-                    "movie_id": movie_id,
-                    "title": metadata.get("title"),
-                    "genres": metadata.get("genres", []),
-                    "score": float(scores[idx]),
-                    "source": "item_cf",
-                    "reason": f"Because you liked {seed_info.get('title', liked_items[0])}",
-                }
+    def recommend_item_cf(
+        self,
+        user_id: int,
+        k: int,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
+        """
+        Produce item-based collaborative filtering recommendations.
+
+        Each item's reason names the liked title contributing most to its score.
+        """
+
+        if self._hot_item_cf and not filters and diversity <= 0:
+            hot = self._hot_item_cf.get(user_id)
+            if hot is not None and (k <= hot.depth or len(hot.batch) < hot.depth):
+                record_cache("hot_item_cf", hit=True)
+                return hot.batch.slice(0, k)
+            record_cache("hot_item_cf", hit=False)
+
+        with stage("item_cf", "user_lookup"):
+            history = self.user_items(user_id)
+            if history is None:
+                return RecommendationBatch.empty("item_cf")
+            liked_items, watched_items = history
+
+        item_ids = self.item_ids
+        with stage("item_cf", "scoring"):
+            seed_positions = item_ids.lookup(liked_items)
+            seed_positions = seed_positions[seed_positions >= 0]
+            scores = self._sum_rows(self.item_similarity, seed_positions)
+
+        with stage("item_cf", "ranking"):
+            # Remove already seen items
+            seen = item_ids.lookup(watched_items)
+            top = self._rank(
+                scores,
+                k,
+                exclude=seen[seen >= 0],
+                allowed=self._allowed("item_cf_filters", filters),
+                movie_ids=item_ids.ids,
+                diversity=diversity,
             )
-            if len(recommendations) >= k:
-                break
-        return recommendations
 
-    def recommend_by_titles(self, titles: List[str], k: int) -> List[Dict[str, object]]:
+        with stage("item_cf", "enrichment"):
+            batch = self._enrich(item_ids.ids[top].astype(np.int64), scores[top], source="item_cf", reason=None)
+            seeds = self._strongest_seeds(self.item_similarity, seed_positions, top)
+            seed_titles = self._titles(item_ids.ids[seeds]) if seeds is not None else None
+            fallback = self._lookup_metadata(liked_items[0]).get("title", liked_items[0])
+            batch.reasons = [
+                f"Because you liked {seed_titles[rank] if seed_titles else fallback}" for rank in range(len(batch))
+            ]
+            return batch
+
+    def recommend_als(
+        self,
+        user_id: int,
+        k: int,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
+        """Rank every title by its dot product with the user's ALS factors."""
+
+        if "als" not in self.artifacts.families:
+            return RecommendationBatch.empty("als")
+        model = self.als_model
+        with stage("als", "user_lookup"):
+            position = model["users"].position(user_id)
+            if position is None:
+                return RecommendationBatch.empty("als")
+            history = self.user_items(user_id)
+            watched_items = history[1] if history is not None else []
+
+        items = model["items"]
+        with stage("als", "scoring"):
+            # One mat-vec: the cost does not depend on how long the history is.
+            scores = model["item_factors"] @ model["user_factors"][position]
+
+        with stage("als", "ranking"):
+            seen = items.lookup(watched_items)
+            top = self._rank(
+                scores,
+                k,
+                exclude=seen[seen >= 0],
+                allowed=self._allowed("als_filters", filters),
+                movie_ids=items.ids,
+                diversity=diversity,
+            )
+
+        with stage("als", "enrichment"):
+            return self._enrich(
+                items.ids[top].astype(np.int64),
+                scores[top],
+                source="als",
+                reason="Matches your taste profile.",
+            )
+
+    def recommend_hybrid(
+        self,
+        user_id: int,
+        k: int,
+        weights: Tuple[float, float, float] = DEFAULT_HYBRID_WEIGHTS,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
+        """
+        Blend popularity, item-CF and content scores over the shared catalog index.
+
+        Each component is scaled to ``[0, 1]`` (popularity by min-max, the
+        neighbor sums by their maximum) and the weighted sum is ranked once.
+        Every item's reason names the component that contributed most.
+        """
+
+        with stage("hybrid", "user_lookup"):
+            history = self.user_items(user_id)
+            if history is None:
+                return RecommendationBatch.empty("hybrid")
+            liked_items, watched_items = history
+
+        alignment = self.catalog_alignment
+        popularity_weight, item_cf_weight, content_weight = weights
+        with stage("hybrid", "scoring"):
+            contributions = np.zeros((3, len(self.catalog.index)))
+            contributions[0] = popularity_weight * alignment.popularity
+            for component, weight, matrix, ids, (rows, targets) in (
+                (1, item_cf_weight, self.item_similarity, self.item_ids, alignment.item_cf),
+                (2, content_weight, self.content_similarity, self.content_ids, alignment.content),
+            ):
+                if weight == 0:
+                    continue
+                seeds = ids.lookup(liked_items)
+                scores = self._sum_rows(matrix, seeds[seeds >= 0])
+                peak = scores.max(initial=0.0)
+                if peak > 0:
+                    contributions[component, targets] = (weight / peak) * scores[rows]
+            blended = contributions.sum(axis=0)
+
+        with stage("hybrid", "ranking"):
+            seen = self.catalog.index.lookup(watched_items)
+            top = self._rank(
+                blended,
+                k,
+                exclude=seen[seen >= 0],
+                allowed=self._allowed("catalog_filters", filters),
+                movie_ids=self.catalog.index.ids,
+                diversity=diversity,
+            )
+
+        with stage("hybrid", "enrichment"):
+            movie_ids = self.catalog.index.ids[top].astype(np.int64)
+            dominant = contributions[:, top].argmax(axis=0)
+            batch = self._enrich(movie_ids, blended[top], source="hybrid", reason=None)
+            reasons = ["Highly rated by the community."] * len(batch)
+            for component, template, matrix, ids in (
+                (1, "Because you liked {}", self.item_similarity, self.item_ids),
+                (2, "Similar in content to {}", self.content_similarity, self.content_ids),
+            ):
+                ranks = np.flatnonzero(dominant == component)
+                if not ranks.size:
+                    continue
+                # A dominant component contributed a positive score, so every
+                # such item and at least one seed are in that model's index.
+                seeds = ids.lookup(liked_items)
+                seeds = seeds[seeds >= 0]
+                strongest = self._strongest_seeds(matrix, seeds, ids.lookup(movie_ids[ranks]))
+                for rank, title in zip(ranks.tolist(), self._titles(ids.ids[strongest])):
+                    reasons[rank] = template.format(title)
+            batch.reasons = reasons
+            return batch
+
+    def recommend_session(
+        self,
+        movie_ids: Sequence[int],
+        k: int,
+        timestamps: Optional[Sequence[float]] = None,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
+        """
+        Item-CF recommendations for a visitor described only by recent items.
+
+        Seeds are scored with the same row sum as ``recommend_item_cf``. With
+        ``timestamps`` (seconds, one per item), each row is weighted by
+        ``0.5 ** (age / SESSION_HALF_LIFE_SECONDS)`` relative to the latest item.
+        Session items are never recommended back.
+        """
+
+        item_ids = self.item_ids
+        with stage("session", "seed_lookup"):
+            positions = item_ids.lookup(movie_ids)
+            known = positions >= 0
+            if not known.any():
+                return RecommendationBatch.empty("session")
+            seeds = positions[known]
+            weights = None
+            if timestamps is not None:
+                times = np.asarray(timestamps, dtype=np.float64)[known]
+                weights = np.exp2((times - times.max()) / SESSION_HALF_LIFE_SECONDS)
+
+        with stage("session", "scoring"):
+            scores = self._sum_rows(self.item_similarity, seeds, weights)
+
+        with stage("session", "ranking"):
+            top = self._rank(
+                scores,
+                k,
+                exclude=seeds,
+                allowed=self._allowed("item_cf_filters", filters),
+                movie_ids=item_ids.ids,
+                diversity=diversity,
+            )
+
+        with stage("session", "enrichment"):
+            batch = self._enrich(item_ids.ids[top].astype(np.int64), scores[top], source="session", reason=None)
+            strongest = self._strongest_seeds(self.item_similarity, seeds, top, weights)
+            if strongest is not None:
+                batch.reasons = [f"Because you viewed {title}" for title in self._titles(item_ids.ids[strongest])]
+            return batch
+
+    def recommend_by_titles(
+        self,
+        titles: Sequence[str],
+        k: int,
+        filters: Optional[ItemFilter] = None,
+        diversity: float = 0.0,
+    ) -> RecommendationBatch:
         """Recommend similar titles leveraging the content similarity matrix."""
 
-        seed_indices = [
-            self.content_index.get(self._find_movie_id_by_title(title)) for title in titles
+        if self._hot_titles and not filters and diversity <= 0:
+            hot = self._hot_titles.get(tuple(titles))
+            if hot is not None and (k <= hot.depth or len(hot.batch) < hot.depth):
+                record_cache("hot_titles", hit=True)
+                return hot.batch.slice(0, k)
+            record_cache("hot_titles", hit=False)
+
+        content_ids = self.content_ids
+        with stage("content", "seed_lookup"):
+            seed_indices = [
+                content_ids.position(self._find_movie_id_by_title(title)) for title in titles
+            ]
+            seed_indices = np.array([idx for idx in seed_indices if idx is not None], dtype=np.int64)
+            if not seed_indices.size:
+                return RecommendationBatch.empty("content")
+
+        with stage("content", "scoring"):
+            scores = self._sum_rows(self.content_similarity, seed_indices)
+        with stage("content", "ranking"):
+            top = self._rank(
+                scores,
+                k,
+                exclude=seed_indices,
+                allowed=self._allowed("content_filters", filters),
+                movie_ids=content_ids.ids,
+                diversity=diversity,
+            )
+        with stage("content", "enrichment"):
+            return self._enrich(
+                content_ids.ids[top].astype(np.int64),
+                scores[top],
+                source="content",
+                reason=f"Similar to {titles[0]}",
+            )
+
+    @property
+    def catalog(self) -> MovieCatalog:
+        return self.artifacts.get("catalog")
+
+    @property
+    def catalog_alignment(self) -> "CatalogAlignment":
+        return self.artifacts.get("catalog_alignment")
+
+    def _allowed(self, family: str, filters: Optional[ItemFilter]) -> Optional[np.ndarray]:
+        """Mask of items passing ``filters`` on the index behind ``family``, if any filter is set."""
+
+        if not filters:
+            return None
+        return self.artifacts.get(family).allowed(filters)
+
+    def _build_catalog_alignment(self) -> "CatalogAlignment":
+        """Map popularity and both neighbor indexes onto the catalog's positions."""
+
+        index = self.catalog.index
+        popularity = np.zeros(len(index))
+        frame = self.popularity_df
+        positions = index.lookup(frame["movieId"].to_numpy())
+        values = frame["bayesian_score"].to_numpy(dtype=np.float64)[positions >= 0]
+        if values.size:
+            span = values.max() - values.min()
+            popularity[positions[positions >= 0]] = (values - values.min()) / span if span > 0 else 1.0
+
+        def columns(ids: IdIndex) -> Tuple[np.ndarray, np.ndarray]:
+            targets = index.lookup(ids.ids)
+            rows = np.flatnonzero(targets >= 0)
+            return rows, targets[rows]
+
+        return CatalogAlignment(
+            popularity=popularity,
+            item_cf=columns(self.item_ids),
+            content=columns(self.content_ids),
+        )
+
+    def _build_catalog(self) -> MovieCatalog:
+        """Precompute display titles and genres aligned to sorted movie ids."""
+
+        frame = self.movie_meta.sort_values("movieId").drop_duplicates("movieId")
+        raw_titles = frame["clean_title"] if "clean_title" in frame else frame["title"]
+        if "title" in frame:
+            raw_titles = raw_titles.fillna(frame["title"])
+        genres = np.empty(len(frame), dtype=object)
+        genres[:] = [self._coerce_genres(value) for value in frame.get("genres_list", [None] * len(frame))]
+        years = frame["year"].to_numpy(dtype=np.float64) if "year" in frame else np.full(len(frame), np.nan)
+        return MovieCatalog(
+            index=IdIndex(frame["movieId"].to_numpy(dtype=np.int32)),
+            titles=np.array([self._format_title(title) for title in raw_titles], dtype=object),
+            genres=genres,
+            years=years,
+        )
+
+    def _enrich(
+        self,
+        movie_ids: np.ndarray,
+        scores: np.ndarray,
+        source: str,
+        reason: Optional[str],
+    ) -> RecommendationBatch:
+        """Attach titles and genres to ranked ids with one vectorized lookup."""
+
+        catalog = self.catalog
+        positions = catalog.index.lookup(movie_ids)
+        titles = self._titles(movie_ids, positions)
+        genres = [catalog.genres[position] if position >= 0 else [] for position in positions.tolist()]
+        return RecommendationBatch(
+            movie_ids=movie_ids,
+            scores=np.asarray(scores, dtype=np.float64),
+            titles=titles,
+            genres=genres,
+            reasons=[reason] * len(titles),
+            source=source,
+        )
+
+    def _titles(self, movie_ids: np.ndarray, positions: Optional[np.ndarray] = None) -> List[str]:
+        """Display titles of ``movie_ids``; ``positions`` are their catalog positions if known."""
+
+        catalog = self.catalog
+        if positions is None:
+            positions = catalog.index.lookup(movie_ids)
+        return [
+            catalog.titles[position] if position >= 0 else f"Movie {movie_id}"
+            for movie_id, position in zip(movie_ids.tolist(), positions.tolist())
         ]
-        seed_indices = [idx for idx in seed_indices if idx is not None]
-        if not seed_indices:
-            return []
 
-        scores = np.zeros(self.content_similarity.shape[0])
-        for idx in seed_indices:
-            scores += self.content_similarity[idx].toarray().ravel()
-        ranked_indices = np.argsort(scores)[::-1]
-
-        seeds = {self.index_content[idx] for idx in seed_indices}
-        recommendations: List[Dict[str, object]] = []
-        for idx in ranked_indices:
-            movie_id = self.index_content.get(idx)
-            if movie_id is None or movie_id in seeds:
-                continue
-            metadata = self._lookup_metadata(movie_id)
-            recommendations.append(
-                {
-                    "movie_id": movie_id,
-                    "title": metadata.get("title"),
-                    "genres": metadata.get("genres", []),
-                    "score": float(scores[idx]),
-                    "source": "content",
-                    "reason": f"Similar to {titles[0]}",
-                }
-            )
-            if len(recommendations) >= k:
-                break
-        return recommendations
+    @staticmethod
+    def _strongest_seeds(
+        matrix: sparse.csr_matrix,
+        seeds: np.ndarray,
+        targets: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        For each target row position, the seed whose (weighted) similarity to it is largest.
+
+        One argmax over the small dense seed x target submatrix, filled from
+        the seeds' CSR entries; ``None`` when there are no seeds or targets.
+        """
+
+        if seeds.size == 0 or targets.size == 0:
+            return None
+        contributions = RecommenderService._dense_block(matrix, seeds, targets)
+        if weights is not None:
+            contributions *= weights[:, None]
+        return seeds[contributions.argmax(axis=0)]
+
+    @staticmethod
+    def _dense_block(matrix: sparse.csr_matrix, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """``matrix[rows][:, columns]`` as a dense array, filled from the rows' CSR entries."""
+
+        offsets, lengths = RecommenderService._row_entries(matrix, rows)
+        column_rank = np.full(matrix.shape[1], -1)
+        column_rank[columns] = np.arange(columns.size)
+        ranks = column_rank[matrix.indices[offsets]]
+        keep = ranks >= 0
+        block = np.zeros((rows.size, columns.size))
+        block[np.repeat(np.arange(rows.size), lengths)[keep], ranks[keep]] = matrix.data[offsets[keep]]
+        return block
+
+    @staticmethod
+    def _row_entries(matrix: sparse.csr_matrix, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Offsets of the selected rows' CSR entries, and the number of entries per row."""
+
+        # Gathering entries directly is cheaper than slicing a submatrix, whose
+        # SciPy bookkeeping costs more than the work for typical history sizes.
+        starts = matrix.indptr[rows]
+        lengths = matrix.indptr[rows + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return offsets, lengths
+
+    @staticmethod
+    def _sum_rows(
+        matrix: sparse.csr_matrix, rows: np.ndarray, weights: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Add up the selected similarity rows, optionally weighted, into one dense score vector."""
+
+        if rows.size == 0:
+            return np.zeros(matrix.shape[1])
+        offsets, lengths = RecommenderService._row_entries(matrix, rows)
+        values = matrix.data[offsets]
+        if weights is not None:
+            values = values * np.repeat(weights, lengths)
+        return np.bincount(matrix.indices[offsets], weights=values, minlength=matrix.shape[1])
+
+    def _rank(
+        self,
+        scores: np.ndarray,
+        k: int,
+        exclude: np.ndarray,
+        allowed: Optional[np.ndarray],
+        movie_ids: np.ndarray,
+        diversity: float,
+    ) -> np.ndarray:
+        """
+        Top-k positions of ``scores``, re-ranked for diversity when ``diversity > 0``.
+
+        ``movie_ids`` maps score positions to movie ids. With diversity, the
+        best ``MMR_POOL_SIZE`` candidates are re-ranked by :meth:`_mmr`.
+        """
+
+        if diversity <= 0:
+            return self._top_k(scores, k, exclude=exclude, allowed=allowed)
+        pool = self._top_k(scores, max(k, MMR_POOL_SIZE), exclude=exclude, allowed=allowed)
+        return pool[self._mmr(scores[pool], movie_ids[pool].astype(np.int64), k, diversity)]
+
+    def _mmr(self, relevance: np.ndarray, movie_ids: np.ndarray, k: int, diversity: float) -> np.ndarray:
+        """
+        Maximal Marginal Relevance order of ``k`` candidates, as indices into the pool.
+
+        Each step picks the candidate maximizing ``(1 - diversity) * relevance
+        - diversity * max similarity to the items already picked``, with
+        relevance min-max scaled over the pool. Content similarities of the
+        pool are gathered once as a dense, symmetrized block, and the running
+        maximum is updated with one vector operation per pick.
+        """
+
+        size = relevance.size
+        if size == 0:
+            return np.empty(0, dtype=np.int64)
+        low, high = relevance.min(), relevance.max()
+        relevance = (relevance - low) / (high - low) if high > low else np.ones(size)
+        positions = self.content_ids.lookup(movie_ids)
+        known = np.flatnonzero(positions >= 0)
+        block = self._dense_block(self.content_similarity, positions[known], positions[known])
+        if known.size == size:
+            similarity = block
+        else:
+            similarity = np.zeros((size, size))
+            similarity[np.ix_(known, known)] = block
+        # Neighbor lists are truncated per row, so a pair may be stored one way only.
+        similarity = np.maximum(similarity, similarity.T)
+
+        gain = (1.0 - diversity) * relevance
+        closest = np.zeros(size)
+        order = np.empty(min(k, size), dtype=np.int64)
+        for step in range(order.size):
+            pick = int(np.argmax(gain - diversity * closest))
+            order[step] = pick
+            gain[pick] = -np.inf
+            np.maximum(closest, similarity[pick], out=closest)
+        return order
+
+    @staticmethod
+    def _top_k(
+        scores: np.ndarray, k: int, exclude: np.ndarray, allowed: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Return the positions of the ``k`` best scores, best first.
+
+        Positions in ``exclude`` and, when given, outside the ``allowed``
+        mask are never returned.
+        """
+
+        scores = scores.copy()
+        scores[exclude] = -np.inf
+        if allowed is not None:
+            scores[~allowed] = -np.inf
+        k = min(k, int(np.isfinite(scores).sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
 
     def _lookup_metadata(self, movie_id: int) -> Dict[str, object]:
         """Helper to map metadata row into a serializable payload."""
 
-        row = self.movie_meta[self.movie_meta["movieId"] == movie_id]
-        if row.empty:
+        catalog = self.catalog
+        position = catalog.index.position(movie_id)
+        if position is None:
             return {"title": f"Movie {movie_id}", "genres": []}
-        entry = row.iloc[0]
         return {
-            "title": self._format_title(entry.get("clean_title") or entry.get("title")),
-            "genres": self._coerce_genres(entry.get("genres_list")),
-            "year": entry.get("year"),
+            "title": catalog.titles[position],
+            "genres": catalog.genres[position],
+            "year": catalog.years[position],
         }
 
     def _find_movie_id_by_title(self, title: str) -> Optional[int]:
-        """Perform a simple contains search over normalized titles."""
+        """Perform a simple contains search over normalized titles, memoizing results."""
+
+        key = title.casefold()
+        with self._title_cache_lock:
+            if key in self._title_cache:
+                self._title_cache.move_to_end(key)
+                record_cache("title_lookup", hit=True)
+                return self._title_cache[key]
+        record_cache("title_lookup", hit=False)
 
         mask = self.movie_meta["clean_title"].str.contains(title, case=False, na=False)
         match = self.movie_meta[mask].head(1)
-        if match.empty:
-            return None
-        return int(match.iloc[0]["movieId"])
+        movie_id = None if match.empty else int(match.iloc[0]["movieId"])
+        with self._title_cache_lock:
+            self._title_cache[key] = movie_id
+            if len(self._title_cache) > TITLE_CACHE_SIZE:
+                self._title_cache.popitem(last=False)
+        return movie_id
 
     @staticmethod
     def _ensure_list(value: object) -> List[int]:
@@ -0,0 +1,59 @@
+"""
+Coalescing of concurrent identical recommendation requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from ..core.metrics import COALESCED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Share one in-flight computation between callers that ask for the same key.
+
+    The first caller for a key (the leader) starts the computation as a task;
+    callers arriving before it finishes await the same task instead of
+    computing the result again. Keys are forgotten as soon as the task
+    completes, so this never serves stale results. Must be used from a single
+    event loop.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return ``await fn()``, sharing the call with concurrent requests for ``key``."""
+
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            COALESCED_REQUESTS.inc(role="coalesced")
+            logger.debug("Coalesced request onto in-flight call %s", key)
+        else:
+            self.leaders += 1
+            COALESCED_REQUESTS.inc(role="leader")
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # Shield the shared task so one disconnecting client does not cancel
+        # the computation for everyone else waiting on it.
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved when every waiter has gone away.
+            task.exception()
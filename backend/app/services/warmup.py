@@ -0,0 +1,127 @@
+"""
+Startup warm-up so the first real requests do not pay for cold artifacts.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from ..core.config import Settings
+from .recommender import RecommenderService
+
+logger = logging.getLogger(__name__)
+
+PAGE_BYTES = 4096
+
+
+@dataclass
+class WarmupReport:
+    """What the warm-up touched and how long each phase took."""
+
+    touched_bytes: int = 0
+    queries: Dict[str, float] = field(default_factory=dict)
+    hot_users: int = 0
+    titles: int = 0
+    seconds: Dict[str, float] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, object]:
+        return dataclasses.asdict(self)
+
+
+def touch_pages(value: object) -> int:
+    """
+    Read one byte per memory page of every array reachable from ``value``.
+
+    Covers NumPy arrays, sparse matrices, DataFrames, mappings and
+    dataclasses (such as id indexes and filter masks). Returns the bytes covered.
+    """
+
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject or value.size == 0:
+            return 0
+        flat = np.ascontiguousarray(value).reshape(-1).view(np.uint8)
+        int(flat[::PAGE_BYTES].sum())
+        return int(flat.size)
+    if sparse.issparse(value):
+        return sum(touch_pages(getattr(value, name, None)) for name in ("data", "indices", "indptr"))
+    if isinstance(value, pd.DataFrame):
+        return sum(touch_pages(value[column].to_numpy()) for column in value.columns)
+    if isinstance(value, Mapping):
+        return sum(touch_pages(item) for item in value.values())
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(touch_pages(getattr(value, item.name)) for item in dataclasses.fields(value))
+    return 0
+
+
+def most_active_users(recommender: RecommenderService, count: int) -> List[int]:
+    """Ids of the ``count`` users with the longest watch histories."""
+
+    history = recommender.user_history
+    if count <= 0 or history.empty:
+        return []
+    lengths = history["watched_items"].map(len).to_numpy()
+    top = np.argsort(-lengths, kind="stable")[:count]
+    return history["userId"].to_numpy()[top].astype(int).tolist()
+
+
+def warm_up(recommender: RecommenderService, settings: Settings) -> WarmupReport:
+    """
+    Load every artifact family, touch its pages, exercise each endpoint once and
+    precompute results for the most active users and the most popular titles.
+
+    Item-CF pages of the busiest users and content pages of the most popular
+    titles are stored on the service, so common requests start warm.
+    """
+
+    report = WarmupReport()
+    artifacts = recommender.artifacts
+
+    start = time.perf_counter()
+    artifacts.load_all()
+    report.touched_bytes = sum(touch_pages(artifacts.get(family)) for family in artifacts.families)
+    report.seconds["artifacts"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    hot_users = most_active_users(recommender, settings.warmup_hot_users)
+    popular_ids = recommender.popularity_df["movieId"].head(max(settings.warmup_titles, 1))
+    clean_titles = recommender.movie_meta.drop_duplicates("movieId").set_index("movieId")["clean_title"]
+    titles = clean_titles.reindex(popular_ids).dropna().tolist()
+    if hot_users:
+        user_id = hot_users[-1]
+        liked, _ = recommender.user_items(user_id) or ([], [])
+        queries = {
+            "popular": lambda: recommender.recommend_popular(None, 10),
+            "item_cf": lambda: recommender.recommend_item_cf(user_id, 10),
+            "hybrid": lambda: recommender.recommend_hybrid(user_id, 10),
+            "session": lambda: recommender.recommend_session(liked[:5], 10),
+            "content": lambda: recommender.recommend_by_titles(titles[:1], 10),
+        }
+        if "als" in artifacts.families:
+            queries["als"] = lambda: recommender.recommend_als(user_id, 10)
+        for name, query in queries.items():
+            query_start = time.perf_counter()
+            query()
+            report.queries[name] = time.perf_counter() - query_start
+    report.seconds["queries"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report.hot_users = recommender.precompute_item_cf(hot_users, settings.cursor_depth)
+    report.titles = recommender.precompute_by_titles(titles[: settings.warmup_titles], settings.cursor_depth)
+    report.seconds["hot_set"] = time.perf_counter() - start
+
+    logger.info(
+        "Warm-up touched %.1f MB, ran %d queries and precomputed %d users in %.2fs",
+        report.touched_bytes / 1024**2,
+        len(report.queries),
+        report.hot_users,
+        sum(report.seconds.values()),
+    )
+    return report
@@ -4,17 +4,131 @@ Helpers for loading offline artifacts into memory.
 
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from scipy import sparse
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class IdIndex:
+    """Sorted ``int32`` movie (or user) ids whose positions double as matrix rows."""
+
+    ids: np.ndarray
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def lookup(self, movie_ids: Iterable[int]) -> np.ndarray:
+        """Vectorized id -> position mapping; unknown ids map to ``-1``."""
+
+        values = np.asarray(movie_ids, dtype=np.int64).ravel()
+        if self.ids.size == 0:
+            return np.full(values.shape, -1, dtype=np.int64)
+        positions = np.searchsorted(self.ids, values)
+        positions = np.minimum(positions, self.ids.size - 1)
+        return np.where(self.ids[positions] == values, positions, -1)
+
+    def position(self, movie_id: Optional[int]) -> Optional[int]:
+        """Return the position of a single movie id, or ``None`` if absent."""
+
+        if movie_id is None:
+            return None
+        position = int(self.lookup([movie_id])[0])
+        return position if position >= 0 else None
+
+
+def load_id_index(path: Path) -> Tuple[IdIndex, Optional[np.ndarray]]:
+    """
+    Load an id index written by the offline pipeline.
+
+    Binary ``.npy`` indexes are already sorted. Legacy ``.json`` indexes are
+    still accepted, also in place of a missing ``.npy`` file so artifact
+    directories built before the switch keep loading; when their rows are not
+    in id order the returned permutation must be applied to the accompanying matrix.
+    """
+
+    if path.suffix == ".npy" and not path.exists() and path.with_suffix(".json").exists():
+        path = path.with_suffix(".json")
+    if path.suffix == ".json":
+        with path.open("r", encoding="utf-8") as fp:
+            metadata = json.load(fp)
+        index_movie = metadata["index_movie"]
+        ids = np.empty(len(index_movie), dtype=np.int64)
+        for row, movie_id in index_movie.items():
+            ids[int(row)] = int(movie_id)
+        order = np.argsort(ids, kind="stable")
+        if np.array_equal(order, np.arange(ids.size)):
+            order = None
+        else:
+            ids = ids[order]
+        return IdIndex(ids.astype(np.int32)), order
+
+    ids = np.load(path)
+    if ids.size > 1 and np.any(np.diff(ids) <= 0):
+        raise ValueError(f"Id index {path} is not strictly increasing.")
+    return IdIndex(ids.astype(np.int32, copy=False)), None
+
+
+def _load_neighbors(matrix_path: Path, index_path: Path) -> Dict[str, object]:
+    """Load a similarity matrix together with its id index."""
+
+    matrix = sparse.load_npz(matrix_path).tocsr()
+    index, order = load_id_index(index_path)
+    if order is not None:
+        matrix = matrix[order][:, order].tocsr()
+    return {"matrix": matrix, "index": index}
+
+
+@dataclass(frozen=True)
+class MovieCatalog:
+    """Display metadata laid out as arrays aligned to a sorted id index."""
+
+    index: IdIndex
+    titles: np.ndarray
+    genres: np.ndarray
+    years: np.ndarray
+
+
+def estimate_nbytes(value: object) -> int:
+    """Approximate the memory held by an artifact (arrays, frames, sparse matrices)."""
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if sparse.issparse(value):
+        parts = ("data", "indices", "indptr")
+        return int(sum(getattr(value, name).nbytes for name in parts if hasattr(value, name)))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(estimate_nbytes(item) for item in value.values())
+    if hasattr(value, "__dataclass_fields__"):
+        return sum(estimate_nbytes(getattr(value, name)) for name in value.__dataclass_fields__)
+    return 0
+
+
+def artifact_version(paths: Iterable[Path]) -> str:
+    """Fingerprint artifact files by path, size and modification time."""
+
+    digest = hashlib.sha1()
+    for path in sorted(Path(path) for path in paths):
+        digest.update(str(path).encode("utf-8"))
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
 def load_popularity_scores(path: Path) -> pd.DataFrame:
     """Load popular movies Parquet file."""
 
@@ -26,28 +140,34 @@ def load_item_neighbors(matrix_path: Path, index_path: Path) -> Dict[str, object
     """Load item-based similarity artifacts."""
 
     logger.info("Loading item neighbors from %s", matrix_path)
-    matrix = sparse.load_npz(matrix_path)
-    with index_path.open("r", encoding="utf-8") as fp:
-        metadata = json.load(fp)
-    return {
-        "matrix": matrix,
-        "movie_index": {int(k): int(v) for k, v in metadata["movie_index"].items()},
-        "index_movie": {int(k): int(v) for k, v in metadata["index_movie"].items()},
-    }
+    return _load_neighbors(matrix_path, index_path)
 
 
 def load_content_neighbors(matrix_path: Path, index_path: Path) -> Dict[str, object]:
     """Load content similarity artifacts."""
 
     logger.info("Loading content neighbors from %s", matrix_path)
-    matrix = sparse.load_npz(matrix_path)
-    with index_path.open("r", encoding="utf-8") as fp:
-        metadata = json.load(fp)
-    return {
-        "matrix": matrix,
-        "movie_index": {int(k): int(v) for k, v in metadata["movie_index"].items()},
-        "index_movie": {int(k): int(v) for k, v in metadata["index_movie"].items()},
-    }
+    return _load_neighbors(matrix_path, index_path)
+
+
+def load_als_factors(
+    user_factors_path: Path,
+    item_factors_path: Path,
+    user_index_path: Path,
+    item_index_path: Path,
+) -> Dict[str, object]:
+    """Load ALS factor matrices with the user and movie id indexes labelling their rows."""
+
+    logger.info("Loading ALS factors from %s", item_factors_path)
+    user_factors = np.load(user_factors_path).astype(np.float32, copy=False)
+    item_factors = np.load(item_factors_path).astype(np.float32, copy=False)
+    users, _ = load_id_index(user_index_path)
+    items, _ = load_id_index(item_index_path)
+    if len(users) != user_factors.shape[0] or len(items) != item_factors.shape[0]:
+        raise ValueError(f"ALS factors in {item_factors_path.parent} do not match their id indexes.")
+    if user_factors.shape[1] != item_factors.shape[1]:
+        raise ValueError("ALS user and item factors have different ranks.")
+    return {"user_factors": user_factors, "item_factors": item_factors, "users": users, "items": items}
 
 
 def load_movie_metadata(path: Path) -> pd.DataFrame:
@@ -62,3 +182,74 @@ def load_user_history(path: Path) -> pd.DataFrame:
 
     logger.info("Loading user history from %s", path)
     return pd.read_parquet(path)
+
+
+class ArtifactRegistry:
+    """
+    Load-once holder for named artifact families.
+
+    Families are loaded either up front via :meth:`load_all` or lazily the
+    first time :meth:`get` asks for them. Each family has its own lock so a
+    slow lazy load does not block requests served by other families.
+    """
+
+    def __init__(self, loaders: Mapping[str, Callable[[], object]]) -> None:
+        self._loaders = dict(loaders)
+        self._values: Dict[str, object] = {}
+        self._timings: Dict[str, float] = {}
+        self._locks = {name: threading.Lock() for name in self._loaders}
+
+    @classmethod
+    def preloaded(cls, values: Mapping[str, object]) -> "ArtifactRegistry":
+        """Build a registry around artifacts that are already in memory."""
+
+        registry = cls({name: (lambda value=value: value) for name, value in values.items()})
+        registry._values.update(values)
+        return registry
+
+    @property
+    def families(self) -> Tuple[str, ...]:
+        return tuple(self._loaders)
+
+    @property
+    def timings(self) -> Dict[str, float]:
+        """Seconds spent loading each family that has been loaded so far."""
+
+        return dict(self._timings)
+
+    def sizes(self) -> Dict[str, int]:
+        """Approximate bytes held by each loaded family."""
+
+        return {family: estimate_nbytes(value) for family, value in list(self._values.items())}
+
+    def register(self, family: str, loader: Callable[[], object]) -> None:
+        """Add a family, typically one derived from already registered artifacts."""
+
+        self._loaders[family] = loader
+        self._locks[family] = threading.Lock()
+
+    def is_loaded(self, family: str) -> bool:
+        return family in self._values
+
+    def get(self, family: str) -> object:
+        """Return a family, loading it on first access."""
+
+        try:
+            return self._values[family]
+        except KeyError:
+            pass
+        if family not in self._loaders:
+            raise KeyError(f"Unknown artifact family: {family}")
+        with self._locks[family]:
+            if family not in self._values:
+                start = time.perf_counter()
+                self._values[family] = self._loaders[family]()
+                self._timings[family] = time.perf_counter() - start
+                logger.info("Loaded artifact %s in %.3fs", family, self._timings[family])
+        return self._values[family]
+
+    def load_all(self) -> None:
+        """Eagerly load every registered family."""
+
+        for family in self._loaders:
+            self.get(family)
@@ -0,0 +1,59 @@
+"""
+Fast JSON rendering for recommendation envelopes.
+"""
+
+from __future__ import annotations
+
+from typing import Mapping, Optional, Sequence, Union
+
+import orjson
+from fastapi import Response
+
+from ..models.results import RecommendationBatch
+
+ResultsLike = Union[RecommendationBatch, Sequence[Mapping[str, object]]]
+
+
+def as_batch(results: ResultsLike) -> RecommendationBatch:
+    """Accept either a columnar batch or a list of item dictionaries."""
+
+    if isinstance(results, RecommendationBatch):
+        return results
+    return RecommendationBatch.from_records(results)
+
+
+def envelope_bytes(
+    user_id: Optional[int],
+    algorithm: str,
+    results: ResultsLike,
+    next_cursor: Optional[str] = None,
+) -> bytes:
+    """
+    Encode a ``RecommendationsEnvelope``-shaped payload directly to JSON bytes.
+
+    The field order and types mirror the Pydantic schema so the documented
+    response model stays accurate without re-validating every item.
+    """
+
+    batch = as_batch(results)
+    return orjson.dumps(
+        {
+            "user_id": user_id,
+            "algorithm": algorithm,
+            "items": batch.to_records(),
+            "next_cursor": next_cursor,
+        }
+    )
+
+
+def envelope_response(
+    user_id: Optional[int],
+    algorithm: str,
+    results: ResultsLike,
+    next_cursor: Optional[str] = None,
+) -> Response:
+    """Wrap :func:`envelope_bytes` in a response FastAPI passes through untouched."""
+
+    return Response(
+        content=envelope_bytes(user_id, algorithm, results, next_cursor), media_type="application/json"
+    )
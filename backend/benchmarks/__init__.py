@@ -0,0 +1 @@
+"""Latency benchmarks for the recommender API."""
@@ -0,0 +1,88 @@
+"""
+Latency and intra-list diversity of MMR re-ranking on item-CF results.
+
+Run from the ``backend`` directory against exported artifacts, or omit
+``--artifact-dir`` to generate a synthetic catalog::
+
+    python -m benchmarks.diversity --artifact-dir ../data/artifacts/ml-1m --k 10 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.recommender import RecommenderService
+
+from .synthetic import SyntheticScale, settings_for, write_artifacts
+
+
+def intra_list_diversity(service: RecommenderService, movie_ids: np.ndarray) -> float:
+    """One minus the mean pairwise content similarity of a list."""
+
+    positions = service.content_ids.lookup(movie_ids)
+    positions = positions[positions >= 0]
+    if positions.size < 2:
+        return float("nan")
+    block = service._dense_block(service.content_similarity, positions, positions)
+    block = np.maximum(block, block.T)
+    return float(1.0 - block[~np.eye(positions.size, dtype=bool)].mean())
+
+
+def measure(
+    service: RecommenderService, users: np.ndarray, k: int, diversity: float
+) -> Dict[str, float]:
+    """Sequential in-process calls; latency in milliseconds."""
+
+    latencies: List[float] = []
+    diversities: List[float] = []
+    for user_id in users.tolist():
+        start = time.perf_counter()
+        batch = service.recommend_item_cf(user_id, k, diversity=diversity)
+        latencies.append((time.perf_counter() - start) * 1000)
+        diversities.append(intra_list_diversity(service, batch.movie_ids))
+    samples = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+        "intra_list_diversity": round(float(np.nanmean(diversities)), 4),
+    }
+
+
+def run(
+    artifact_dir: Optional[Path], k_values: List[int], diversities: List[float], users: int, seed: int
+) -> Dict[str, Dict[str, float]]:
+    if artifact_dir is None:
+        artifact_dir = write_artifacts(Path(tempfile.mkdtemp()), SyntheticScale(seed=seed))
+    service = RecommenderService.from_settings(settings_for(artifact_dir))
+    rng = np.random.default_rng(seed)
+    user_ids = service.user_history["userId"].to_numpy()
+    sample = rng.choice(user_ids, size=min(users, user_ids.size), replace=False)
+
+    report = {}
+    for k in k_values:
+        for diversity in [0.0, *diversities]:
+            measure(service, sample[: max(len(sample) // 10, 1)], k, diversity)
+            report[f"k={k},diversity={diversity:g}"] = measure(service, sample, k, diversity)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--artifact-dir", type=Path, help="Exported artifacts; synthetic when omitted.")
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--diversity", type=float, nargs="+", default=[0.3, 0.7])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(run(args.artifact_dir, args.k, args.diversity, args.users, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
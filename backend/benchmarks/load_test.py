@@ -0,0 +1,200 @@
+"""
+In-process load test for the recommendation endpoints.
+
+Synthetic artifacts are generated at the requested scale (or an existing
+artifact directory is reused), the FastAPI app is driven through an
+in-process ASGI client at a fixed concurrency, and throughput plus
+p50/p95/p99 latency per endpoint are written as JSON so runs can be compared
+across commits. Run from the ``backend`` directory::
+
+    python -m benchmarks.load_test --items 20000 --users 50000 --concurrency 16 --output bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.main import app
+from app.services.executor import ScoringExecutor
+from app.services.recommender import RecommenderService
+from app.services.singleflight import SingleFlight
+
+from .synthetic import SyntheticScale, settings_for, write_artifacts
+
+RequestSpec = Tuple[str, str, Optional[dict]]
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _request_factories(artifact_dir: Path, k: int, seed: int) -> Dict[str, Callable[[], RequestSpec]]:
+    """Build per-endpoint generators of randomized requests."""
+
+    rng = np.random.default_rng(seed)
+    user_ids = pd.read_parquet(artifact_dir / "user_history.parquet", columns=["userId"])["userId"].to_numpy()
+    titles = pd.read_parquet(artifact_dir / "movie_meta.parquet", columns=["clean_title"])["clean_title"].to_numpy()
+    movie_ids = np.load(artifact_dir / "item_index.npy")
+
+    def popular() -> RequestSpec:
+        return "GET", f"/recommend/popular?k={k}", None
+
+    def itemcf() -> RequestSpec:
+        return "GET", f"/recommend/itemcf?user_id={int(rng.choice(user_ids))}&k={k}", None
+
+    def als() -> RequestSpec:
+        return "GET", f"/recommend/als?user_id={int(rng.choice(user_ids))}&k={k}", None
+
+    def hybrid() -> RequestSpec:
+        return "GET", f"/recommend/hybrid?user_id={int(rng.choice(user_ids))}&k={k}", None
+
+    def session() -> RequestSpec:
+        seeds = rng.choice(movie_ids, size=int(rng.integers(1, 8)), replace=False)
+        return "POST", f"/recommend/session?k={k}", {"movie_ids": [int(movie_id) for movie_id in seeds]}
+
+    def by_titles() -> RequestSpec:
+        seeds = rng.choice(titles, size=int(rng.integers(1, 4)), replace=False).tolist()
+        return "POST", f"/recommend/by-titles?k={k}", {"titles": seeds}
+
+    return {
+        "popular": popular,
+        "itemcf": itemcf,
+        "als": als,
+        "hybrid": hybrid,
+        "session": session,
+        "by-titles": by_titles,
+    }
+
+
+def _summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    samples = np.asarray(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "p99_ms": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    factory: Callable[[], RequestSpec],
+    total: int,
+    concurrency: int,
+) -> Dict[str, float]:
+    """Issue ``total`` requests with ``concurrency`` workers and summarize latency."""
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            method, url, body = factory()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 500:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return _summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_load_test(
+    artifact_dir: Path,
+    requests: int,
+    concurrency: int,
+    k: int,
+    warmup: int,
+    seed: int,
+    workers: int,
+) -> Dict[str, Dict[str, float]]:
+    settings = settings_for(artifact_dir, executor_workers=workers, executor_queue_size=concurrency * 4)
+    app.state.recommender = RecommenderService.from_settings(settings)
+    app.state.executor = ScoringExecutor.from_settings(settings)
+    app.state.single_flight = SingleFlight()
+    factories = _request_factories(artifact_dir, k, seed)
+    results: Dict[str, Dict[str, float]] = {}
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for endpoint, factory in factories.items():
+                await _drive(client, factory, warmup, concurrency)
+                results[endpoint] = await _drive(client, factory, requests, concurrency)
+    finally:
+        app.state.executor.shutdown()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="In-process API load test.")
+    parser.add_argument("--artifact-dir", type=Path, help="Reuse existing artifacts instead of generating.")
+    parser.add_argument("--items", type=int, default=SyntheticScale.items)
+    parser.add_argument("--users", type=int, default=SyntheticScale.users)
+    parser.add_argument("--history-length", type=int, default=SyntheticScale.history_length)
+    parser.add_argument("--neighbors", type=int, default=SyntheticScale.neighbors)
+    parser.add_argument("--requests", type=int, default=500, help="Measured requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per endpoint.")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--workers", type=int, default=4, help="Scoring pool size.")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the JSON report here as well as stdout.")
+    args = parser.parse_args()
+
+    scale = SyntheticScale(args.items, args.users, args.history_length, args.neighbors, seed=args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        artifact_dir = args.artifact_dir or write_artifacts(Path(tmp), scale)
+        endpoints = asyncio.run(
+            run_load_test(
+                artifact_dir,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                k=args.k,
+                warmup=args.warmup,
+                seed=args.seed,
+                workers=args.workers,
+            )
+        )
+
+    report = {
+        "revision": _git_revision(),
+        "scale": None if args.artifact_dir else asdict(scale),
+        "artifact_dir": str(args.artifact_dir) if args.artifact_dir else None,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "k": args.k,
+        "endpoints": endpoints,
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare response serialization paths for the recommendation endpoints.
+
+Run from the ``backend`` directory::
+
+    python -m benchmarks.serialization --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Dict, List
+
+import numpy as np
+from fastapi import FastAPI, Query
+from fastapi.testclient import TestClient
+
+from app.models.results import RecommendationBatch
+from app.models.schemas import RecommendationResponse, RecommendationsEnvelope
+from app.utils.serialization import envelope_response
+
+GENRES = ["Action", "Adventure", "Comedy", "Drama", "Romance", "Sci-Fi", "Thriller"]
+
+
+def synthetic_batch(k: int, seed: int = 0) -> RecommendationBatch:
+    """Create a result batch shaped like a real item-CF response."""
+
+    rng = np.random.default_rng(seed)
+    movie_ids = rng.choice(100_000, size=k, replace=False).astype(np.int64)
+    return RecommendationBatch(
+        movie_ids=movie_ids,
+        scores=np.sort(rng.random(k))[::-1],
+        titles=[f"Synthetic Movie {movie_id} (Director's Cut)" for movie_id in movie_ids.tolist()],
+        genres=[list(rng.choice(GENRES, size=3, replace=False)) for _ in range(k)],
+        reasons=["Because you liked Synthetic Movie 1"] * k,
+        source="item_cf",
+    )
+
+
+def build_app(batches: Dict[int, RecommendationBatch]) -> FastAPI:
+    """Expose the legacy model-based route next to the fast byte-level route."""
+
+    app = FastAPI()
+
+    @app.get("/legacy", response_model=RecommendationsEnvelope)
+    async def legacy(k: int = Query(10)) -> RecommendationsEnvelope:
+        results = batches[k].to_records()
+        return RecommendationsEnvelope(
+            user_id=1,
+            algorithm="item_cf",
+            items=[RecommendationResponse(**item) for item in results],
+        )
+
+    @app.get("/fast", response_model=RecommendationsEnvelope)
+    async def fast(k: int = Query(10)):
+        return envelope_response(1, "item_cf", batches[k])
+
+    return app
+
+
+def measure(client: TestClient, path: str, iterations: int) -> Dict[str, float]:
+    """Issue sequential requests and summarize latency in milliseconds."""
+
+    latencies: List[float] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    samples = np.asarray(latencies)
+    return {
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p99_ms": round(float(np.percentile(samples, 99)), 4),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--k", type=int, nargs="+", default=[10, 200])
+    args = parser.parse_args()
+
+    batches = {k: synthetic_batch(k) for k in args.k}
+    client = TestClient(build_app(batches))
+    for k in args.k:
+        assert client.get(f"/legacy?k={k}").json() == client.get(f"/fast?k={k}").json()
+
+    report = {}
+    for k in args.k:
+        for path in ("legacy", "fast"):
+            measure(client, f"/{path}?k={k}", iterations=max(args.iterations // 10, 1))
+            report[f"{path}@k={k}"] = measure(client, f"/{path}?k={k}", args.iterations)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
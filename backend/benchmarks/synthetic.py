@@ -0,0 +1,174 @@
+"""
+Generate synthetic serving artifacts at configurable scales.
+
+The files mirror what ``scripts.cli`` writes, so a generated directory can be
+loaded by ``RecommenderService.from_settings`` without running the offline
+pipeline on real MovieLens data.
+"""
+
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from app.core.config import Settings
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Animation",
+    "Children's",
+    "Comedy",
+    "Crime",
+    "Documentary",
+    "Drama",
+    "Fantasy",
+    "Film-Noir",
+    "Horror",
+    "Musical",
+    "Mystery",
+    "Romance",
+    "Sci-Fi",
+    "Thriller",
+    "War",
+    "Western",
+]
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    """Size parameters for a synthetic artifact set."""
+
+    items: int = 4_000
+    users: int = 6_000
+    history_length: int = 150
+    neighbors: int = 100
+    factors: int = 64
+    seed: int = 42
+
+
+def _neighbor_matrix(rng: np.random.Generator, items: int, neighbors: int) -> sparse.csr_matrix:
+    """Random non-negative similarity matrix with ``neighbors`` entries per row."""
+
+    neighbors = min(neighbors, items - 1)
+    cols = rng.integers(0, items - 1, size=(items, neighbors))
+    rows = np.repeat(np.arange(items), neighbors)
+    cols = cols.ravel()
+    cols[cols >= rows] += 1  # skip the diagonal
+    data = rng.random(rows.size).astype(np.float64)
+    matrix = sparse.csr_matrix((data, (rows, cols)), shape=(items, items))
+    matrix.sum_duplicates()
+    return matrix
+
+
+def settings_for(artifact_dir: Path, **overrides: object) -> Settings:
+    """Build settings pointing every artifact path at ``artifact_dir``; ``overrides`` win."""
+
+    values: dict = dict(
+        artifact_dir=artifact_dir,
+        popularity_path=artifact_dir / "pop_score.parquet",
+        item_neighbors_path=artifact_dir / "item_neighbors.npz",
+        item_index_path=artifact_dir / "item_index.npy",
+        content_neighbors_path=artifact_dir / "content_neighbors.npz",
+        content_index_path=artifact_dir / "content_index.npy",
+        user_history_path=artifact_dir / "user_history.parquet",
+        movie_meta_path=artifact_dir / "movie_meta.parquet",
+        als_user_factors_path=artifact_dir / "als_user_factors.npy",
+        als_item_factors_path=artifact_dir / "als_item_factors.npy",
+        als_user_index_path=artifact_dir / "als_user_index.npy",
+        als_item_index_path=artifact_dir / "als_item_index.npy",
+    )
+    values.update(overrides)
+    return Settings(**values)
+
+
+def write_artifacts(output_dir: Path, scale: SyntheticScale = SyntheticScale()) -> Path:
+    """Write a full synthetic artifact set to ``output_dir`` and return it."""
+
+    rng = np.random.default_rng(scale.seed)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    movie_ids = np.sort(rng.choice(scale.items * 10, size=scale.items, replace=False) + 1).astype(np.int32)
+
+    # Power-law popularity so histories concentrate on a head of titles.
+    popularity = 1.0 / np.arange(1, scale.items + 1) ** 0.9
+    popularity = popularity[rng.permutation(scale.items)]
+    popularity /= popularity.sum()
+
+    years = rng.integers(1920, 2024, size=scale.items)
+    genres = [list(rng.choice(GENRES, size=rng.integers(1, 4), replace=False)) for _ in range(scale.items)]
+    titles = [f"Synthetic Movie {movie_id}" for movie_id in movie_ids.tolist()]
+    pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "title": [f"{title} ({year})" for title, year in zip(titles, years.tolist())],
+            "genres": ["|".join(values) for values in genres],
+            "year": years.astype(float),
+            "genres_list": genres,
+            "clean_title": titles,
+        }
+    ).to_parquet(output_dir / "movie_meta.parquet", index=False)
+
+    counts = np.maximum(rng.poisson(popularity * scale.users * scale.history_length), 1)
+    pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "bayesian_score": rng.uniform(2.5, 4.5, size=scale.items),
+            "rating_count": counts,
+            "positive_ratio": rng.random(scale.items),
+        }
+    ).sort_values("bayesian_score", ascending=False).to_parquet(
+        output_dir / "pop_score.parquet", index=False
+    )
+
+    lengths = np.clip(
+        rng.lognormal(np.log(scale.history_length), 0.6, size=scale.users).astype(int),
+        1,
+        scale.items,
+    )
+    watched, liked = [], []
+    for length in lengths.tolist():
+        items = movie_ids[rng.choice(scale.items, size=length, replace=False, p=popularity)]
+        watched.append(items.tolist())
+        liked.append(items[rng.random(length) < 0.55].tolist())
+    pd.DataFrame(
+        {"userId": np.arange(1, scale.users + 1), "watched_items": watched, "liked_items": liked}
+    ).to_parquet(output_dir / "user_history.parquet", index=False)
+
+    for name in ("item", "content"):
+        sparse.save_npz(
+            output_dir / f"{name}_neighbors.npz",
+            _neighbor_matrix(rng, scale.items, scale.neighbors),
+        )
+        np.save(output_dir / f"{name}_index.npy", movie_ids)
+
+    for name, rows in (("user", scale.users), ("item", scale.items)):
+        factors = rng.standard_normal((rows, scale.factors), dtype=np.float32)
+        np.save(output_dir / f"als_{name}_factors.npy", factors)
+    np.save(output_dir / "als_user_index.npy", np.arange(1, scale.users + 1, dtype=np.int32))
+    np.save(output_dir / "als_item_index.npy", movie_ids)
+    return output_dir
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write synthetic serving artifacts.")
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--items", type=int, default=SyntheticScale.items)
+    parser.add_argument("--users", type=int, default=SyntheticScale.users)
+    parser.add_argument("--history-length", type=int, default=SyntheticScale.history_length)
+    parser.add_argument("--neighbors", type=int, default=SyntheticScale.neighbors)
+    parser.add_argument("--factors", type=int, default=SyntheticScale.factors)
+    parser.add_argument("--seed", type=int, default=SyntheticScale.seed)
+    args = parser.parse_args()
+    scale = SyntheticScale(
+        args.items, args.users, args.history_length, args.neighbors, args.factors, args.seed
+    )
+    print(write_artifacts(args.output_dir, scale))
+
+
+if __name__ == "__main__":
+    main()
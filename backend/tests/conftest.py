@@ -0,0 +1,54 @@
+"""
+Shared fixtures for backend tests.
+"""
+
+from __future__ import annotations
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.datasets import DatasetManager
+from app.services.events import RatingEventLog
+from app.services.pagination import CursorStore
+from app.services.recommender import RecommenderService
+from app.services.singleflight import SingleFlight
+from benchmarks.synthetic import SyntheticScale, settings_for, write_artifacts
+
+
+@pytest.fixture(scope="session")
+def synthetic_artifacts(tmp_path_factory):
+    """A small synthetic artifact directory shared by the whole session."""
+
+    scale = SyntheticScale(items=300, users=200, history_length=30, neighbors=20, seed=7)
+    return write_artifacts(tmp_path_factory.mktemp("artifacts"), scale)
+
+
+@pytest.fixture()
+def synthetic_settings(synthetic_artifacts):
+    return settings_for(synthetic_artifacts)
+
+
+@pytest.fixture()
+def app_state():
+    """``app.state``, with every attribute put back as it was once the test is done."""
+
+    saved = dict(app.state._state)
+    yield app.state
+    app.state._state.clear()
+    app.state._state.update(saved)
+
+
+@pytest.fixture()
+def client(app_state, synthetic_settings, tmp_path):
+    """A TestClient whose app serves the synthetic artifacts with fresh cursors, flights and event log."""
+
+    recommender = RecommenderService.from_settings(synthetic_settings)
+    app_state.recommender = recommender
+    app_state.single_flight = SingleFlight()
+    app_state.cursors = CursorStore.from_settings(synthetic_settings)
+    app_state.event_log = RatingEventLog(tmp_path / "rating_events.csv")
+    app_state.datasets = DatasetManager.from_settings(synthetic_settings)
+    app_state.datasets.attach(synthetic_settings.default_dataset, recommender)
+    yield TestClient(app)
+    app_state.event_log.close()
@@ -0,0 +1,42 @@
+"""
+Tests for serving the implicit ALS factors.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.main import app
+from app.services.recommender import RecommenderService
+from benchmarks.synthetic import settings_for
+
+
+def test_als_ranks_unseen_titles_by_dot_product(synthetic_settings):
+    """Scores are the user's factor dot products, best first, with watched titles removed."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    model = service.als_model
+    history = service.user_history.set_index("userId").loc[5]
+
+    batch = service.recommend_als(5, k=20)
+
+    expected = model["item_factors"] @ model["user_factors"][model["users"].position(5)]
+    positions = model["items"].lookup(batch.movie_ids)
+    assert len(batch) == 20
+    assert np.allclose(batch.scores, expected[positions])
+    assert np.all(np.diff(batch.scores) <= 0)
+    assert not set(batch.movie_ids.tolist()) & set(history["watched_items"].tolist())
+    assert set(batch.reasons) == {"Matches your taste profile."}
+
+
+def test_als_endpoint_reports_missing_users_and_models(client, synthetic_artifacts, tmp_path):
+    """Unknown users get a 404, and so does every user when no factors were exported."""
+
+    assert client.get("/recommend/als?user_id=3&k=5").json()["algorithm"] == "als"
+    assert client.get("/recommend/als?user_id=99999&k=5").status_code == 404
+
+    missing = tmp_path / "missing.npy"
+    settings = settings_for(synthetic_artifacts, als_item_factors_path=missing)
+    app.state.recommender = RecommenderService.from_settings(settings)
+    assert "als" not in app.state.recommender.artifacts.families
+    assert client.get("/recommend/als?user_id=3&k=5").status_code == 404
@@ -0,0 +1,50 @@
+"""
+Tests for artifact loading helpers.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+from scipy import sparse
+
+from app.utils.artifacts import ArtifactRegistry, IdIndex, load_item_neighbors
+
+
+def test_id_index_lookup_marks_unknown_ids():
+    """Known ids resolve to their positions while unknown ids map to -1."""
+
+    index = IdIndex(np.array([3, 7, 42], dtype=np.int32))
+    assert index.lookup([42, 3, 5, 100]).tolist() == [2, 0, -1, -1]
+    assert index.position(7) == 1
+    assert index.position(8) is None
+
+
+def test_legacy_json_index_is_reordered(tmp_path):
+    """Unsorted JSON indexes are converted, the matrix permuted and used when the ``.npy`` is missing."""
+
+    matrix = sparse.csr_matrix(np.array([[0.0, 0.5], [0.25, 0.0]]))
+    sparse.save_npz(tmp_path / "item_neighbors.npz", matrix)
+    with (tmp_path / "item_index.json").open("w", encoding="utf-8") as fp:
+        json.dump({"movie_index": {"20": 0, "10": 1}, "index_movie": {"0": 20, "1": 10}}, fp)
+
+    loaded = load_item_neighbors(tmp_path / "item_neighbors.npz", tmp_path / "item_index.json")
+
+    assert loaded["index"].ids.tolist() == [10, 20]
+    assert loaded["matrix"].toarray().tolist() == [[0.0, 0.25], [0.5, 0.0]]
+
+    fallback = load_item_neighbors(tmp_path / "item_neighbors.npz", tmp_path / "item_index.npy")
+    assert fallback["index"].ids.tolist() == [10, 20]
+
+
+def test_registry_loads_lazily_once():
+    """Families are loaded on first access and cached afterwards."""
+
+    calls = []
+    registry = ArtifactRegistry({"popularity": lambda: calls.append(1) or "scores"})
+    assert not registry.is_loaded("popularity")
+    assert registry.get("popularity") == "scores"
+    assert registry.get("popularity") == "scores"
+    assert calls == [1]
+    assert "popularity" in registry.timings
@@ -0,0 +1,23 @@
+"""
+Smoke tests keeping the benchmark drivers runnable.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from benchmarks.load_test import run_load_test
+
+
+def test_load_test_reports_latency_per_endpoint(app_state, synthetic_artifacts):
+    """A tiny load test exercises every endpoint without server errors."""
+
+    report = asyncio.run(
+        run_load_test(synthetic_artifacts, requests=10, concurrency=2, k=5, warmup=2, seed=1, workers=2)
+    )
+
+    assert set(report) == {"popular", "itemcf", "als", "hybrid", "session", "by-titles"}
+    for summary in report.values():
+        assert summary["requests"] == 10
+        assert summary["errors"] == 0
+        assert summary["p50_ms"] <= summary["p99_ms"]
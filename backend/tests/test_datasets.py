@@ -0,0 +1,97 @@
+"""
+Tests for serving several named artifact sets under a memory budget.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.services.datasets import DatasetManager, UnknownDataset, footprint
+from app.services.recommender import RecommenderService
+from benchmarks.synthetic import SyntheticScale, settings_for, write_artifacts
+
+
+@pytest.fixture(scope="module")
+def second_artifacts(tmp_path_factory):
+    scale = SyntheticScale(items=200, users=100, history_length=20, neighbors=10, seed=11)
+    return write_artifacts(tmp_path_factory.mktemp("second"), scale)
+
+
+def test_settings_move_artifact_paths_to_another_directory(synthetic_settings, tmp_path):
+    """Only paths inside the artifact directory follow it; other overrides are kept."""
+
+    shared = tmp_path / "shared" / "movie_meta.parquet"
+    moved = synthetic_settings.model_copy(update={"movie_meta_path": shared}).for_artifact_dir(tmp_path / "b")
+
+    assert moved.artifact_dir == (tmp_path / "b").resolve()
+    assert moved.item_neighbors_path == (tmp_path / "b" / "item_neighbors.npz").resolve()
+    assert moved.movie_meta_path == shared
+
+
+def test_least_recently_used_sets_are_evicted_over_budget(synthetic_settings, second_artifacts):
+    """Loading past the budget drops the stalest unpinned set; pinned sets stay."""
+
+    loads = []
+
+    def loader(settings):
+        loads.append(settings.artifact_dir)
+        return RecommenderService.from_settings(settings)
+
+    named = {
+        "default": synthetic_settings,
+        "a": settings_for(second_artifacts),
+        "b": settings_for(second_artifacts).model_copy(update={"artifact_dir": second_artifacts / "b"}),
+    }
+    manager = DatasetManager(named, default="default", loader=loader)
+    manager.attach("default", RecommenderService.from_settings(synthetic_settings))
+    first = manager.get("a")
+    manager.budget_bytes = manager.sizes()["default"] + int(footprint(first) * 1.5)
+
+    assert manager.get("a") is first and len(loads) == 1
+    manager.get("b")
+    sizes = manager.sizes()
+    assert sizes["a"] == 0 and sizes["b"] > 0 and sizes["default"] > 0
+    assert manager.get("a") is not first and manager.sizes()["b"] == 0 and len(loads) == 3
+    with pytest.raises(UnknownDataset):
+        manager.get("missing")
+    with pytest.raises(UnknownDataset):
+        manager.loaded("missing")
+
+
+def test_dataset_query_parameter_selects_the_artifact_set(client, synthetic_settings, second_artifacts):
+    """``?dataset=`` serves from the named set; unknown names are 404 and other sets take no ratings."""
+
+    named = {"default": synthetic_settings, "small": settings_for(second_artifacts)}
+    app.state.datasets = DatasetManager(named, default="default")
+    app.state.datasets.attach("default", app.state.recommender)
+
+    assert app.state.datasets.loaded("small") is None
+    served = client.get("/recommend/popular?k=5&dataset=small").json()["items"]
+    small = app.state.datasets.loaded("small")
+    assert small is not None and app.state.datasets.get("small") is small
+    expected = small.recommend_popular(None, k=5).movie_ids
+    assert np.array_equal([item["movie_id"] for item in served], expected)
+    assert client.get("/recommend/itemcf?user_id=4&dataset=default").status_code == 200
+    assert client.get("/recommend/popular?dataset=missing").status_code == 404
+    assert client.get("/datasets").json()["datasets"]["small"] == footprint(small)
+    rating = {"user_id": 4, "movie_id": 1, "rating": 5.0}
+    assert client.post("/events/rating?dataset=small", json=rating).status_code == 400
+
+
+def test_cursors_stay_with_their_dataset(client, synthetic_settings, second_artifacts):
+    """A cursor only pages within the dataset it was issued for, and paging never loads a set."""
+
+    named = {"default": synthetic_settings, "small": settings_for(second_artifacts)}
+    app.state.datasets = DatasetManager(named, default="default")
+    app.state.datasets.attach("default", app.state.recommender)
+
+    cursor = client.get("/recommend/popular?k=5").json()["next_cursor"]
+    assert client.get(f"/recommend/popular?k=5&cursor={cursor}&dataset=small").status_code == 410
+    assert app.state.datasets.loaded("small") is None
+    assert client.get(f"/recommend/popular?k=5&cursor={cursor}&dataset=default").status_code == 200
+
+    cursor = client.get("/recommend/popular?k=5&dataset=small").json()["next_cursor"]
+    assert client.get(f"/recommend/popular?k=5&cursor={cursor}").status_code == 410
+    assert client.get(f"/recommend/popular?k=5&cursor={cursor}&dataset=small").status_code == 200
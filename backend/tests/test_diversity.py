@@ -0,0 +1,85 @@
+"""
+Tests for MMR diversity re-ranking.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.main import app
+from app.services.recommender import MMR_POOL_SIZE, RecommenderService
+
+
+def _naive_mmr(relevance, similarity, k, diversity):
+    relevance = (relevance - relevance.min()) / (relevance.max() - relevance.min())
+    picked = []
+    while len(picked) < k:
+        best, best_value = None, -np.inf
+        for candidate in range(relevance.size):
+            if candidate in picked:
+                continue
+            closest = max((similarity[candidate, other] for other in picked), default=0.0)
+            value = (1 - diversity) * relevance[candidate] - diversity * closest
+            if value > best_value:
+                best, best_value = candidate, value
+        picked.append(best)
+    return picked
+
+
+def test_mmr_matches_the_greedy_definition(synthetic_settings):
+    """The vectorized MMR picks the same items as a direct implementation, for any score offset."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    movie_ids = service.content_ids.ids[:40].astype(np.int64)
+    draws = np.random.default_rng(3).random(40)
+    block = service._dense_block(service.content_similarity, np.arange(40), np.arange(40))
+    similarity = np.maximum(block, block.T)
+
+    # Shifted (popularity-like) and negative (ALS-like) scores must span the full relevance range too.
+    for relevance in (draws, 3.5 + draws, draws - 2.0):
+        for diversity in (0.2, 0.6):
+            order = service._mmr(relevance, movie_ids, 12, diversity).tolist()
+            assert order == _naive_mmr(relevance, similarity, 12, diversity)
+    assert service._mmr(np.empty(0), np.empty(0, dtype=np.int64), 5, 0.5).size == 0
+
+
+def test_diversity_reranks_within_the_candidate_pool(synthetic_settings):
+    """Diverse lists come from the relevance pool, skip watched titles and lower content overlap."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    _, watched = service.user_items(11)
+    plain = service.recommend_item_cf(11, k=20)
+    pool = service.recommend_item_cf(11, k=MMR_POOL_SIZE)
+    diverse = service.recommend_item_cf(11, k=20, diversity=0.7)
+
+    assert len(diverse) == 20 and diverse.movie_ids[0] == plain.movie_ids[0]
+    assert set(diverse.movie_ids.tolist()) <= set(pool.movie_ids.tolist())
+    assert not set(diverse.movie_ids.tolist()) & set(watched)
+
+    def overlap(movie_ids):
+        positions = service.content_ids.lookup(movie_ids)
+        block = service._dense_block(service.content_similarity, positions, positions)
+        return np.maximum(block, block.T).sum()
+
+    assert overlap(diverse.movie_ids) < overlap(plain.movie_ids)
+    assert len(service.recommend_popular(None, k=15, diversity=0.5)) == 15
+
+
+def test_diversity_query_parameter(monkeypatch, client):
+    """``diversity`` is validated to ``[0, 1]`` and re-ranks only the requested page."""
+
+    calls = []
+    original = RecommenderService.recommend_item_cf
+
+    def recording(self, user_id, k, **kwargs):
+        calls.append((k, kwargs.get("diversity", 0.0)))
+        return original(self, user_id, k, **kwargs)
+
+    monkeypatch.setattr(RecommenderService, "recommend_item_cf", recording)
+    response = client.get("/recommend/itemcf?user_id=4&k=10&diversity=0.4")
+    assert response.status_code == 200 and len(response.json()["items"]) == 10
+    assert response.json()["next_cursor"] is None
+    assert client.get("/recommend/itemcf?user_id=4&k=10").json()["next_cursor"] is not None
+    assert calls == [(10, 0.4), (app.state.cursors.ranking_depth(10), 0.0)]
+    assert app.state.cursors.ranking_depth(10) == 50 < app.state.cursors.depth
+    assert client.get("/recommend/itemcf?user_id=4&diversity=1.5").status_code == 422
@@ -0,0 +1,97 @@
+"""
+Tests for real-time rating ingestion.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from app.main import app
+from app.services.events import HistoryOverlay, RatingEvent, RatingEventLog
+from app.services.executor import ScoringExecutor
+from app.services.pagination import CursorStore
+from app.services.recommender import RecommenderService
+
+
+def test_overlay_merges_new_and_changed_ratings(tmp_path):
+    """New titles are appended, re-ratings move titles in and out of the liked list, users are bounded."""
+
+    overlay = HistoryOverlay(liked_threshold=4.0)
+    for movie_id, rating in ((10, 5.0), (1, 2.0), (30, 3.0)):
+        overlay.apply(RatingEvent(user_id=7, movie_id=movie_id, rating=rating, timestamp=0))
+
+    liked, watched = overlay.merge(7, liked=[1, 2], watched=[1, 2, 3])
+    assert liked == [2, 10]
+    assert watched == [1, 2, 3, 10, 30]
+    assert overlay.merge(8, [1], [1]) == ([1], [1])
+
+    bounded = HistoryOverlay(max_users=2)
+    for user_id in (1, 2, 1, 3):
+        bounded.apply(RatingEvent(user_id=user_id, movie_id=10, rating=5.0, timestamp=0))
+    assert len(bounded) == 2 and 1 in bounded and 2 not in bounded and 3 in bounded
+
+    log = RatingEventLog(tmp_path / "events" / "ratings.csv")
+    log.append(RatingEvent(7, 10, 5.0, 100))
+    log.append(RatingEvent(7, 11, 3.5, 101))
+    log.close()
+    log.append(RatingEvent(8, 12, 4.0, 102))
+    log.close()
+    frame = pd.read_csv(tmp_path / "events" / "ratings.csv")
+    assert frame.columns.tolist() == ["userId", "movieId", "rating", "timestamp"]
+    assert frame["movieId"].tolist() == [10, 11, 12] and frame["rating"].tolist() == [5.0, 3.5, 4.0]
+
+
+def test_rating_endpoint_updates_recommendations(client, tmp_path):
+    """Ratings take effect on the next request, drop stored pages and make new users servable."""
+
+    app.state.cursors = CursorStore(depth=50)
+
+    first = client.get("/recommend/itemcf?user_id=4&k=5").json()
+    top = first["items"][0]["movie_id"]
+    ack = client.post("/events/rating", json={"user_id": 4, "movie_id": top, "rating": 5.0})
+    assert ack.status_code == 202 and ack.json() == {"accepted": 1, "invalidated": 1}
+    assert client.get(f"/recommend/itemcf?user_id=4&k=5&cursor={first['next_cursor']}").status_code == 410
+    after = [item["movie_id"] for item in client.get("/recommend/itemcf?user_id=4&k=50").json()["items"]]
+    assert top not in after
+
+    assert client.get("/recommend/itemcf?user_id=99999").status_code == 404
+    batch = [
+        {"user_id": 99999, "movie_id": top, "rating": 4.5, "timestamp": 5},
+        {"user_id": 5, "movie_id": 1, "rating": 1},
+    ]
+    assert client.post("/events/rating", json=batch).json()["accepted"] == 2
+    assert client.get("/recommend/itemcf?user_id=99999").status_code == 200
+    assert client.post("/events/rating", json={"user_id": 1, "movie_id": 1, "rating": 9}).status_code == 422
+    rating = {"user_id": 1, "movie_id": 1, "rating": 4}
+    assert client.post("/events/rating?dataset=default", json=rating).status_code == 202
+    assert client.post("/events/rating?dataset=missing", json=rating).status_code == 404
+
+    app.state.event_log.close()
+    logged = pd.read_csv(tmp_path / "rating_events.csv")
+    assert logged["userId"].tolist() == [4, 99999, 5, 1] and logged["timestamp"].iloc[1] == 5
+
+
+def test_process_workers_see_ratings_ingested_by_the_api(synthetic_settings):
+    """Scoring calls carry the user's overlay to process workers, so results match the API process."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    service.dataset = synthetic_settings.default_dataset
+    executor = ScoringExecutor(kind="process", max_workers=1, timeout=30.0, settings=synthetic_settings)
+    seed = int(service.recommend_item_cf(4, 1).movie_ids[0])
+
+    async def item_cf(user_id):
+        return await executor.run(service, "recommend_item_cf", user_id=user_id, k=10)
+
+    try:
+        before = asyncio.run(item_cf(4))
+        service.record_rating(RatingEvent(user_id=4, movie_id=seed, rating=5.0, timestamp=0))
+        service.record_rating(RatingEvent(user_id=99999, movie_id=seed, rating=5.0, timestamp=0))
+        for user_id in (4, 99999):
+            served = asyncio.run(item_cf(user_id))
+            assert np.array_equal(served.movie_ids, service.recommend_item_cf(user_id, 10).movie_ids)
+        assert seed in before.movie_ids.tolist() and seed not in served.movie_ids.tolist()
+    finally:
+        executor.shutdown()
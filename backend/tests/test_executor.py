@@ -0,0 +1,60 @@
+"""
+Tests for the bounded scoring executor.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.executor import ScoringExecutor, ScoringTimeout, ServiceOverloaded
+
+
+class BlockingService:
+    def __init__(self) -> None:
+        self.release = threading.Event()
+
+    def recommend_popular(self, user_id, k):
+        self.release.wait(timeout=5)
+        return []
+
+
+def test_executor_rejects_when_queue_full_and_times_out():
+    """Calls beyond workers + queue are shed, and slow calls hit the timeout."""
+
+    service = BlockingService()
+    executor = ScoringExecutor(max_workers=1, max_queue=0, timeout=0.1, retry_after=3)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.run(service, "recommend_popular", user_id=None, k=1))
+        await asyncio.sleep(0.01)
+        with pytest.raises(ServiceOverloaded) as overloaded:
+            await executor.run(service, "recommend_popular", user_id=None, k=1)
+        assert overloaded.value.retry_after == 3
+        with pytest.raises(ScoringTimeout):
+            await first
+
+    try:
+        asyncio.run(scenario())
+        assert executor.in_flight == 1
+    finally:
+        service.release.set()
+        executor.shutdown()
+
+
+def test_overloaded_executor_returns_503_with_retry_after(monkeypatch):
+    """The API maps a saturated executor to a retryable 503."""
+
+    class SaturatedExecutor:
+        async def run(self, recommender, method, **kwargs):
+            raise ServiceOverloaded(retry_after=2)
+
+    monkeypatch.setattr(app.state, "recommender", object())
+    monkeypatch.setattr(app.state, "executor", SaturatedExecutor())
+    response = TestClient(app).get("/recommend/popular?k=5")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
@@ -0,0 +1,64 @@
+"""
+Tests for request-time genre, year and exclusion filters.
+"""
+
+from __future__ import annotations
+
+from app.main import app
+from app.services.filters import ItemFilter
+from app.services.recommender import RecommenderService
+
+
+def _passes(service: RecommenderService, movie_id: int, item_filter: ItemFilter) -> bool:
+    meta = service._lookup_metadata(movie_id)
+    genres = {genre.casefold() for genre in meta["genres"]}
+    return (
+        (not item_filter.genres or bool(genres & set(item_filter.genres)))
+        and (item_filter.year_min is None or meta["year"] >= item_filter.year_min)
+        and (item_filter.year_max is None or meta["year"] <= item_filter.year_max)
+        and movie_id not in item_filter.exclude
+    )
+
+
+def test_filters_apply_to_every_algorithm(synthetic_settings):
+    """Every returned title passes the filter and the list is the unfiltered ranking restricted to it."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    excluded = int(service.recommend_item_cf(11, k=1).movie_ids[0])
+    item_filter = ItemFilter(genres=("drama", "comedy"), year_min=1960, year_max=2000, exclude=(excluded,))
+    calls = {
+        "popular": lambda **kw: service.recommend_popular(None, **kw),
+        "item_cf": lambda **kw: service.recommend_item_cf(11, **kw),
+        "als": lambda **kw: service.recommend_als(11, **kw),
+        "hybrid": lambda **kw: service.recommend_hybrid(11, **kw),
+    }
+    for name, call in calls.items():
+        batch = call(k=10, filters=item_filter)
+        assert len(batch), name
+        assert all(_passes(service, movie_id, item_filter) for movie_id in batch.movie_ids.tolist()), name
+        unfiltered = call(k=300).movie_ids.tolist()
+        expected = [movie_id for movie_id in unfiltered if _passes(service, movie_id, item_filter)]
+        # Items tied at zero score may come back in any order.
+        ranked = int((batch.scores > 0).sum())
+        assert batch.movie_ids.tolist()[:ranked] == expected[:ranked], name
+
+    assert not service.recommend_popular(None, k=5, filters=ItemFilter(genres=("no-such-genre",)))
+    assert ItemFilter() == ItemFilter(genres=(), exclude=()) and not ItemFilter()
+
+
+def test_filter_query_parameters(client):
+    """Filters are repeatable query parameters; inverted year bounds are rejected."""
+
+    response = client.get("/recommend/itemcf?user_id=4&k=5&genre=Drama&genre=Horror&year_min=1990")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items
+    for item in items:
+        assert {"Drama", "Horror"} & set(item["genres"])
+        assert app.state.recommender._lookup_metadata(item["movie_id"])["year"] >= 1990
+
+    popular = client.get("/recommend/popular?k=3").json()["items"]
+    excluded = "&".join(f"exclude={item['movie_id']}" for item in popular)
+    remaining = client.get(f"/recommend/popular?k=3&{excluded}").json()["items"]
+    assert not {item["movie_id"] for item in popular} & {item["movie_id"] for item in remaining}
+    assert client.get("/recommend/popular?year_min=2000&year_max=1990").status_code == 422
@@ -0,0 +1,38 @@
+"""
+Tests for the blended hybrid recommendations.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.services.recommender import RecommenderService
+
+
+def test_hybrid_reduces_to_single_models_and_skips_watched(synthetic_settings):
+    """A single non-zero weight reproduces that model's ranking; watched titles never appear."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    history = service.user_history.set_index("userId").loc[11]
+
+    item_cf_only = service.recommend_hybrid(11, k=10, weights=(0.0, 1.0, 0.0))
+    assert item_cf_only.movie_ids.tolist() == service.recommend_item_cf(11, k=10).movie_ids.tolist()
+
+    blended = service.recommend_hybrid(11, k=25)
+    assert len(blended) == 25
+    assert np.all(np.diff(blended.scores) <= 0)
+    assert not set(blended.movie_ids.tolist()) & set(history["watched_items"].tolist())
+    assert blended.scores.max() <= sum((0.1, 0.6, 0.3)) + 1e-9
+    assert all(reason for reason in blended.reasons)
+
+
+def test_hybrid_endpoint_validates_weights(client):
+    """Weights are query parameters; an all-zero blend is rejected."""
+
+    response = client.get("/recommend/hybrid?user_id=4&k=5&popularity_weight=0.5&content_weight=0")
+    assert response.status_code == 200
+    assert response.json()["algorithm"] == "hybrid"
+    assert len(response.json()["items"]) == 5
+    zero = "/recommend/hybrid?user_id=4&popularity_weight=0&item_cf_weight=0&content_weight=0"
+    assert client.get(zero).status_code == 422
+    assert client.get("/recommend/hybrid?user_id=99999").status_code == 404
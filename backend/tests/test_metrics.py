@@ -0,0 +1,42 @@
+"""
+Tests for the in-process metrics registry and endpoint.
+"""
+
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    """Histogram samples are cumulative and end with sum and count lines."""
+
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo latency.", ("stage",), buckets=(0.1, 1.0))
+    latency.observe(0.05, stage="scoring")
+    latency.observe(0.5, stage="scoring")
+
+    text = registry.render()
+
+    assert 'demo_seconds_bucket{stage="scoring",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="scoring",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{stage="scoring"} 2' in text
+
+
+def test_metrics_endpoint_reports_request_latency(monkeypatch):
+    """Requests are recorded per route template and exposed on /metrics."""
+
+    class DummyService:
+        def recommend_popular(self, user_id, k):
+            return [{"movie_id": 1, "title": "Dummy", "genres": [], "score": 1.0, "source": "popular"}]
+
+    monkeypatch.setattr(app.state, "recommender", DummyService())
+    client = TestClient(app)
+    assert client.get("/recommend/popular?k=1").status_code == 200
+
+    body = client.get("/metrics").text
+
+    assert 'recsys_request_duration_seconds_count{endpoint="/recommend/popular",method="GET",status="200"}' in body
+    assert 'recsys_stage_duration_seconds_count{endpoint="popular",stage="serialization"}' in body
@@ -0,0 +1,72 @@
+"""
+Tests for cursor pagination over stored candidate lists.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.main import app
+from app.models.results import RecommendationBatch
+from app.services.pagination import CursorStore, InvalidCursor
+
+
+def _batch(size: int) -> RecommendationBatch:
+    return RecommendationBatch(
+        movie_ids=np.arange(size, dtype=np.int64),
+        scores=np.linspace(1.0, 0.0, size),
+        titles=[f"Movie {index}" for index in range(size)],
+        genres=[[] for _ in range(size)],
+        reasons=[None] * size,
+        source="item_cf",
+    )
+
+
+def test_cursor_store_slices_expires_and_bounds():
+    """Pages are consecutive slices; entries expire after the TTL and beyond the size bound."""
+
+    now = [0.0]
+    store = CursorStore(ttl_seconds=10.0, max_entries=2, clock=lambda: now[0])
+
+    page, cursor = store.first_page("item_cf", 7, _batch(25), k=10)
+    assert page.movie_ids.tolist() == list(range(10))
+    user_id, page, cursor = store.next_page(cursor, "item_cf", k=10)
+    assert user_id == 7 and page.movie_ids.tolist() == list(range(10, 20))
+    _, page, last = store.next_page(cursor, "item_cf", k=10)
+    assert page.movie_ids.tolist() == list(range(20, 25)) and last is None
+    assert store.next_page(cursor, "als", k=10) is None
+
+    assert store.first_page("item_cf", 7, _batch(5), k=10)[1] is None
+    now[0] = 11.0
+    assert store.next_page(cursor, "item_cf", k=10) is None
+
+    cursors = [store.first_page("popular", None, _batch(20), k=5)[1] for _ in range(3)]
+    assert len(store) == 2
+    assert store.next_page(cursors[0], "popular", k=5) is None
+    assert store.next_page(cursors[2], "popular", k=5) is not None
+    with pytest.raises(InvalidCursor):
+        store.next_page("not a cursor", "popular", k=5)
+
+    bounded = CursorStore(depth=100, overfetch=3)
+    assert [bounded.ranking_depth(k) for k in (10, 40, 150)] == [30, 100, 150]
+
+
+def test_endpoint_pages_match_a_single_large_request(client):
+    """Following next_cursor yields the same ranking as asking for all items at once."""
+
+    app.state.cursors = CursorStore(depth=30)
+
+    expected = [item["movie_id"] for item in client.get("/recommend/itemcf?user_id=4&k=30").json()["items"]]
+    seen, url = [], "/recommend/itemcf?user_id=4&k=12"
+    while True:
+        payload = client.get(url).json()
+        seen += [item["movie_id"] for item in payload["items"]]
+        if payload["next_cursor"] is None:
+            break
+        url = f"/recommend/itemcf?user_id=4&k=12&cursor={payload['next_cursor']}"
+    assert seen == expected
+
+    cursor = client.get("/recommend/popular?k=5").json()["next_cursor"]
+    assert client.get(f"/recommend/itemcf?user_id=4&cursor={cursor}").status_code == 410
+    assert client.get("/recommend/popular?cursor=%25%25").status_code == 400
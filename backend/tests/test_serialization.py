@@ -0,0 +1,31 @@
+"""
+Tests for the fast response serialization path.
+"""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+
+from app.models.results import RecommendationBatch
+from app.models.schemas import RecommendationsEnvelope
+from app.utils.serialization import envelope_bytes
+
+
+def test_envelope_bytes_match_pydantic_schema():
+    """Columnar batches serialize to the same payload as the response model."""
+
+    batch = RecommendationBatch(
+        movie_ids=np.array([1, 2], dtype=np.int64),
+        scores=np.array([0.9, 0.5]),
+        titles=["Toy Story", "Jumanji"],
+        genres=[["Animation"], ["Adventure", "Fantasy"]],
+        reasons=["Similar to Toy Story", None],
+        source="content",
+    )
+
+    payload = json.loads(envelope_bytes(None, "content", batch))
+    expected = RecommendationsEnvelope(user_id=None, algorithm="content", items=batch.to_records())
+
+    assert payload == expected.model_dump()
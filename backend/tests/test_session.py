@@ -0,0 +1,45 @@
+"""
+Tests for session-based recommendations from posted movie ids.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.main import app
+from app.services.recommender import SESSION_HALF_LIFE_SECONDS, RecommenderService
+
+
+def test_session_scores_match_item_cf_and_weight_recent_items(synthetic_settings):
+    """Without timestamps a session scores like item-CF; with them, older items count less."""
+
+    service = RecommenderService.from_settings(synthetic_settings)
+    matrix, ids = service.item_similarity, service.item_ids
+    session = ids.ids[[3, 40, 77]].astype(int).tolist()
+
+    batch = service.recommend_session(session, k=15)
+    expected = np.asarray(matrix[[3, 40, 77]].sum(axis=0)).ravel()
+    assert len(batch) == 15
+    assert not set(batch.movie_ids.tolist()) & set(session)
+    assert np.allclose(batch.scores, expected[ids.lookup(batch.movie_ids)])
+
+    timestamps = [0.0, SESSION_HALF_LIFE_SECONDS, 2 * SESSION_HALF_LIFE_SECONDS]
+    weighted = service.recommend_session(session, k=15, timestamps=timestamps)
+    row_weights = np.array([0.25, 0.5, 1.0])
+    expected = np.asarray(matrix[[3, 40, 77]].multiply(row_weights[:, None]).sum(axis=0)).ravel()
+    assert np.allclose(weighted.scores, expected[ids.lookup(weighted.movie_ids)])
+
+    assert not service.recommend_session([-1, -2], k=5)
+
+
+def test_session_endpoint(client):
+    """Anonymous sessions are posted as JSON; unknown items and mismatched timestamps are rejected."""
+
+    session = app.state.recommender.item_ids.ids[:3].astype(int).tolist()
+
+    response = client.post("/recommend/session?k=5", json={"movie_ids": session})
+    assert response.status_code == 200
+    assert response.json()["algorithm"] == "session" and len(response.json()["items"]) == 5
+    mismatched = {"movie_ids": session, "timestamps": [1.0]}
+    assert client.post("/recommend/session", json=mismatched).status_code == 422
+    assert client.post("/recommend/session", json={"movie_ids": [-5]}).status_code == 404
@@ -0,0 +1,32 @@
+"""
+Tests for request coalescing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_identical_calls_share_one_computation():
+    """Only the leader computes; concurrent callers with the same key reuse its result."""
+
+    flights = SingleFlight()
+    calls = []
+
+    async def compute(value):
+        calls.append(value)
+        await asyncio.sleep(0.01)
+        return value * 2
+
+    async def scenario():
+        same = [flights.do(("popular", 10), lambda: compute(10)) for _ in range(5)]
+        other = flights.do(("popular", 20), lambda: compute(20))
+        return await asyncio.gather(*same, other)
+
+    results = asyncio.run(scenario())
+
+    assert results == [20] * 5 + [40]
+    assert sorted(calls) == [10, 20]
+    assert (flights.leaders, flights.coalesced, flights.in_flight) == (2, 4, 0)
@@ -0,0 +1,77 @@
+"""
+Tests for startup warm-up, the precomputed hot set and the health probes.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from app.main import app
+from app.services.events import RatingEvent
+from app.services.recommender import RecommenderService
+from app.services.warmup import most_active_users, warm_up
+
+
+def test_warm_up_touches_artifacts_and_fills_the_hot_set(synthetic_settings):
+    """Warm-up runs each query once and stores results for the busiest users."""
+
+    settings = synthetic_settings.model_copy(update={"warmup_hot_users": 5, "warmup_titles": 10})
+    service = RecommenderService.from_settings(settings)
+    report = warm_up(service, settings)
+
+    assert report.touched_bytes > 0 and report.hot_users == 5 and report.titles == 10
+    assert {"popular", "item_cf", "hybrid", "session", "content"} <= set(report.queries)
+    assert service.precomputed_users() == sorted(most_active_users(service, 5))
+    assert len(service.precomputed_titles()) == 10
+
+
+def test_hot_results_match_fresh_ones_until_the_user_rates(synthetic_settings):
+    """Precomputed pages equal a cold computation and are dropped by a new rating."""
+
+    cold = RecommenderService.from_settings(synthetic_settings)
+    hot = RecommenderService.from_settings(synthetic_settings)
+    user_id = most_active_users(hot, 1)[0]
+    assert hot.precompute_item_cf([user_id], depth=30) == 1
+
+    for k in (5, 30):
+        expected, served = cold.recommend_item_cf(user_id, k), hot.recommend_item_cf(user_id, k)
+        assert np.array_equal(served.movie_ids, expected.movie_ids)
+        assert np.allclose(served.scores, expected.scores) and served.reasons == expected.reasons
+
+    top = int(hot.recommend_item_cf(user_id, 1).movie_ids[0])
+    hot.record_rating(RatingEvent(user_id=user_id, movie_id=top, rating=5.0, timestamp=0))
+    assert user_id not in hot.precomputed_users()
+    assert top not in hot.recommend_item_cf(user_id, 30).movie_ids.tolist()
+
+
+def test_hot_title_results_match_fresh_ones(monkeypatch, synthetic_settings):
+    """Precomputed content pages equal a cold computation and are served without a title lookup."""
+
+    cold = RecommenderService.from_settings(synthetic_settings)
+    hot = RecommenderService.from_settings(synthetic_settings)
+    title = hot.movie_meta["clean_title"].iloc[0]
+    assert hot.precompute_by_titles([title], depth=30) == 1
+
+    for k in (5, 30):
+        expected, served = cold.recommend_by_titles([title], k), hot.recommend_by_titles([title], k)
+        assert np.array_equal(served.movie_ids, expected.movie_ids)
+        assert np.allclose(served.scores, expected.scores) and served.reasons == expected.reasons
+    assert len(hot.recommend_by_titles([title], 50)) > 30
+
+    def no_lookup(title):
+        raise AssertionError("hot titles should not be looked up")
+
+    monkeypatch.setattr(hot, "_find_movie_id_by_title", no_lookup)
+    assert len(hot.recommend_by_titles([title], 30)) == 30
+
+
+def test_health_probes_follow_readiness(client):
+    """``/health`` always answers; ``/health/ready`` returns 503 until warm-up finished."""
+
+    app.state.ready = False
+
+    assert client.get("/health").json() == {"status": "ok"}
+    assert client.get("/health/ready").status_code == 503
+    app.state.ready, app.state.warmup = True, {"hot_users": 3}
+    response = client.get("/health/ready")
+    assert response.status_code == 200 and response.json()["warmup"] == {"hot_users": 3}
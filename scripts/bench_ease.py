@@ -0,0 +1,141 @@
+"""
+Training cost and ranking quality of EASE against cosine item-CF.
+
+Both models are trained on the same leave-one-out split, timed with
+allocation peaks recorded, and scored for the same test users the way the
+API scores item-CF. The report goes to ``ease_benchmark.json``; pass
+several ``--lambda`` values to compare regularization strengths.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .config import SweepConfig
+from .ease import build_ease_neighbors
+from .item_cf import build_item_cf_neighbors
+from .logging_utils import setup_logging
+from .sweep import liked_histories, neighbor_metrics, prepare
+from .utils import RunReport, save_json, time_block
+
+logger = logging.getLogger(__name__)
+
+
+def _ids(model: Dict[str, object]) -> np.ndarray:
+    index_movie = model["index_movie"]
+    return np.asarray([index_movie[row] for row in range(len(index_movie))], dtype=np.int64)
+
+
+def run_benchmark(
+    ratings_path: Path,
+    output_dir: Path,
+    topk: int,
+    min_rating: float,
+    lambdas: List[float],
+    memory_budget_mb: float,
+    k_values: Tuple[int, ...] = (10, 20),
+    max_users: Optional[int] = None,
+    seed: int = 42,
+) -> Dict[str, object]:
+    """Train and score item-CF and EASE (one run per ``lambdas`` value)."""
+
+    data = prepare(SweepConfig(ratings_path, output_dir, max_users=max_users, random_seed=seed))
+    liked = liked_histories(data, min_rating)
+    report = RunReport(resources=True)
+    models: Dict[str, Dict[str, object]] = {}
+
+    with time_block("item_cf", report):
+        models["item_cf"] = build_item_cf_neighbors(data.train_df, k=topk, min_rating=min_rating)
+    for value in lambdas:
+        name = f"ease_l{value:g}"
+        with time_block(name, report):
+            models[name] = build_ease_neighbors(
+                data.train_df,
+                k=topk,
+                min_rating=min_rating,
+                regularization=value,
+                memory_budget_mb=memory_budget_mb,
+            )
+
+    results: Dict[str, object] = {}
+    for stats in report.stages:
+        model = models[stats.name]
+        ids = _ids(model)
+        metrics = neighbor_metrics(data, model["matrix"], ids, liked, k_values)
+        results[stats.name] = {
+            "train": stats.as_dict(),
+            "items": int(ids.size),
+            "nnz": int(model["matrix"].nnz),
+            "metrics": {
+                f"{metric}@{int(row['k'])}": round(float(row[metric]), 6)
+                for row in metrics.to_dict("records")
+                for metric in ("ndcg", "recall", "mrr")
+            },
+        }
+        logger.info(
+            "%s: trained in %.2fs, ndcg@%d=%.4f",
+            stats.name,
+            stats.wall_seconds,
+            k_values[0],
+            results[stats.name]["metrics"][f"ndcg@{k_values[0]}"],
+        )
+
+    payload = {
+        "ratings_path": str(ratings_path),
+        "topk": topk,
+        "min_rating": min_rating,
+        "memory_budget_mb": memory_budget_mb,
+        "users": int(data.relevant.shape[0]),
+        "ratings": int(len(data.train_df)),
+        "models": results,
+    }
+    output_dir.mkdir(parents=True, exist_ok=True)
+    save_json(payload, output_dir / "ease_benchmark.json")
+    return payload
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark EASE against cosine item-CF.")
+    parser.add_argument("--ratings", type=Path, required=True, help="Path to ratings data file.")
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path("data/benchmarks"), help="Where results are written."
+    )
+    parser.add_argument("--topk", type=int, default=100, help="Neighbors to retain per item.")
+    parser.add_argument("--min-rating", type=float, default=4.0, help="Positive rating threshold.")
+    parser.add_argument(
+        "--lambda", dest="lambdas", type=float, nargs="+", default=[500.0], help="EASE L2 penalties to try."
+    )
+    parser.add_argument("--memory-mb", type=float, default=2048.0, help="EASE dense matrix budget.")
+    parser.add_argument("--max-users", type=int, help="Evaluate a random sample of test users.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging verbosity.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(getattr(logging, args.log_level))
+    run_benchmark(
+        args.ratings,
+        args.output_dir,
+        args.topk,
+        args.min_rating,
+        args.lambdas,
+        args.memory_mb,
+        max_users=args.max_users,
+        seed=args.seed,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Offline pipeline scaling benchmark over synthetic MovieLens-sized datasets.
+
+For each requested size the driver generates (or reuses) a synthetic dataset,
+runs ``run_pipeline`` in a fresh worker process so peak RSS is measured per
+size, and records per-stage wall time and artifact sizes. Two JSON files are
+written: ``pipeline_scaling.json`` with the full breakdown and
+``runtime_scaling.json`` mapping size -> total seconds, which
+``visualize.plot_runtime_scaling`` plots directly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from .config import ArtifactConfig, DatasetConfig, PipelineConfig
+from .logging_utils import setup_logging
+from .synthetic_data import PRESETS, generate_dataset
+
+logger = logging.getLogger(__name__)
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024**2) if sys.platform == "darwin" else peak / 1024
+
+
+def _run_once(config: PipelineConfig, log_level: int) -> Dict[str, object]:
+    """Executed in a child process: run the pipeline and report measurements."""
+
+    from .data_pipeline import run_pipeline
+
+    setup_logging(log_level)
+    start = time.perf_counter()
+    outputs = run_pipeline(config)
+    total = time.perf_counter() - start
+    artifacts = config.artifacts
+    run_report = json.loads(artifacts.run_report_path.read_text(encoding="utf-8"))
+    files = [
+        artifacts.pop_score_path,
+        artifacts.item_neighbors_path,
+        artifacts.item_index_path,
+        artifacts.content_neighbors_path,
+        artifacts.content_index_path,
+        artifacts.user_history_path,
+        artifacts.movie_meta_path,
+        *outputs.values(),
+    ]
+    return {
+        "total_seconds": round(total, 3),
+        "stages": run_report["stages"],
+        "peak_rss_mb": _peak_rss_mb(),
+        "artifact_bytes": {path.name: path.stat().st_size for path in files if path.exists()},
+    }
+
+
+def run_benchmark(
+    sizes: List[str],
+    data_dir: Path,
+    output_dir: Path,
+    topk: int,
+    seed: int,
+    log_level: int = logging.INFO,
+    profile_resources: bool = False,
+    jobs: int = 1,
+) -> Dict[str, Dict[str, object]]:
+    """Benchmark ``run_pipeline`` at each size and write the JSON summaries."""
+
+    results: Dict[str, Dict[str, object]] = {}
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        dataset_dir = data_dir / size
+        ratings_path = dataset_dir / "ratings.csv"
+        movies_path = dataset_dir / "movies.csv"
+        if not ratings_path.exists() or not movies_path.exists():
+            logger.info("Generating synthetic %s dataset in %s", size, dataset_dir)
+            generate_dataset(PRESETS[size], dataset_dir, seed=seed)
+
+        config = PipelineConfig(
+            dataset=DatasetConfig(ratings_path=ratings_path, movies_path=movies_path),
+            artifacts=ArtifactConfig(output_dir=output_dir / "artifacts" / size),
+            topk_neighbors=topk,
+            random_seed=seed,
+            profile_resources=profile_resources,
+            jobs=jobs,
+        )
+        logger.info("Running pipeline for %s", size)
+        with context.Pool(processes=1) as pool:
+            results[size] = pool.apply(_run_once, (config, log_level))
+        results[size]["ratings"] = PRESETS[size].ratings
+        logger.info("%s finished in %.1fs", size, results[size]["total_seconds"])
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    (output_dir / "pipeline_scaling.json").write_text(json.dumps(results, indent=2), encoding="utf-8")
+    runtime = {size: result["total_seconds"] for size, result in results.items()}
+    (output_dir / "runtime_scaling.json").write_text(json.dumps(runtime, indent=2), encoding="utf-8")
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the offline pipeline across dataset sizes.")
+    parser.add_argument("--sizes", nargs="+", choices=list(PRESETS), default=list(PRESETS))
+    parser.add_argument(
+        "--data-dir", type=Path, default=Path("data/synthetic"), help="Where synthetic datasets are kept."
+    )
+    parser.add_argument(
+        "--output-dir", type=Path, default=Path("data/benchmarks"), help="Where results are written."
+    )
+    parser.add_argument("--topk", type=int, default=100, help="Neighbors to retain per item.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Pipeline worker processes; peak RSS only covers the driver when above 1.",
+    )
+    parser.add_argument(
+        "--profile-resources",
+        action="store_true",
+        help="Also record per-stage CPU time and memory peaks.",
+    )
+    parser.add_argument("--plot", type=Path, help="Optionally render the runtime scaling chart here.")
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging verbosity.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    level = getattr(logging, args.log_level)
+    setup_logging(level)
+    results = run_benchmark(
+        args.sizes,
+        args.data_dir,
+        args.output_dir,
+        args.topk,
+        args.seed,
+        level,
+        profile_resources=args.profile_resources,
+        jobs=args.jobs,
+    )
+    if args.plot:
+        from .visualize import plot_runtime_scaling
+
+        plot_runtime_scaling({size: result["total_seconds"] for size, result in results.items()}, args.plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,62 +1,242 @@
 """
-Command-line entry point for running the offline pipeline.
+Command-line entry point for the offline pipeline.
+
+``build`` (the default when no subcommand is given) computes the artifacts;
+``evaluate`` scores the exported models against the leave-one-out split;
+``sweep`` scores a grid of item-CF and popularity settings.
 """
 
 from __future__ import annotations
 
 import argparse
 import logging
+import os
+import sys
 from pathlib import Path
+from typing import List, Optional
 
-from .config import ArtifactConfig, DatasetConfig, PipelineConfig
+from .config import ArtifactConfig, DatasetConfig, EvaluationConfig, PipelineConfig, SweepConfig
 from .data_pipeline import run_pipeline
 from .logging_utils import setup_logging
 
+COMMANDS = ("build", "evaluate", "sweep")
+
 
-def parse_args() -> argparse.Namespace:
+def _add_log_level(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging verbosity.",
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     """Parse CLI arguments for the offline pipeline."""
 
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ("-h", "--help")):
+        # Keep ``python -m scripts.cli --ratings ...`` working as a build.
+        argv.insert(0, "build")
+
     parser = argparse.ArgumentParser(description="Run MovieLens offline pipelines.")
-    parser.add_argument("--ratings", type=Path, required=True, help="Path to ratings data file.")
-    parser.add_argument("--movies", type=Path, required=True, help="Path to movies metadata file.")
-    parser.add_argument(
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="Compute and export the serving artifacts.")
+    build.add_argument("--ratings", type=Path, required=True, help="Path to ratings data file.")
+    build.add_argument("--movies", type=Path, required=True, help="Path to movies metadata file.")
+    build.add_argument(
+        "--events", type=Path, help="Rating event log written by the API, merged into the ratings."
+    )
+    build.add_argument(
         "--output-dir", type=Path, required=True, help="Directory where artifacts will be written."
     )
-    parser.add_argument("--topk", type=int, default=100, help="Neighbors to retain per item.")
-    parser.add_argument(
+    build.add_argument("--topk", type=int, default=100, help="Neighbors to retain per item.")
+    build.add_argument(
         "--min-rating", type=float, default=4.0, help="Minimum rating to treat as positive feedback."
     )
-    parser.add_argument(
+    build.add_argument(
         "--smoothing",
         type=float,
         default=20.0,
         help="Smoothing constant for Bayesian popularity.",
     )
-    parser.add_argument(
-        "--log-level",
-        default="INFO",
-        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
-        help="Logging verbosity.",
+    build.add_argument(
+        "--ease",
+        action="store_true",
+        help="Also train an EASE item model and export it as ease_neighbors.npz.",
+    )
+    build.add_argument("--ease-lambda", type=float, default=500.0, help="EASE L2 penalty.")
+    build.add_argument(
+        "--ease-min-support", type=int, default=1, help="Skip items with fewer positive ratings in EASE."
+    )
+    build.add_argument(
+        "--ease-memory-mb",
+        type=float,
+        default=2048.0,
+        help="Budget for EASE's dense item x item matrices; the least supported items are dropped to fit.",
+    )
+    build.add_argument(
+        "--als-factors",
+        type=int,
+        help="Also train implicit ALS with this many latent factors and export the factor matrices.",
+    )
+    build.add_argument("--als-iterations", type=int, default=15, help="ALS sweeps over users and items.")
+    build.add_argument("--als-regularization", type=float, default=0.05, help="ALS L2 penalty.")
+    build.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes for independent stages (default 1 runs every stage in-process).",
+    )
+    build.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Turn off the stage cache (on by default, in <output-dir>/.stage_cache); recompute all stages.",
+    )
+    build.add_argument(
+        "--profile-resources",
+        action="store_true",
+        help="Record CPU time, peak RSS and Python allocation peaks per stage in run_report.json.",
+    )
+    build.add_argument(
+        "--profile",
+        action="store_true",
+        help="Dump a cProfile file per stage into <output-dir>/profiles.",
     )
-    return parser.parse_args()
+    _add_log_level(build)
 
+    evaluate = commands.add_parser("evaluate", help="Score exported models on the leave-one-out split.")
+    evaluate.add_argument(
+        "--artifact-dir", type=Path, required=True, help="Directory written by the build command."
+    )
+    evaluate.add_argument(
+        "--ratings", type=Path, required=True, help="Ratings file the artifacts were built from."
+    )
+    evaluate.add_argument(
+        "--movies", type=Path, required=True, help="Movies file the artifacts were built from."
+    )
+    evaluate.add_argument("--events", type=Path, help="Rating event log the artifacts were built with.")
+    evaluate.add_argument("--k", type=int, nargs="+", default=[5, 10, 20], help="Cutoffs to report.")
+    evaluate.add_argument(
+        "--jobs",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Worker processes scoring user shards.",
+    )
+    evaluate.add_argument("--users-per-shard", type=int, default=2048, help="Users scored per task.")
+    evaluate.add_argument("--max-users", type=int, help="Evaluate a random sample of test users.")
+    evaluate.add_argument("--seed", type=int, default=42, help="Seed for user and negative sampling.")
+    evaluate.add_argument(
+        "--negatives",
+        type=int,
+        help="Rank each held-out item against this many sampled negatives instead of the full catalog.",
+    )
+    evaluate.add_argument(
+        "--sampling",
+        choices=["uniform", "popularity"],
+        default="uniform",
+        help="How --negatives are drawn.",
+    )
+    evaluate.add_argument("--plot", type=Path, help="Optionally render the metric comparison chart here.")
+    _add_log_level(evaluate)
 
-def main() -> None:
-    """Entrypoint invoked by the ``python -m scripts.cli`` command."""
+    sweep = commands.add_parser("sweep", help="Score a grid of model settings on the leave-one-out split.")
+    sweep.add_argument("--ratings", type=Path, required=True, help="Path to ratings data file.")
+    sweep.add_argument(
+        "--output-dir", type=Path, required=True, help="Directory for the per-configuration metric tables."
+    )
+    sweep.add_argument("--topk", type=int, nargs="+", default=[20, 50, 100], help="Neighbor counts to try.")
+    sweep.add_argument("--min-rating", type=float, nargs="+", default=[4.0], help="Positive thresholds to try.")
+    sweep.add_argument("--smoothing", type=float, nargs="+", default=[20.0], help="Popularity priors to try.")
+    sweep.add_argument("--k", type=int, nargs="+", default=[5, 10, 20], help="Cutoffs to report.")
+    sweep.add_argument(
+        "--jobs",
+        type=int,
+        default=min(4, os.cpu_count() or 1),
+        help="Threads scoring grid points over the shared matrices.",
+    )
+    sweep.add_argument("--max-users", type=int, help="Evaluate a random sample of test users.")
+    sweep.add_argument("--seed", type=int, default=42, help="Seed for user sampling.")
+    _add_log_level(sweep)
+    return parser.parse_args(argv)
 
-    args = parse_args()
-    setup_logging(getattr(logging, args.log_level))
 
+def build(args: argparse.Namespace) -> None:
     config = PipelineConfig(
-        dataset=DatasetConfig(ratings_path=args.ratings, movies_path=args.movies),
+        dataset=DatasetConfig(ratings_path=args.ratings, movies_path=args.movies, events_path=args.events),
         artifacts=ArtifactConfig(output_dir=args.output_dir),
         topk_neighbors=args.topk,
         min_rating_threshold=args.min_rating,
         popularity_smoothing=args.smoothing,
+        ease=args.ease,
+        ease_regularization=args.ease_lambda,
+        ease_min_support=args.ease_min_support,
+        ease_memory_mb=args.ease_memory_mb,
+        als_factors=args.als_factors,
+        als_iterations=args.als_iterations,
+        als_regularization=args.als_regularization,
+        jobs=args.jobs,
+        stage_cache=not args.no_cache,
+        profile_resources=args.profile_resources,
+        profile_dir=args.output_dir / "profiles" if args.profile else None,
     )
     run_pipeline(config)
 
 
+def evaluate(args: argparse.Namespace) -> None:
+    from .offline_eval import run_evaluation
+
+    k_values = tuple(sorted(set(args.k)))
+    config = EvaluationConfig(
+        artifacts=ArtifactConfig(output_dir=args.artifact_dir),
+        dataset=DatasetConfig(ratings_path=args.ratings, movies_path=args.movies, events_path=args.events),
+        k_values=k_values,
+        jobs=args.jobs,
+        users_per_shard=args.users_per_shard,
+        max_users=args.max_users,
+        random_seed=args.seed,
+        negatives=args.negatives,
+        negative_sampling=args.sampling,
+    )
+    table = run_evaluation(config)
+    if args.plot and not args.negatives:
+        if 10 not in k_values:
+            raise SystemExit("--plot needs --k to include 10.")
+        from .visualize import plot_metric_comparison
+
+        plot_metric_comparison(table, args.plot)
+
+
+def sweep(args: argparse.Namespace) -> None:
+    from .sweep import run_sweep
+
+    config = SweepConfig(
+        ratings_path=args.ratings,
+        output_dir=args.output_dir,
+        topk_values=tuple(sorted(set(args.topk))),
+        min_rating_values=tuple(sorted(set(args.min_rating))),
+        smoothing_values=tuple(sorted(set(args.smoothing))),
+        k_values=tuple(sorted(set(args.k))),
+        jobs=args.jobs,
+        max_users=args.max_users,
+        random_seed=args.seed,
+    )
+    run_sweep(config)
+
+
+def main() -> None:
+    """Entrypoint invoked by the ``python -m scripts.cli`` command."""
+
+    args = parse_args()
+    setup_logging(getattr(logging, args.log_level))
+    if args.command == "evaluate":
+        evaluate(args)
+    elif args.command == "sweep":
+        sweep(args)
+    else:
+        build(args)
+
+
 if __name__ == "__main__":
     main()
-
@@ -9,7 +9,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional, Tuple
 
 
 @dataclass(slots=True)
@@ -20,6 +20,7 @@ class DatasetConfig:
     movies_path: Path
     links_path: Optional[Path] = None
     tags_path: Optional[Path] = None
+    events_path: Optional[Path] = None
 
 
 @dataclass(slots=True)
@@ -34,16 +35,38 @@ class ArtifactConfig:
     content_index_path: Path = field(init=False)
     user_history_path: Path = field(init=False)
     movie_meta_path: Path = field(init=False)
+    run_report_path: Path = field(init=False)
+    stage_cache_dir: Path = field(init=False)
+    metrics_path: Path = field(init=False)
+    extended_metrics_path: Path = field(init=False)
+    sampled_metrics_path: Path = field(init=False)
+    ease_neighbors_path: Path = field(init=False)
+    ease_index_path: Path = field(init=False)
+    als_user_factors_path: Path = field(init=False)
+    als_item_factors_path: Path = field(init=False)
+    als_user_index_path: Path = field(init=False)
+    als_item_index_path: Path = field(init=False)
 
     def __post_init__(self) -> None:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.pop_score_path = self.output_dir / "pop_score.parquet"
         self.item_neighbors_path = self.output_dir / "item_neighbors.npz"
         self.content_neighbors_path = self.output_dir / "content_neighbors.npz"
-        self.item_index_path = self.output_dir / "item_index.json"
-        self.content_index_path = self.output_dir / "content_index.json"
+        self.item_index_path = self.output_dir / "item_index.npy"
+        self.content_index_path = self.output_dir / "content_index.npy"
         self.user_history_path = self.output_dir / "user_history.parquet"
         self.movie_meta_path = self.output_dir / "movie_meta.parquet"
+        self.run_report_path = self.output_dir / "run_report.json"
+        self.stage_cache_dir = self.output_dir / ".stage_cache"
+        self.metrics_path = self.output_dir / "metrics_comparison.csv"
+        self.extended_metrics_path = self.output_dir / "metrics_extended.csv"
+        self.sampled_metrics_path = self.output_dir / "metrics_sampled.csv"
+        self.ease_neighbors_path = self.output_dir / "ease_neighbors.npz"
+        self.ease_index_path = self.output_dir / "ease_index.npy"
+        self.als_user_factors_path = self.output_dir / "als_user_factors.npy"
+        self.als_item_factors_path = self.output_dir / "als_item_factors.npy"
+        self.als_user_index_path = self.output_dir / "als_user_index.npy"
+        self.als_item_index_path = self.output_dir / "als_item_index.npy"
 
 
 @dataclass(slots=True)
@@ -56,3 +79,45 @@ class PipelineConfig:
     topk_neighbors: int = 100
     popularity_smoothing: float = 20.0
     random_seed: int = 42
+    ease: bool = False
+    ease_regularization: float = 500.0
+    ease_min_support: int = 1
+    ease_memory_mb: float = 2048.0
+    als_factors: Optional[int] = None
+    als_iterations: int = 15
+    als_regularization: float = 0.05
+    als_alpha: float = 1.0
+    jobs: int = 1
+    stage_cache: bool = False
+    profile_resources: bool = False
+    profile_dir: Optional[Path] = None
+
+
+@dataclass(slots=True)
+class EvaluationConfig:
+    """Settings for scoring the exported models against the leave-one-out split."""
+
+    artifacts: ArtifactConfig
+    dataset: DatasetConfig
+    k_values: Tuple[int, ...] = (5, 10, 20)
+    jobs: int = 1
+    users_per_shard: int = 2048
+    max_users: Optional[int] = None
+    random_seed: int = 42
+    negatives: Optional[int] = None
+    negative_sampling: Literal["uniform", "popularity"] = "uniform"
+
+
+@dataclass(slots=True)
+class SweepConfig:
+    """Grid of item-CF and popularity settings scored against the leave-one-out split."""
+
+    ratings_path: Path
+    output_dir: Path
+    topk_values: Tuple[int, ...] = (20, 50, 100)
+    min_rating_values: Tuple[float, ...] = (4.0,)
+    smoothing_values: Tuple[float, ...] = (20.0,)
+    k_values: Tuple[int, ...] = (5, 10, 20)
+    jobs: int = 1
+    max_users: Optional[int] = None
+    random_seed: int = 42
@@ -12,6 +12,8 @@ from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 
+from .item_cf import keep_top_k
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +26,7 @@ def build_content_neighbors(
     """
 
     logger.info("Computing content-based neighbors with k=%d", k)
+    movies_df = movies_df.sort_values("movieId").reset_index(drop=True)
     features = (
         movies_df["title"].fillna("")
         + " "
@@ -52,15 +55,6 @@ def build_content_neighbors(
 
 
 def _keep_top_k(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
-    """Helper identical to the collaborative filtering pruning."""
-
-    matrix = matrix.tolil()
-    for i in range(matrix.shape[0]):
-        row = matrix.data[i]
-        if len(row) > k:
-            cutoff = sorted(row, reverse=True)[k - 1]
-            keep = [idx for idx, value in enumerate(row) if value >= cutoff]
-            matrix.rows[i] = [matrix.rows[i][j] for j in keep]
-            matrix.data[i] = [matrix.data[i][j] for j in keep]
-    return matrix.tocsr()
+    """Same pruning as collaborative filtering, keeping ties with the k-th value."""
 
+    return keep_top_k(matrix, k, keep_ties=True)
@@ -0,0 +1,283 @@
+"""
+Stage DAG execution for the offline pipeline.
+
+Each :class:`Stage` declares the named values it consumes and produces, and
+:func:`run_stages` starts every stage as soon as its inputs exist. Stages that
+only need ``movies_df`` therefore run alongside the ones that need
+``train_df``. With ``jobs > 1`` ready stages run in a process pool. DataFrame
+inputs reach the workers through shared memory: numeric columns are copied
+into shared segments once per run instead of being pickled for every stage.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .logging_utils import setup_logging
+from .utils import RunReport, StageStats, time_block
+
+if TYPE_CHECKING:
+    from .stage_cache import StageCache
+
+logger = logging.getLogger(__name__)
+
+# Segments a worker has mapped, kept open for the life of the process. Closing
+# one while a DataFrame (or a stage output) still views it would unmap memory
+# that numpy still points at, because numpy does not pin the buffer export.
+_ATTACHED: Dict[str, shared_memory.SharedMemory] = {}
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    ``func`` is called with the ``inputs`` values positionally followed by
+    ``params`` as keyword arguments. It returns a single value when there is
+    one output, or a tuple in ``outputs`` order. ``local`` stages always run
+    in the driver process, which suits IO-bound stages and stages with large
+    outputs that would otherwise be pickled back from a worker. ``sources``
+    lists raw files the stage reads so the stage cache can fingerprint them
+    (a file that does not exist yet is fingerprinted as missing);
+    ``cache=False`` stores no outputs (downstream stages can still be cached).
+    """
+
+    name: str
+    func: Callable[..., object]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    params: Mapping[str, object] = field(default_factory=dict)
+    local: bool = False
+    sources: Tuple[Path, ...] = ()
+    cache: bool = True
+
+    def call(self, values: Mapping[str, object]) -> Dict[str, object]:
+        result = self.func(*(values[name] for name in self.inputs), **self.params)
+        if len(self.outputs) == 1:
+            result = (result,)
+        elif not self.outputs:
+            result = ()
+        return dict(zip(self.outputs, result))
+
+
+class SharedFrame:
+    """
+    Picklable handle to a DataFrame whose numeric columns live in shared memory.
+
+    The driver builds the handle once. Each worker calls :meth:`attach` to get
+    a read-only DataFrame backed by the same pages. Object and extension
+    columns, such as titles, are pickled as usual.
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.columns = list(frame.columns)
+        self.shared: Dict[int, Tuple[str, str, int]] = {}
+        self.pickled: Dict[int, object] = {}
+        self._segments: List[shared_memory.SharedMemory] = []
+        # Position -1 holds the index so column labels never collide with it.
+        sources = [(-1, frame.index)] + [(pos, frame.iloc[:, pos]) for pos in range(frame.shape[1])]
+        for pos, source in sources:
+            values = source.to_numpy() if isinstance(source.dtype, np.dtype) else None
+            if values is None or values.dtype.kind not in "biufcmM" or values.nbytes == 0:
+                self.pickled[pos] = source if pos < 0 else source.array
+                continue
+            segment = shared_memory.SharedMemory(create=True, size=values.nbytes)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=segment.buf)[:] = values
+            self._segments.append(segment)
+            self.shared[pos] = (segment.name, values.dtype.str, len(values))
+
+    def __getstate__(self) -> Dict[str, object]:
+        return {"columns": self.columns, "shared": self.shared, "pickled": self.pickled, "_segments": []}
+
+    @property
+    def nbytes(self) -> int:
+        return sum(segment.size for segment in self._segments)
+
+    def attach(self) -> pd.DataFrame:
+        """Rebuild the frame in a worker without copying the shared columns."""
+
+        arrays: Dict[int, object] = dict(self.pickled)
+        for pos, (name, dtype, length) in self.shared.items():
+            segment = _ATTACHED.get(name)
+            if segment is None:
+                segment = _ATTACHED[name] = shared_memory.SharedMemory(name=name)
+            array = np.ndarray((length,), dtype=np.dtype(dtype), buffer=segment.buf)
+            array.flags.writeable = False
+            arrays[pos] = array
+        index = pd.Index(arrays.pop(-1), copy=False)
+        frame = pd.DataFrame(
+            {pos: pd.Series(arrays[pos], index=index, copy=False) for pos in range(len(self.columns))},
+            copy=False,
+        )
+        frame.columns = self.columns
+        return frame
+
+    def release(self) -> None:
+        """
+        Unlink the shared segments once every stage using them has finished.
+
+        Only the driver that created them calls this; workers keep their
+        mappings until they exit.
+        """
+
+        for segment in self._segments:
+            segment.close()
+            segment.unlink()
+        self._segments = []
+
+
+def _init_worker(log_level: int) -> None:
+    setup_logging(log_level)
+
+
+def _run_stage(
+    stage: Stage,
+    values: Mapping[str, object],
+    resources: bool,
+    profile_dir: Optional[Path],
+) -> Tuple[Dict[str, object], StageStats]:
+    """Worker entry point: run ``stage`` and return its outputs and measurements."""
+
+    inputs = {
+        name: value.attach() if isinstance(value, SharedFrame) else value for name, value in values.items()
+    }
+    report = RunReport(resources=resources, profile_dir=profile_dir)
+    with time_block(stage.name, report):
+        outputs = stage.call(inputs)
+    return outputs, report.stages[0]
+
+
+def topological_order(stages: Sequence[Stage], available: Sequence[str] = ()) -> List[Stage]:
+    """
+    Order ``stages`` so every stage follows the producers of its inputs.
+
+    Among stages that are ready at the same time the given order is kept.
+    """
+
+    produced = set(available)
+    for stage in stages:
+        clashes = produced.intersection(stage.outputs)
+        if clashes:
+            raise ValueError(f"Stage {stage.name} redefines {sorted(clashes)}.")
+        produced.update(stage.outputs)
+    for stage in stages:
+        missing = set(stage.inputs) - produced
+        if missing:
+            raise ValueError(f"Stage {stage.name} needs {sorted(missing)}, which no stage produces.")
+
+    ready = set(available)
+    pending = list(stages)
+    order: List[Stage] = []
+    while pending:
+        stage = next((stage for stage in pending if ready.issuperset(stage.inputs)), None)
+        if stage is None:
+            raise ValueError(f"Stages {[stage.name for stage in pending]} form a cycle.")
+        pending.remove(stage)
+        order.append(stage)
+        ready.update(stage.outputs)
+    return order
+
+
+def run_stages(
+    stages: Sequence[Stage],
+    values: Optional[Mapping[str, object]] = None,
+    jobs: int = 1,
+    report: Optional[RunReport] = None,
+    cache: Optional[StageCache] = None,
+) -> Dict[str, object]:
+    """
+    Execute ``stages`` in dependency order and return every produced value.
+
+    With ``jobs <= 1`` stages run one after another in the driver, in the
+    order given among those that are ready. Otherwise non-``local`` stages
+    run in a pool of ``jobs`` spawned processes, and their measurements are
+    merged into ``report``. With a ``cache``, stages whose fingerprint is
+    unchanged are not run; their outputs are loaded only where a rerun
+    stage needs them.
+    """
+
+    values = dict(values or {})
+    pending = topological_order(stages, list(values))
+    if cache is not None:
+        pending, reused = cache.plan(pending, list(values))
+        values.update(reused)
+
+    def finish(stage: Stage, outputs: Dict[str, object]) -> None:
+        values.update(outputs)
+        if cache is not None:
+            cache.store(stage, outputs)
+
+    if jobs <= 1:
+        for stage in pending:
+            with time_block(stage.name, report):
+                outputs = stage.call(values)
+            finish(stage, outputs)
+        return values
+
+    shared: Dict[str, SharedFrame] = {}
+
+    def worker_value(name: str) -> object:
+        value = values[name]
+        if not isinstance(value, pd.DataFrame):
+            return value
+        if name not in shared:
+            shared[name] = SharedFrame(value)
+            logger.debug("Shared %s through %.1f MB of shared memory", name, shared[name].nbytes / 1024**2)
+        return shared[name]
+
+    context = multiprocessing.get_context("spawn")
+    pool = ProcessPoolExecutor(
+        max_workers=jobs,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(logging.getLogger().getEffectiveLevel(),),
+    )
+    running: Dict[Future, Stage] = {}
+    try:
+        while pending or running:
+            ready = [stage for stage in pending if all(name in values for name in stage.inputs)]
+            for stage in ready:
+                pending.remove(stage)
+                if stage.local:
+                    continue
+                logger.info("Dispatching stage %s to the worker pool", stage.name)
+                args = {name: worker_value(name) for name in stage.inputs}
+                future = pool.submit(
+                    _run_stage,
+                    stage,
+                    args,
+                    report is not None and report.resources,
+                    report.profile_dir if report is not None else None,
+                )
+                running[future] = stage
+            if not ready and not running:
+                raise ValueError(f"Stages {[stage.name for stage in pending]} form a cycle.")
+            local = [stage for stage in ready if stage.local]
+            if local:
+                # Run driver-side stages while the pool keeps working.
+                for stage in local:
+                    with time_block(stage.name, report):
+                        outputs = stage.call(values)
+                    finish(stage, outputs)
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage = running.pop(future)
+                outputs, stats = future.result()
+                finish(stage, outputs)
+                if report is not None:
+                    report.add(stats)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        for frame in shared.values():
+            frame.release()
+    return values
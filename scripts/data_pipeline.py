@@ -5,20 +5,23 @@ End-to-end orchestration for building offline artifacts.
 from __future__ import annotations
 
 import logging
+from functools import partial
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
 
 from .config import PipelineConfig
+from .dag import Stage, run_stages
+from .stage_cache import StageCache
 from .utils import (
+    RunReport,
     ensure_dir,
     log_dataframe_info,
     read_table,
-    save_json,
+    save_id_index,
     save_parquet,
-    time_block,
 )
 
 logger = logging.getLogger(__name__)
@@ -27,12 +30,25 @@ logger = logging.getLogger(__name__)
 def read_raw_data(config: PipelineConfig) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     Load the raw MovieLens ratings and movies metadata tables.
+
+    When ``config.dataset.events_path`` is set, ratings ingested by the API
+    since the last build are appended. A later rating of the same title
+    replaces the earlier one.
     """
 
     ratings_df = read_table(
         config.dataset.ratings_path,
         column_names=["userId", "movieId", "rating", "timestamp"],
     )
+    if config.dataset.events_path is not None and config.dataset.events_path.exists():
+        events_df = read_table(config.dataset.events_path)
+        log_dataframe_info("rating_events", events_df)
+        ratings_df = (
+            pd.concat([ratings_df, events_df[ratings_df.columns]], ignore_index=True)
+            .sort_values("timestamp", kind="stable")
+            .drop_duplicates(["userId", "movieId"], keep="last")
+            .reset_index(drop=True)
+        )
     movies_df = read_table(
         config.dataset.movies_path,
         column_names=["movieId", "title", "genres"],
@@ -113,70 +129,205 @@ def export_artifacts(
 
     logger.info("Writing item neighbors to %s", config.artifacts.item_neighbors_path)
     sparse.save_npz(config.artifacts.item_neighbors_path, item_neighbors["matrix"])
-    save_json(
-        {
-            "movie_index": {int(k): int(v) for k, v in item_neighbors["movie_index"].items()},
-            "index_movie": {int(k): int(v) for k, v in item_neighbors["index_movie"].items()},
-        },
-        config.artifacts.item_index_path,
-    )
+    save_id_index(item_neighbors["index_movie"], config.artifacts.item_index_path)
     logger.info("Writing content neighbors to %s", config.artifacts.content_neighbors_path)
     sparse.save_npz(config.artifacts.content_neighbors_path, content_neighbors["matrix"])
-    save_json(
-        {
-            "movie_index": {int(k): int(v) for k, v in content_neighbors["movie_index"].items()},
-            "index_movie": {int(k): int(v) for k, v in content_neighbors["index_movie"].items()},
-        },
-        config.artifacts.content_index_path,
-    )
+    save_id_index(content_neighbors["index_movie"], config.artifacts.content_index_path)
     save_parquet(user_history, config.artifacts.user_history_path)
     save_parquet(movie_meta, config.artifacts.movie_meta_path)
 
 
-def run_pipeline(config: PipelineConfig) -> Dict[str, Path]:
+def export_ease_neighbors(config: PipelineConfig, ease_neighbors: Dict[str, object]) -> None:
     """
-    Execute the full offline pipeline and return written artifact paths.
+    Write EASE weights in the item-CF neighbor format.
     """
 
-    logger.info("Starting offline pipeline")
-    with time_block("read_raw_data"):
-        ratings_df, movies_df = read_raw_data(config)
+    from scipy import sparse
 
-    with time_block("leave_one_out_split"):
-        train_df, test_df = leave_one_out_split(ratings_df)
+    ensure_dir(config.artifacts.ease_neighbors_path)
+    logger.info("Writing EASE neighbors to %s", config.artifacts.ease_neighbors_path)
+    sparse.save_npz(config.artifacts.ease_neighbors_path, ease_neighbors["matrix"])
+    save_id_index(ease_neighbors["index_movie"], config.artifacts.ease_index_path)
 
-    from .popularity import compute_popularity_scores
-    from .item_cf import build_item_cf_neighbors
-    from .content_based import build_content_neighbors
 
-    with time_block("compute_popularity"):
-        pop_scores = compute_popularity_scores(
-            train_df, config.popularity_smoothing, config.min_rating_threshold
-        )
+def export_als_factors(config: PipelineConfig, als_model: Dict[str, object]) -> None:
+    """
+    Write ALS factors as ``float32`` arrays next to their sorted id indexes.
+    """
 
-    with time_block("build_item_cf"):
-        item_neighbors = build_item_cf_neighbors(
-            train_df, k=config.topk_neighbors, min_rating=config.min_rating_threshold
-        )
+    artifacts = config.artifacts
+    ensure_dir(artifacts.als_item_factors_path)
+    logger.info("Writing ALS factors to %s", artifacts.als_item_factors_path)
+    np.save(artifacts.als_user_factors_path, als_model["user_factors"].astype(np.float32, copy=False))
+    np.save(artifacts.als_item_factors_path, als_model["item_factors"].astype(np.float32, copy=False))
+    np.save(artifacts.als_user_index_path, als_model["user_ids"].astype(np.int32))
+    np.save(artifacts.als_item_index_path, als_model["movie_ids"].astype(np.int32))
 
-    with time_block("build_content_neighbors"):
-        content_neighbors = build_content_neighbors(
-            movies_df, k=config.topk_neighbors
-        )
 
-    with time_block("user_history"):
-        user_history = build_user_history(train_df, config.min_rating_threshold)
+def pipeline_stages(config: PipelineConfig) -> List[Stage]:
+    """
+    Describe the offline pipeline as a stage DAG.
+
+    Content neighbors and metadata only depend on ``movies_df`` while the
+    remaining model stages only depend on ``train_df``, so those five stages
+    can run concurrently once the split is done. EASE and ALS training are
+    added when ``config.ease`` and ``config.als_factors`` are set.
+    """
+
+    from .als import train_als
+    from .content_based import build_content_neighbors
+    from .ease import build_ease_neighbors
+    from .item_cf import build_item_cf_neighbors
+    from .popularity import compute_popularity_scores
 
-    with time_block("movie_metadata"):
-        movie_meta = enrich_movie_metadata(movies_df)
+    stages = [
+        Stage(
+            "read_raw_data",
+            partial(read_raw_data, config),
+            outputs=("ratings_df", "movies_df"),
+            local=True,
+            sources=tuple(
+                path
+                for path in (config.dataset.ratings_path, config.dataset.movies_path, config.dataset.events_path)
+                if path is not None
+            ),
+            cache=False,
+        ),
+        Stage(
+            "leave_one_out_split",
+            leave_one_out_split,
+            inputs=("ratings_df",),
+            outputs=("train_df", "test_df"),
+            local=True,
+        ),
+        Stage(
+            "compute_popularity",
+            compute_popularity_scores,
+            inputs=("train_df",),
+            outputs=("pop_scores",),
+            params={
+                "smoothing": config.popularity_smoothing,
+                "min_rating_threshold": config.min_rating_threshold,
+            },
+        ),
+        Stage(
+            "build_item_cf",
+            build_item_cf_neighbors,
+            inputs=("train_df",),
+            outputs=("item_neighbors",),
+            params={"k": config.topk_neighbors, "min_rating": config.min_rating_threshold},
+        ),
+        Stage(
+            "build_content_neighbors",
+            build_content_neighbors,
+            inputs=("movies_df",),
+            outputs=("content_neighbors",),
+            params={"k": config.topk_neighbors},
+        ),
+        Stage(
+            "user_history",
+            build_user_history,
+            inputs=("train_df",),
+            outputs=("user_history",),
+            params={"min_rating_threshold": config.min_rating_threshold},
+        ),
+        Stage(
+            "movie_metadata",
+            enrich_movie_metadata,
+            inputs=("movies_df",),
+            outputs=("movie_meta",),
+        ),
+        Stage(
+            "export_artifacts",
+            partial(export_artifacts, config),
+            inputs=("pop_scores", "item_neighbors", "content_neighbors", "user_history", "movie_meta"),
+            local=True,
+        ),
+    ]
+    if config.ease:
+        stages += [
+            Stage(
+                "build_ease",
+                build_ease_neighbors,
+                inputs=("train_df",),
+                outputs=("ease_neighbors",),
+                params={
+                    "k": config.topk_neighbors,
+                    "min_rating": config.min_rating_threshold,
+                    "regularization": config.ease_regularization,
+                    "min_support": config.ease_min_support,
+                    "memory_budget_mb": config.ease_memory_mb,
+                },
+            ),
+            Stage(
+                "export_ease_neighbors",
+                partial(export_ease_neighbors, config),
+                inputs=("ease_neighbors",),
+                local=True,
+            ),
+        ]
+    if config.als_factors:
+        stages += [
+            Stage(
+                "train_als",
+                train_als,
+                inputs=("train_df",),
+                outputs=("als_model",),
+                params={
+                    "factors": config.als_factors,
+                    "regularization": config.als_regularization,
+                    "alpha": config.als_alpha,
+                    "iterations": config.als_iterations,
+                    "random_seed": config.random_seed,
+                },
+            ),
+            Stage(
+                "export_als_factors",
+                partial(export_als_factors, config),
+                inputs=("als_model",),
+                local=True,
+            ),
+        ]
+    return stages
 
-    export_artifacts(config, pop_scores, item_neighbors, content_neighbors, user_history, movie_meta)
 
+def run_pipeline(config: PipelineConfig) -> Dict[str, Path]:
+    """
+    Execute the full offline pipeline and return written artifact paths.
+    """
+
+    logger.info("Starting offline pipeline with %d job(s)", config.jobs)
+    report = RunReport(resources=config.profile_resources, profile_dir=config.profile_dir)
+    cache = StageCache(config.artifacts.stage_cache_dir) if config.stage_cache else None
+    run_stages(pipeline_stages(config), jobs=config.jobs, report=report, cache=cache)
+
+    report.write(
+        config.artifacts.run_report_path,
+        extra={
+            "config": {
+                "ratings_path": str(config.dataset.ratings_path),
+                "movies_path": str(config.dataset.movies_path),
+                "topk_neighbors": config.topk_neighbors,
+                "min_rating_threshold": config.min_rating_threshold,
+                "popularity_smoothing": config.popularity_smoothing,
+                "ease": config.ease,
+                "als_factors": config.als_factors,
+                "jobs": config.jobs,
+            },
+            "reused_stages": cache.reused if cache is not None else [],
+        },
+    )
     logger.info("Pipeline completed")
-    return {
+    outputs = {
         "popularity": config.artifacts.pop_score_path,
         "item_neighbors": config.artifacts.item_neighbors_path,
         "content_neighbors": config.artifacts.content_neighbors_path,
         "user_history": config.artifacts.user_history_path,
         "movie_meta": config.artifacts.movie_meta_path,
     }
+    if config.ease:
+        outputs["ease_neighbors"] = config.artifacts.ease_neighbors_path
+    if config.als_factors:
+        outputs["als_item_factors"] = config.artifacts.als_item_factors_path
+        outputs["als_user_factors"] = config.artifacts.als_user_factors_path
+    return outputs
@@ -0,0 +1,137 @@
+"""
+EASE linear item-item model (Steck, 2019).
+
+The weights are the closed form ``B = I - P diag(1 / diag(P))`` with
+``P = (X^T X + lambda I)^-1`` over the binary user x item matrix of positive
+ratings, with a zero diagonal. Training cost depends on the item count, not
+on the number of ratings. The Gram matrix is filled in blocks of columns and
+inverted in ``float32``. Items are pruned by support so the dense matrices
+fit the memory budget. Each row keeps its top-k positive weights, so the
+export has the same format as the cosine item-CF neighbors.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, sparse
+
+logger = logging.getLogger(__name__)
+
+# Gram matrix columns computed per sparse product, bounding its temporaries.
+GRAM_CHUNK_ITEMS = 1024
+
+# Rows of the dense weight matrix reduced to top-k at a time.
+TOPK_CHUNK_ROWS = 1024
+
+
+def max_items_for_budget(memory_budget_mb: float) -> int:
+    """Largest item count whose two dense ``float32`` matrices fit the budget."""
+
+    # The Gram matrix and its inverse are alive together during inversion.
+    return int(math.isqrt(int(memory_budget_mb * 1024**2) // (2 * 4)))
+
+
+def select_items(support: pd.Series, min_support: int, memory_budget_mb: float) -> np.ndarray:
+    """
+    Movie ids kept for training, sorted.
+
+    Items below ``min_support`` positive users are dropped. If the rest
+    still exceed the budget, only the most supported are kept.
+    """
+
+    support = support[support >= min_support]
+    limit = max_items_for_budget(memory_budget_mb)
+    if len(support) > limit:
+        logger.warning(
+            "EASE keeps the %d most supported of %d items to fit %.0f MB",
+            limit,
+            len(support),
+            memory_budget_mb,
+        )
+        support = support.sort_values(ascending=False, kind="stable").head(limit)
+    return np.sort(support.index.to_numpy())
+
+
+def gram_matrix(interactions: sparse.csr_matrix) -> np.ndarray:
+    """Dense ``float32`` ``X^T X``, filled one block of columns at a time."""
+
+    n_items = interactions.shape[1]
+    gram = np.empty((n_items, n_items), dtype=np.float32)
+    columns = interactions.tocsc()
+    transposed = columns.T.tocsr()
+    for start in range(0, n_items, GRAM_CHUNK_ITEMS):
+        stop = min(start + GRAM_CHUNK_ITEMS, n_items)
+        gram[:, start:stop] = (transposed @ columns[:, start:stop]).toarray()
+    return gram
+
+
+def build_ease_neighbors(
+    ratings_df: pd.DataFrame,
+    k: int,
+    min_rating: float,
+    regularization: float = 500.0,
+    min_support: int = 1,
+    memory_budget_mb: float = 2048.0,
+) -> Dict[str, object]:
+    """
+    Fit EASE and keep the top-k weights per item.
+
+    Returns
+    -------
+    dict
+        The sparse weight matrix (row = seed item) and index lookups, like
+        :func:`item_cf.build_item_cf_neighbors`.
+    """
+
+    logger.info("Building EASE neighbors with k=%d, lambda=%s", k, regularization)
+    positive = ratings_df[ratings_df["rating"] >= min_rating]
+    support = positive.groupby("movieId")["userId"].nunique()
+    movie_ids = select_items(support, min_support, memory_budget_mb)
+    positive = positive[positive["movieId"].isin(movie_ids)]
+
+    rows, user_ids = pd.factorize(positive["userId"])
+    cols = np.searchsorted(movie_ids, positive["movieId"].to_numpy())
+    interactions = sparse.csr_matrix(
+        (np.ones(len(positive), dtype=np.float32), (rows, cols)),
+        shape=(len(user_ids), movie_ids.size),
+    )
+    # Repeated ratings of one title count once.
+    interactions.data[:] = 1.0
+
+    weights = gram_matrix(interactions)
+    weights[np.diag_indices_from(weights)] += regularization
+    weights = linalg.inv(weights, overwrite_a=True, check_finite=False)
+    diagonal = weights.diagonal().copy()
+    weights /= -diagonal
+    np.fill_diagonal(weights, 0.0)
+
+    neighbors = min(k, movie_ids.size - 1)
+    blocks = []
+    for start in range(0, movie_ids.size, TOPK_CHUNK_ROWS):
+        block = weights[start : start + TOPK_CHUNK_ROWS]
+        if neighbors <= 0:
+            blocks.append(sparse.csr_matrix(block.shape, dtype=np.float32))
+            continue
+        top = np.argpartition(-block, neighbors - 1, axis=1)[:, :neighbors]
+        values = np.take_along_axis(block, top, axis=1)
+        keep = values > 0
+        block_rows = np.broadcast_to(np.arange(block.shape[0])[:, None], top.shape)
+        blocks.append(
+            sparse.csr_matrix((values[keep], (block_rows[keep], top[keep])), shape=block.shape)
+        )
+    matrix = sparse.vstack(blocks, format="csr") if blocks else sparse.csr_matrix((0, 0), dtype=np.float32)
+    matrix.sort_indices()
+
+    movie_index = {mid: idx for idx, mid in enumerate(movie_ids)}
+    index_movie = {idx: mid for mid, idx in movie_index.items()}
+    logger.info("EASE weight matrix shape: %s, %d entries", matrix.shape, matrix.nnz)
+    return {
+        "matrix": matrix,
+        "movie_index": movie_index,
+        "index_movie": index_movie,
+    }
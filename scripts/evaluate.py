@@ -9,9 +9,14 @@ from typing import Dict, Iterable, List, Sequence
 
 import numpy as np
 import pandas as pd
+from scipy import sparse
 
 logger = logging.getLogger(__name__)
 
+# Columns of the original evaluation output; later metrics are reported separately.
+BASE_METRICS = ("precision", "recall", "ndcg")
+RANKING_METRICS = (*BASE_METRICS, "map", "mrr", "hit_rate")
+
 
 def precision_at_k(recommended: Sequence[int], relevant: Sequence[int], k: int) -> float:
     """Compute precision@k for a single user."""
@@ -49,33 +54,177 @@ def ndcg_at_k(recommended: Sequence[int], relevant: Sequence[int], k: int) -> fl
     return float(dcg / idcg) if idcg > 0 else 0.0
 
 
-def evaluate_model(
-    recommendations: Dict[int, Sequence[int]],
-    ground_truth: Dict[int, Sequence[int]],
+def _flatten(rows: Sequence[Sequence[int]]) -> np.ndarray:
+    return np.concatenate([np.asarray(row, dtype=np.int64) for row in rows] + [np.empty(0, dtype=np.int64)])
+
+
+def _pad(rows: Sequence[Sequence[int]], width: int, fill: int = -1) -> np.ndarray:
+    """Stack ragged integer lists into a ``(len(rows), width)`` array padded with ``fill``."""
+
+    rows = [row[:width] for row in rows]
+    lengths = np.fromiter((len(row) for row in rows), dtype=np.int64, count=len(rows))
+    padded = np.full((len(rows), width), fill, dtype=np.int64)
+    padded[np.arange(width) < lengths[:, None]] = _flatten(rows)
+    return padded
+
+
+def _canonical(matrix: sparse.spmatrix) -> sparse.csr_matrix:
+    """CSR with sorted, unique columns per row (duplicate ground-truth ids count once)."""
+
+    matrix = sparse.csr_matrix(matrix)
+    if not matrix.has_canonical_format:
+        matrix = matrix.copy()
+        matrix.sum_duplicates()
+    return matrix
+
+
+def hit_matrix(recommended: np.ndarray, relevant: sparse.csr_matrix) -> np.ndarray:
+    """
+    Flag which recommended positions are relevant.
+
+    ``recommended`` is an ``(n_users, max_k)`` array of item columns, padded
+    with ``-1``; row ``u`` of ``relevant`` holds user ``u``'s held-out items.
+    Membership is a single binary search of ``row * n_items + item`` keys
+    against the CSR coordinates, so no per-user sets are built.
+    """
+
+    relevant = _canonical(relevant)
+    n_users, n_items = relevant.shape
+    if recommended.shape[0] != n_users:
+        raise ValueError("recommended and relevant must have one row per user.")
+    rows = np.repeat(np.arange(n_users, dtype=np.int64), np.diff(relevant.indptr))
+    truth = rows * n_items + relevant.indices
+    valid = (recommended >= 0) & (recommended < n_items)
+    keys = np.arange(n_users, dtype=np.int64)[:, None] * n_items + np.where(valid, recommended, 0)
+    if truth.size == 0:
+        return np.zeros(recommended.shape, dtype=bool)
+    found = np.minimum(np.searchsorted(truth, keys), truth.size - 1)
+    return valid & (truth[found] == keys)
+
+
+def ranking_metrics(
+    recommended: np.ndarray,
+    relevant: sparse.csr_matrix,
     k_values: Iterable[int] = (10,),
 ) -> pd.DataFrame:
     """
-    Evaluate recommendation quality across multiple cutoffs.
+    Compute precision, recall, NDCG, MAP, MRR and hit rate at every cutoff.
+
+    The hit matrix is built once and every metric is read off cumulative
+    sums, so all cutoffs cost one pass. Users without relevant items are
+    skipped, as in :func:`evaluate_model`. NDCG uses the same ideal ranking
+    as :func:`ndcg_at_k` (the hits of the list moved to the top).
     """
 
+    k_values = [int(k) for k in k_values]
+    max_k = max(k_values, default=0)
+    relevant = _canonical(relevant)
+    n_relevant = np.diff(relevant.indptr)
+    users = n_relevant > 0
+    hits = hit_matrix(recommended, relevant)[users, :max_k].astype(np.float64)
+    if hits.shape[1] < max_k:
+        hits = np.pad(hits, ((0, 0), (0, max_k - hits.shape[1])))
+    n_relevant = n_relevant[users]
+
+    ranks = np.arange(1, max_k + 1, dtype=np.float64)
+    discounts = 1.0 / np.log2(ranks + 1)
+    cum_hits = np.cumsum(hits, axis=1)
+    cum_dcg = np.cumsum(hits * discounts, axis=1)
+    ideal_dcg = np.concatenate([[0.0], np.cumsum(discounts)])
+    cum_precision = np.cumsum(hits * cum_hits / ranks, axis=1)
+    first_hit = np.where(hits.any(axis=1), hits.argmax(axis=1), max_k)
+
     rows: List[Dict[str, float]] = []
     for k in k_values:
-        metrics = {"k": k, "precision": 0.0, "recall": 0.0, "ndcg": 0.0}
-        user_count = 0
-        for user_id, recs in recommendations.items():
-            relevant = ground_truth.get(user_id, [])
-            if not relevant:
-                continue
-            user_count += 1
-            metrics["precision"] += precision_at_k(recs, relevant, k)
-            metrics["recall"] += recall_at_k(recs, relevant, k)
-            metrics["ndcg"] += ndcg_at_k(recs, relevant, k)
-
-        if user_count > 0:
-            for key in ("precision", "recall", "ndcg"):
-                metrics[key] /= user_count
+        metrics = {"k": k, **{name: 0.0 for name in RANKING_METRICS}}
+        if k > 0 and hits.shape[0]:
+            hits_k = cum_hits[:, k - 1]
+            idcg = ideal_dcg[hits_k.astype(np.int64)]
+            ndcg = np.divide(cum_dcg[:, k - 1], idcg, out=np.zeros_like(idcg), where=idcg > 0)
+            metrics["precision"] = float(np.mean(hits_k / k))
+            metrics["recall"] = float(np.mean(hits_k / n_relevant))
+            metrics["ndcg"] = float(np.mean(ndcg))
+            metrics["map"] = float(np.mean(cum_precision[:, k - 1] / np.minimum(n_relevant, k)))
+            metrics["mrr"] = float(np.mean(np.where(first_hit < k, 1.0 / (first_hit + 1), 0.0)))
+            metrics["hit_rate"] = float(np.mean(hits_k > 0))
         rows.append(metrics)
+    return pd.DataFrame(rows)
+
+
+def intra_list_diversity(
+    recommended: np.ndarray,
+    similarity: sparse.csr_matrix,
+    k_values: Iterable[int] = (10,),
+) -> Dict[int, float]:
+    """
+    Mean intra-list diversity (one minus mean pairwise similarity) at every cutoff.
+
+    ``recommended`` holds rows/columns of the square ``similarity`` matrix,
+    padded with ``-1``. A pair's similarity is the larger of its two stored
+    directions, since neighbor lists are truncated per row. Pairs are looked
+    up with the same key search as :func:`hit_matrix`. Lists with fewer than
+    two items are skipped.
+    """
+
+    similarity = _canonical(similarity)
+    n_items = similarity.shape[1]
+    rows = np.repeat(np.arange(similarity.shape[0], dtype=np.int64), np.diff(similarity.indptr))
+    keys = rows * n_items + similarity.indices
+
+    def lookup(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        wanted = left * n_items + right
+        if keys.size == 0:
+            return np.zeros(wanted.shape)
+        found = np.minimum(np.searchsorted(keys, wanted), keys.size - 1)
+        return np.where(keys[found] == wanted, similarity.data[found], 0.0)
+
+    result: Dict[int, float] = {}
+    for k in k_values:
+        top = recommended[:, :k]
+        left, right = top[:, :, None], top[:, None, :]
+        pairs = (left >= 0) & (right >= 0) & ~np.eye(top.shape[1], dtype=bool)
+        left, right = np.where(pairs, left, 0), np.where(pairs, right, 0)
+        pair_similarity = np.where(pairs, np.maximum(lookup(left, right), lookup(right, left)), 0.0)
+        counts = pairs.sum(axis=(1, 2))
+        lists = counts > 0
+        mean_similarity = pair_similarity.sum(axis=(1, 2))[lists] / counts[lists]
+        result[int(k)] = float(1.0 - mean_similarity.mean()) if lists.any() else 0.0
+    return result
+
+
+def evaluate_model(
+    recommendations: Dict[int, Sequence[int]],
+    ground_truth: Dict[int, Sequence[int]],
+    k_values: Iterable[int] = (10,),
+) -> pd.DataFrame:
+    """
+    Evaluate recommendation quality across multiple cutoffs.
+
+    Item ids are mapped to dense columns and the lists handed to
+    :func:`ranking_metrics`. The result keeps its ``k``, ``precision``,
+    ``recall`` and ``ndcg`` columns; call :func:`ranking_metrics` directly
+    for MAP, MRR and hit rate.
+    """
 
-    result = pd.DataFrame(rows)
+    k_values = list(k_values)
+    user_ids = list(recommendations)
+    recs = [list(recommendations[user]) for user in user_ids]
+    truth = [list(ground_truth.get(user, [])) for user in user_ids]
+    item_ids = np.unique(np.concatenate([_flatten(recs), _flatten(truth)]))
+
+    width = max([len(items) for items in recs] + [max(k_values, default=0)])
+    padded = _pad(recs, width)
+    recommended = np.where(padded >= 0, np.searchsorted(item_ids, padded), -1)
+    lengths = np.fromiter((len(items) for items in truth), dtype=np.int64, count=len(truth))
+    relevant = sparse.csr_matrix(
+        (
+            np.ones(lengths.sum(), dtype=np.float32),
+            np.searchsorted(item_ids, _flatten(truth)),
+            np.concatenate([[0], np.cumsum(lengths)]),
+        ),
+        shape=(len(user_ids), item_ids.size),
+    )
+
+    result = ranking_metrics(recommended, relevant, k_values)[["k", *BASE_METRICS]]
     logger.info("Evaluation results:\n%s", result)
     return result
@@ -6,7 +6,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Tuple
 
 import numpy as np
 import pandas as pd
@@ -24,6 +24,39 @@ class ItemCFArtifacts:
     index_movie: Dict[int, int]
 
 
+def item_similarity(ratings_df: pd.DataFrame, min_rating: float) -> Tuple[sparse.csr_matrix, np.ndarray]:
+    """
+    Untruncated item-item cosine similarity over positive ratings.
+
+    Returns the similarity (zero diagonal) and the sorted movie ids labelling
+    its rows and columns. :func:`build_item_cf_neighbors` truncates it to the
+    top-k per row; the sweep runner slices several k from one computation.
+    """
+
+    filtered = ratings_df[ratings_df["rating"] >= min_rating]
+
+    # Sorted ids let the serving layer resolve positions with a binary search.
+    movie_ids = np.sort(filtered["movieId"].unique())
+    rows, user_ids = pd.factorize(filtered["userId"])
+    cols = np.searchsorted(movie_ids, filtered["movieId"].to_numpy())
+    data = filtered["rating"].to_numpy(dtype=float)
+
+    interaction_matrix = sparse.coo_matrix(
+        (data, (rows, cols)),
+        shape=(len(user_ids), len(movie_ids)),
+    ).tocsr()
+
+    normalized = sparse.csr_matrix(interaction_matrix)
+    item_norms = sparse.linalg.norm(normalized, axis=0)
+    item_norms[item_norms == 0] = 1.0
+    normalized = normalized.multiply(1 / item_norms)
+
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity.setdiag(0.0)
+    similarity.eliminate_zeros()
+    return similarity, movie_ids
+
+
 def build_item_cf_neighbors(
     ratings_df: pd.DataFrame,
     k: int,
@@ -39,35 +72,13 @@ def build_item_cf_neighbors(
     """
 
     logger.info("Building item-CF neighbors with k=%d", k)
-    filtered = ratings_df[ratings_df["rating"] >= min_rating]
-
-    user_ids = filtered["userId"].unique()
-    movie_ids = filtered["movieId"].unique()
-
-    user_index = {uid: idx for idx, uid in enumerate(user_ids)}
+    similarity, movie_ids = item_similarity(ratings_df, min_rating)
     movie_index = {mid: idx for idx, mid in enumerate(movie_ids)}
     index_movie = {idx: mid for mid, idx in movie_index.items()}
 
-    rows = filtered["userId"].map(user_index)
-    cols = filtered["movieId"].map(movie_index)
-    data = filtered["rating"].astype(float)
-
-    interaction_matrix = sparse.coo_matrix(
-        (data, (rows, cols)),
-        shape=(len(user_index), len(movie_index)),
-    ).tocsr()
-
-    normalized = sparse.csr_matrix(interaction_matrix)
-    item_norms = sparse.linalg.norm(normalized, axis=0)
-    item_norms[item_norms == 0] = 1.0
-    normalized = normalized.multiply(1 / item_norms)
-
-    similarity = normalized.T @ normalized
-
-    # Zero out diagonal and keep top-k similarities per item
-    similarity.setdiag(0.0)
+    # Keep top-k similarities per item
     if k < similarity.shape[0]:
-        similarity = _keep_top_k(similarity, k=k)
+        similarity = keep_top_k(similarity, k=k)
 
     logger.info("Item similarity matrix shape: %s", similarity.shape)
     return {
@@ -77,17 +88,49 @@ def build_item_cf_neighbors(
     }
 
 
-def _keep_top_k(matrix: sparse.csr_matrix, k: int) -> sparse.csr_matrix:
+def sort_rows_descending(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    """Reorder each CSR row's entries by decreasing value (ties by column)."""
+
+    matrix = sparse.csr_matrix(matrix)
+    matrix.sort_indices()
+    rows = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+    order = np.lexsort((-matrix.data, rows))
+    ordered = sparse.csr_matrix(
+        (matrix.data[order], matrix.indices[order], matrix.indptr.copy()), shape=matrix.shape
+    )
+    ordered.has_sorted_indices = False
+    return ordered
+
+
+def head_per_row(ordered: sparse.csr_matrix, k: int, keep_ties: bool = False) -> sparse.csr_matrix:
     """
-    Retain only the top-k largest values per row in a CSR matrix.
+    First ``k`` entries of every row of a :func:`sort_rows_descending` matrix.
+
+    With ``keep_ties`` entries equal to a row's k-th value are kept as well.
+    Slicing is a mask over the sorted entries, so many cutoffs can be taken
+    from one sort.
     """
 
-    matrix = matrix.tolil()
-    for i in range(matrix.shape[0]):
-        row = matrix.data[i]
-        if len(row) > k:
-            idx = np.argpartition(row, -k)[: -k]
-            matrix.rows[i] = [col for j, col in enumerate(matrix.rows[i]) if j not in idx]
-            matrix.data[i] = [value for j, value in enumerate(row) if j not in idx]
-    return matrix.tocsr()
+    lengths = np.diff(ordered.indptr)
+    rows = np.repeat(np.arange(ordered.shape[0]), lengths)
+    rank = np.arange(ordered.nnz) - ordered.indptr[rows]
+    keep = rank < k
+    if keep_ties and ordered.nnz:
+        last = ordered.indptr[:-1] + np.minimum(lengths, k) - 1
+        cutoff = ordered.data[np.maximum(last, 0)]
+        keep |= ordered.data >= cutoff[rows]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows[keep], minlength=ordered.shape[0]))])
+    head = sparse.csr_matrix(
+        (ordered.data[keep], ordered.indices[keep], indptr), shape=ordered.shape
+    )
+    head.has_sorted_indices = False
+    head.sort_indices()
+    return head
+
+
+def keep_top_k(matrix: sparse.csr_matrix, k: int, keep_ties: bool = False) -> sparse.csr_matrix:
+    """
+    Retain only the top-k largest values per row in a CSR matrix.
+    """
 
+    return head_per_row(sort_rows_descending(matrix), k, keep_ties=keep_ties)
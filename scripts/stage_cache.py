@@ -0,0 +1,186 @@
+"""
+Content-addressed cache of pipeline stage outputs.
+
+A stage's key hashes its name, the source of the module defining it and of
+every module of the same package it imports (directly or not), the
+parameters it receives, the contents of any raw files it reads and the keys
+of the stages producing its inputs. Changing ``--smoothing`` therefore only
+invalidates the popularity stage, while item-CF and TF-IDF outputs are loaded
+from ``<output-dir>/.stage_cache``. Only the most recently stored entry of
+each stage is kept, so the cache never grows beyond one output set.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sys
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .dag import Stage, topological_order
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: Path, size: int, mtime_ns: int) -> str:
+    # Keyed on size and mtime so an unchanged file is hashed once per process.
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _module_closure(name: str) -> List[str]:
+    """``name`` plus every module of its package that it imports, directly or transitively."""
+
+    package = name.partition(".")[0]
+    seen: Set[str] = set()
+    pending = [name]
+    while pending:
+        current = pending.pop()
+        module = sys.modules.get(current)
+        if current in seen or module is None:
+            continue
+        seen.add(current)
+        for value in vars(module).values():
+            dependency = value.__name__ if inspect.ismodule(value) else getattr(value, "__module__", None)
+            if isinstance(dependency, str) and dependency.partition(".")[0] == package:
+                pending.append(dependency)
+    return sorted(seen)
+
+
+def _code_digest(stage: Stage) -> str:
+    func = stage.func
+    while isinstance(func, functools.partial):
+        func = func.func
+    module = getattr(func, "__module__", None)
+    digests = []
+    for name in _module_closure(module) if module else ():
+        source = getattr(sys.modules[name], "__file__", None)
+        if source is not None:
+            stat = os.stat(source)
+            digests.append(f"{name}={_file_digest(Path(source), stat.st_size, stat.st_mtime_ns)}")
+    return ":".join([func.__qualname__, *digests])
+
+
+class StageCache:
+    """Pickle store of stage outputs keyed by content fingerprints."""
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.keys: Dict[str, str] = {}
+        self.reused: List[str] = []
+
+    def _path(self, stage: Stage, key: str) -> Path:
+        return self.directory / stage.name / f"{key}.pkl"
+
+    def compute_keys(self, stages: Sequence[Stage], available: Sequence[str] = ()) -> Dict[str, str]:
+        """
+        Fingerprint every stage without running anything.
+
+        Values passed to the pipeline directly (``available``) have no
+        fingerprint, so stages that depend on them are never cached.
+        """
+
+        fingerprints: Dict[str, str] = {}
+        self.keys = {}
+        for stage in topological_order(stages, available):
+            if any(name not in fingerprints for name in stage.inputs):
+                continue
+            sources = []
+            for path in stage.sources:
+                if not path.exists():
+                    # Optional inputs such as the rating event log may not exist yet.
+                    sources.append([str(path), None])
+                    continue
+                stat = path.stat()
+                sources.append([str(path), _file_digest(path, stat.st_size, stat.st_mtime_ns)])
+            payload = {
+                "stage": stage.name,
+                "code": _code_digest(stage),
+                "inputs": [fingerprints[name] for name in stage.inputs],
+                "params": dict(stage.params),
+                "sources": sources,
+            }
+            key = hashlib.sha256(json.dumps(payload, sort_keys=True, default=repr).encode()).hexdigest()
+            self.keys[stage.name] = key
+            for name in stage.outputs:
+                fingerprints[name] = hashlib.sha256(f"{key}:{name}".encode()).hexdigest()
+        return self.keys
+
+    def plan(
+        self,
+        stages: Sequence[Stage],
+        available: Sequence[str] = (),
+    ) -> Tuple[List[Stage], Dict[str, object]]:
+        """
+        Split ``stages`` into those to execute and outputs loaded from the cache.
+
+        Walking the DAG backwards, a stage runs if it has side effects only
+        (no outputs) or its entry is missing; a cached stage is loaded only
+        if a running stage consumes one of its outputs. Stages whose outputs
+        nobody needs are skipped entirely, which is how ``read_raw_data`` is
+        avoided when every model stage is reused.
+        """
+
+        order = topological_order(stages, available)
+        self.compute_keys(stages, available)
+        needed: Set[str] = set()
+        run: Set[str] = set()
+        load: List[Stage] = []
+        for stage in reversed(order):
+            if stage.outputs and not needed.intersection(stage.outputs):
+                continue
+            key = self.keys.get(stage.name)
+            if stage.cache and stage.outputs and key is not None and self._path(stage, key).exists():
+                load.append(stage)
+            else:
+                run.add(stage.name)
+                needed.update(stage.inputs)
+
+        values: Dict[str, object] = {}
+        self.reused = []
+        for stage in reversed(load):
+            path = self._path(stage, self.keys[stage.name])
+            try:
+                with path.open("rb") as fp:
+                    values.update(pickle.load(fp))
+            except (OSError, pickle.UnpicklingError, EOFError) as exc:
+                # A corrupt entry must not fail the build; fall back to a full run.
+                logger.warning("Discarding unreadable cache entry %s: %s", path, exc)
+                path.unlink(missing_ok=True)
+                return self.plan(stages, available)
+            self.reused.append(stage.name)
+            logger.info("Reusing cached outputs of stage %s (%s)", stage.name, self.keys[stage.name][:12])
+        to_run = [stage for stage in order if stage.name in run]
+        logger.info(
+            "Stage cache: %d reused, recomputing %s",
+            len(self.reused),
+            ", ".join(stage.name for stage in to_run) or "nothing",
+        )
+        return to_run, values
+
+    def store(self, stage: Stage, outputs: Mapping[str, object]) -> None:
+        """Persist a freshly computed stage's outputs under its key, dropping its older entries."""
+
+        key: Optional[str] = self.keys.get(stage.name)
+        if key is None or not stage.cache or not stage.outputs:
+            return
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        with tmp.open("wb") as fp:
+            pickle.dump(dict(outputs), fp, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(path)
+        for stale in path.parent.glob("*.pkl"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+        logger.debug("Cached stage %s as %s", stage.name, path)
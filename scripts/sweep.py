@@ -0,0 +1,224 @@
+"""
+Hyperparameter sweep over item-CF and popularity settings.
+
+Every grid point of ``topk_neighbors`` x ``min_rating_threshold`` x
+``popularity_smoothing`` is evaluated on the leave-one-out split. The
+intermediates are built once and shared across points. The ratings are
+read and split once. The untruncated item similarity is computed and
+row-sorted once per rating threshold, and each ``k`` is a slice of it.
+Item-CF only depends on (threshold, k) and popularity on (threshold,
+smoothing), so each distinct model is scored once. Scoring runs on a thread
+pool over the shared in-memory matrices.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from .config import SweepConfig
+from .data_pipeline import leave_one_out_split
+from .evaluate import ranking_metrics
+from .item_cf import head_per_row, item_similarity, sort_rows_descending
+from .offline_eval import (
+    id_positions,
+    neighbor_top_k,
+    popularity_top_k,
+    profile_matrix,
+    to_catalog,
+)
+from .popularity import compute_popularity_scores
+from .utils import read_table, save_json, time_block
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class GridPoint:
+    """One configuration of the sweep."""
+
+    topk_neighbors: int
+    min_rating_threshold: float
+    popularity_smoothing: float
+
+    @property
+    def name(self) -> str:
+        return f"k{self.topk_neighbors}_r{self.min_rating_threshold:g}_s{self.popularity_smoothing:g}"
+
+
+@dataclass(slots=True)
+class SweepData:
+    """Intermediates shared by every grid point."""
+
+    train_df: pd.DataFrame
+    users: np.ndarray
+    user_train_df: pd.DataFrame
+    catalog_ids: np.ndarray
+    relevant: sparse.csr_matrix
+    watched: List[np.ndarray]
+    seen: sparse.csr_matrix
+
+
+def _histories(frame: pd.DataFrame, users: np.ndarray) -> List[np.ndarray]:
+    # One stable sort and split instead of a Python-level groupby.
+    frame = frame.sort_values("userId", kind="stable")
+    bounds = np.searchsorted(frame["userId"].to_numpy(), users, side="right")
+    return np.split(frame["movieId"].to_numpy(dtype=np.int64), bounds[:-1])
+
+
+def prepare(config: SweepConfig) -> SweepData:
+    """Read, split and encode the ratings once for the whole sweep."""
+
+    with time_block("read_ratings"):
+        ratings_df = read_table(
+            config.ratings_path, column_names=["userId", "movieId", "rating", "timestamp"]
+        )
+    with time_block("leave_one_out_split"):
+        train_df, test_df = leave_one_out_split(ratings_df)
+
+    catalog_ids = np.sort(ratings_df["movieId"].unique()).astype(np.int64)
+    users = np.sort(test_df["userId"].unique())
+    if config.max_users is not None and config.max_users < users.size:
+        rng = np.random.default_rng(config.random_seed)
+        users = np.sort(rng.choice(users, size=config.max_users, replace=False))
+    test_df = test_df[test_df["userId"].isin(users)]
+    test_rows = np.searchsorted(users, test_df["userId"].to_numpy())
+    relevant = sparse.csr_matrix(
+        (np.ones(len(test_df)), (test_rows, id_positions(catalog_ids, test_df["movieId"]))),
+        shape=(users.size, catalog_ids.size),
+    )
+    user_train_df = train_df[train_df["userId"].isin(users)]
+    watched = _histories(user_train_df, users)
+    logger.info("Sweep evaluates %d users over %d titles", users.size, catalog_ids.size)
+    return SweepData(
+        train_df=train_df,
+        users=users,
+        user_train_df=user_train_df,
+        catalog_ids=catalog_ids,
+        relevant=relevant,
+        watched=watched,
+        seen=profile_matrix(watched, catalog_ids),
+    )
+
+
+def liked_histories(data: SweepData, threshold: float) -> List[np.ndarray]:
+    """Per evaluated user, the training items rated at least ``threshold``."""
+
+    return _histories(data.user_train_df[data.user_train_df["rating"] >= threshold], data.users)
+
+
+def neighbor_metrics(
+    data: SweepData,
+    similarity: sparse.csr_matrix,
+    ids: np.ndarray,
+    liked: List[np.ndarray],
+    k_values: Tuple[int, ...],
+) -> pd.DataFrame:
+    """Ranking metrics of a neighbor matrix scored the way the API scores item-CF."""
+
+    seeds = [own if len(own) else seen for own, seen in zip(liked, data.watched)]
+    positions = neighbor_top_k(
+        similarity, ids, profile_matrix(seeds, ids), profile_matrix(data.watched, ids), max(k_values)
+    )
+    return ranking_metrics(to_catalog(positions, ids, data.catalog_ids), data.relevant, k_values)
+
+
+def _item_cf_metrics(
+    data: SweepData,
+    ordered: sparse.csr_matrix,
+    ids: np.ndarray,
+    liked: List[np.ndarray],
+    k_neighbors: int,
+    k_values: Tuple[int, ...],
+) -> pd.DataFrame:
+    similarity = head_per_row(ordered, k_neighbors) if k_neighbors < ordered.shape[0] else ordered
+    return neighbor_metrics(data, similarity, ids, liked, k_values)
+
+
+def _popularity_metrics(
+    data: SweepData,
+    smoothing: float,
+    threshold: float,
+    k_values: Tuple[int, ...],
+) -> pd.DataFrame:
+    pop_df = compute_popularity_scores(data.train_df, smoothing, threshold)
+    popularity = np.full(data.catalog_ids.size, -np.inf)
+    columns = id_positions(data.catalog_ids, pop_df["movieId"].to_numpy())
+    popularity[columns[columns >= 0]] = pop_df["bayesian_score"].to_numpy()[columns >= 0]
+    recommended = popularity_top_k(popularity, data.seen, max(k_values))
+    return ranking_metrics(recommended, data.relevant, k_values)
+
+
+def run_sweep(config: SweepConfig) -> pd.DataFrame:
+    """Evaluate the full grid and write one metrics table per configuration plus a summary."""
+
+    data = prepare(config)
+    k_values = tuple(sorted(set(config.k_values)))
+    grid = [
+        GridPoint(topk, threshold, smoothing)
+        for topk, threshold, smoothing in itertools.product(
+            config.topk_values, config.min_rating_values, config.smoothing_values
+        )
+    ]
+    item_cf_tasks: Dict[Tuple[float, int], object] = {}
+    popularity_tasks: Dict[Tuple[float, float], object] = {}
+    with ThreadPoolExecutor(max_workers=config.jobs) as pool:
+        for threshold in config.min_rating_values:
+            with time_block(f"item_similarity_r{threshold:g}"):
+                similarity, ids = item_similarity(data.train_df, threshold)
+                ordered = sort_rows_descending(similarity)
+                del similarity
+            liked = liked_histories(data, threshold)
+            for topk in config.topk_values:
+                item_cf_tasks[(threshold, topk)] = pool.submit(
+                    _item_cf_metrics, data, ordered, ids, liked, topk, k_values
+                )
+            for smoothing in config.smoothing_values:
+                popularity_tasks[(threshold, smoothing)] = pool.submit(
+                    _popularity_metrics, data, smoothing, threshold, k_values
+                )
+
+        output_dir = config.output_dir
+        output_dir.mkdir(parents=True, exist_ok=True)
+        summary_rows = []
+        for point in grid:
+            frames = {
+                "popularity": popularity_tasks[(point.min_rating_threshold, point.popularity_smoothing)].result(),
+                "item_cf": item_cf_tasks[(point.min_rating_threshold, point.topk_neighbors)].result(),
+            }
+            table = pd.concat(
+                [frame.assign(algorithm=algorithm) for algorithm, frame in frames.items()], ignore_index=True
+            )
+            table = table[["algorithm", *[column for column in table.columns if column != "algorithm"]]]
+            table.to_csv(output_dir / f"{point.name}.csv", index=False)
+            for algorithm, frame in frames.items():
+                row: Dict[str, object] = {
+                    "config": point.name,
+                    "topk_neighbors": point.topk_neighbors,
+                    "min_rating_threshold": point.min_rating_threshold,
+                    "popularity_smoothing": point.popularity_smoothing,
+                    "algorithm": algorithm,
+                }
+                for record in frame.to_dict("records"):
+                    for metric, value in record.items():
+                        if metric != "k":
+                            row[f"{metric}@{int(record['k'])}"] = value
+                summary_rows.append(row)
+
+    summary = pd.DataFrame(summary_rows)
+    summary.to_csv(output_dir / "sweep_summary.csv", index=False)
+    save_json(
+        {"grid": [point.name for point in grid], "k_values": list(k_values), "users": data.relevant.shape[0]},
+        output_dir / "sweep.json",
+    )
+    cutoff = 10 if 10 in k_values else k_values[-1]
+    best = summary.sort_values(f"ndcg@{cutoff}", ascending=False).groupby("algorithm").head(1)
+    logger.info("Best configurations by ndcg@%d:\n%s", cutoff, best[["algorithm", "config", f"ndcg@{cutoff}"]])
+    return summary
@@ -0,0 +1,230 @@
+"""
+Synthetic MovieLens-style ratings generator for scaling experiments.
+
+Writes ``ratings.csv`` and ``movies.csv`` in the MovieLens 32M CSV layout with
+power-law item popularity, skewed (log-normal) user activity, per-user rating
+biases and increasing timestamps per user. Generation is chunked by user so
+the 32M preset runs in bounded memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .logging_utils import setup_logging
+from .utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+GENRES = [
+    "Action",
+    "Adventure",
+    "Animation",
+    "Children",
+    "Comedy",
+    "Crime",
+    "Documentary",
+    "Drama",
+    "Fantasy",
+    "Film-Noir",
+    "Horror",
+    "Musical",
+    "Mystery",
+    "Romance",
+    "Sci-Fi",
+    "Thriller",
+    "War",
+    "Western",
+]
+
+MIN_RATINGS_PER_USER = 20
+START_TIMESTAMP = 789_652_009  # 1995-01-09, first MovieLens rating
+END_TIMESTAMP = 1_697_163_000  # 2023-10-13, last ML-32M rating
+
+
+@dataclass(frozen=True, slots=True)
+class SyntheticSpec:
+    """Shape of a generated dataset."""
+
+    ratings: int
+    users: int
+    movies: int
+    popularity_exponent: float = 1.0
+    activity_sigma: float = 1.1
+
+
+PRESETS: Dict[str, SyntheticSpec] = {
+    "1M": SyntheticSpec(ratings=1_000_209, users=6_040, movies=3_706),
+    "10M": SyntheticSpec(ratings=10_000_054, users=69_878, movies=10_677),
+    "32M": SyntheticSpec(ratings=32_000_204, users=200_948, movies=84_432),
+}
+
+
+def _user_activity(rng: np.random.Generator, spec: SyntheticSpec) -> np.ndarray:
+    """Ratings per user: log-normal skew, at least 20 each, summing to ``spec.ratings``."""
+
+    budget = spec.ratings - MIN_RATINGS_PER_USER * spec.users
+    if budget < 0:
+        raise ValueError("Not enough ratings to give every user the minimum history.")
+    weights = rng.lognormal(0.0, spec.activity_sigma, size=spec.users)
+    extra = np.floor(weights / weights.sum() * budget).astype(np.int64)
+    extra[rng.choice(spec.users, size=budget - int(extra.sum()), replace=False)] += 1
+    counts = MIN_RATINGS_PER_USER + extra
+    # A user cannot rate more distinct titles than exist; spill the excess elsewhere.
+    cap = int(spec.movies * 0.8)
+    overflow = int(np.clip(counts - cap, 0, None).sum())
+    counts = np.minimum(counts, cap)
+    while overflow:
+        room = np.flatnonzero(counts < cap)
+        take = rng.choice(room, size=min(overflow, room.size), replace=False)
+        counts[take] += 1
+        overflow -= take.size
+    return counts
+
+
+def _sample_user_items(
+    rng: np.random.Generator,
+    counts: np.ndarray,
+    cdf: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Draw distinct items per user from the popularity distribution.
+
+    Sampling with replacement and deduplicating is far cheaper than a
+    per-user ``choice(replace=False)``. A few such rounds fill almost every
+    quota; the heavy users still short (they need long-tail titles that are
+    rarely drawn) are finished with an exact Gumbel top-k draw over the
+    titles they do not have yet.
+    """
+
+    n_users, n_items = counts.size, cdf.size
+    owners = np.empty(0, dtype=np.int64)
+    items = np.empty(0, dtype=np.int64)
+    missing = counts.copy()
+    for _ in range(4):
+        if not missing.any():
+            break
+        oversample = np.where(missing > 0, missing + missing // 4 + 2, 0)
+        draw_owners = np.repeat(np.arange(n_users), oversample)
+        draw_items = np.minimum(np.searchsorted(cdf, rng.random(draw_owners.size), side="right"), n_items - 1)
+        keys = np.unique(np.concatenate([owners * n_items + items, draw_owners * n_items + draw_items]))
+        owners, items = keys // n_items, keys % n_items
+        # Drop a random surplus so every user ends with at most their quota.
+        have = np.bincount(owners, minlength=n_users)
+        order = np.lexsort((rng.random(owners.size), owners))
+        owners, items = owners[order], items[order]
+        rank = np.arange(owners.size) - (np.cumsum(have) - have)[owners]
+        keep = rank < counts[owners]
+        owners, items = owners[keep], items[keep]
+        missing = counts - np.minimum(have, counts)
+
+    if missing.any():
+        log_weights = np.log(np.diff(cdf, prepend=0.0))
+        extra_owners, extra_items = [], []
+        for user in np.flatnonzero(missing):
+            keys = log_weights + rng.gumbel(size=n_items)
+            keys[items[owners == user]] = -np.inf
+            chosen = np.argpartition(-keys, missing[user] - 1)[: missing[user]]
+            extra_owners.append(np.full(chosen.size, user))
+            extra_items.append(chosen)
+        owners = np.concatenate([owners, *extra_owners])
+        items = np.concatenate([items, *extra_items])
+    return owners, items
+
+
+def _write_movies(rng: np.random.Generator, spec: SyntheticSpec, path: Path) -> np.ndarray:
+    movie_ids = np.sort(rng.choice(int(spec.movies * 3.5), size=spec.movies, replace=False) + 1)
+    years = rng.integers(1902, 2024, size=spec.movies)
+    genres = [
+        "|".join(rng.choice(GENRES, size=int(rng.integers(1, 4)), replace=False))
+        for _ in range(spec.movies)
+    ]
+    movies = pd.DataFrame(
+        {
+            "movieId": movie_ids,
+            "title": [f"Synthetic Movie {mid} ({year})" for mid, year in zip(movie_ids, years)],
+            "genres": genres,
+        }
+    )
+    ensure_dir(path)
+    movies.to_csv(path, index=False)
+    logger.info("Wrote %d movies to %s", len(movies), path)
+    return movie_ids
+
+
+def generate_dataset(
+    spec: SyntheticSpec,
+    output_dir: Path,
+    seed: int = 42,
+    users_per_chunk: int = 20_000,
+) -> Dict[str, Path]:
+    """Write ``movies.csv`` and ``ratings.csv`` for ``spec`` into ``output_dir``."""
+
+    rng = np.random.default_rng(seed)
+    movies_path = output_dir / "movies.csv"
+    ratings_path = output_dir / "ratings.csv"
+    movie_ids = _write_movies(rng, spec, movies_path)
+
+    # Zipf-like popularity over a shuffled catalog, plus a latent quality per title.
+    popularity = 1.0 / np.arange(1, spec.movies + 1) ** spec.popularity_exponent
+    popularity = popularity[rng.permutation(spec.movies)]
+    cdf = np.cumsum(popularity / popularity.sum())
+    quality = rng.normal(3.5, 0.45, size=spec.movies) + 0.25 * (popularity / popularity.max()) ** 0.25
+
+    counts = _user_activity(rng, spec)
+    user_bias = rng.normal(0.0, 0.4, size=spec.users)
+    first_seen = rng.integers(START_TIMESTAMP, END_TIMESTAMP - 86_400, size=spec.users)
+    span = np.minimum(rng.exponential(86_400 * 120, size=spec.users), END_TIMESTAMP - first_seen)
+
+    ensure_dir(ratings_path)
+    written = 0
+    for start in range(0, spec.users, users_per_chunk):
+        stop = min(start + users_per_chunk, spec.users)
+        owners, items = _sample_user_items(rng, counts[start:stop], cdf)
+        owners += start
+        raw = quality[items] + user_bias[owners] + rng.normal(0.0, 0.8, size=items.size)
+        ratings = np.clip(np.round(raw * 2) / 2, 0.5, 5.0)
+        timestamps = first_seen[owners] + (rng.random(items.size) * span[owners]).astype(np.int64)
+        chunk = pd.DataFrame(
+            {
+                "userId": owners + 1,
+                "movieId": movie_ids[items],
+                "rating": ratings,
+                "timestamp": timestamps,
+            }
+        ).sort_values(["userId", "timestamp"], kind="stable")
+        chunk.to_csv(ratings_path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+        written += len(chunk)
+        logger.info("Wrote %d/%d ratings", written, spec.ratings)
+    return {"ratings": ratings_path, "movies": movies_path}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate synthetic MovieLens-style datasets.")
+    parser.add_argument("--size", choices=sorted(PRESETS), default="1M", help="Dataset preset.")
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Logging verbosity.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    setup_logging(getattr(logging, args.log_level))
+    generate_dataset(PRESETS[args.size], args.output_dir, seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
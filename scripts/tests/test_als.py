@@ -0,0 +1,77 @@
+"""
+Tests for implicit ALS training and its factor export.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts.als import _conjugate_gradient_block, train_als
+from scripts.config import ArtifactConfig, DatasetConfig, PipelineConfig
+from scripts.data_pipeline import export_als_factors
+
+
+def _two_communities(seed=0):
+    """Even users rate only even movies and odd users only odd ones; ids are unsorted and sparse."""
+
+    rng = np.random.default_rng(seed)
+    rows = []
+    for user in rng.permutation(np.arange(40)) * 3 + 7:
+        movies = rng.choice(np.arange(user % 2, 60, 2), size=12, replace=False) * 5 + 100
+        rows += [(user, movie, float(rng.integers(1, 6))) for movie in movies]
+    return pd.DataFrame(rows, columns=["userId", "movieId", "rating"])
+
+
+def test_conjugate_gradient_reaches_the_exact_least_squares_solution():
+    """Enough steps solve ``(F^T C_u F + lambda I) x_u = F^T C_u p_u`` for every row."""
+
+    rng = np.random.default_rng(1)
+    fixed = rng.standard_normal((30, 4))
+    confidence = sparse.random(6, 30, density=0.3, random_state=2, format="csr") * 5
+    gram = fixed.T @ fixed + 0.1 * np.eye(4)
+    solved = _conjugate_gradient_block(confidence, fixed, gram, np.zeros((6, 4)), steps=20)
+
+    for u in range(6):
+        weights = confidence[u].toarray().ravel()
+        lhs = gram + fixed.T @ (weights[:, None] * fixed)
+        rhs = fixed.T @ ((1 + weights) * (weights > 0))
+        assert np.allclose(solved[u], np.linalg.solve(lhs, rhs), atol=1e-6)
+
+
+def test_trained_factors_rank_the_users_community_first():
+    """With rank-two factors every user scores their own community's movies above the other one's."""
+
+    ratings = _two_communities()
+    model = train_als(ratings, factors=2, regularization=0.1, iterations=10, threads=1)
+    scores = model["user_factors"] @ model["item_factors"].T
+    own = (model["user_ids"][:, None] % 2) == (model["movie_ids"][None, :] % 2)
+
+    worst_own = np.where(own, scores, np.inf).min(axis=1)
+    assert np.all(worst_own > np.where(own, -np.inf, scores).max(axis=1))
+
+
+def test_exported_factors_round_trip_with_their_id_indexes(tmp_path):
+    """Saved factors reload unchanged, row-aligned with sorted ``int32`` id indexes."""
+
+    ratings = _two_communities()
+    model = train_als(ratings, factors=4, iterations=2, threads=1)
+    config = PipelineConfig(
+        dataset=DatasetConfig(ratings_path=tmp_path / "ratings.csv", movies_path=tmp_path / "movies.csv"),
+        artifacts=ArtifactConfig(output_dir=tmp_path / "artifacts"),
+        als_factors=4,
+    )
+    export_als_factors(config, model)
+
+    artifacts = config.artifacts
+    user_factors = np.load(artifacts.als_user_factors_path)
+    item_factors = np.load(artifacts.als_item_factors_path)
+    user_index, item_index = np.load(artifacts.als_user_index_path), np.load(artifacts.als_item_index_path)
+    assert user_factors.dtype == item_factors.dtype == np.float32
+    assert user_index.dtype == item_index.dtype == np.int32
+    assert np.array_equal(user_index, np.sort(ratings["userId"].unique()))
+    assert np.array_equal(item_index, np.sort(ratings["movieId"].unique()))
+    assert user_factors.shape == (user_index.size, 4) and item_factors.shape == (item_index.size, 4)
+    assert np.array_equal(user_factors, model["user_factors"])
+    assert np.array_equal(item_factors, model["item_factors"])
@@ -0,0 +1,73 @@
+"""
+Tests for dependency-ordered and parallel stage execution.
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+import pytest
+
+from scripts.dag import SharedFrame, Stage, run_stages, topological_order
+
+
+def _ratings():
+    return pd.DataFrame({"userId": [1, 1, 2, 3], "movieId": [10, 20, 10, 30], "title": list("abcd")})
+
+
+def _counts(ratings):
+    return ratings.groupby("movieId").size().to_dict()
+
+
+def _users(ratings):
+    return int(ratings["userId"].nunique())
+
+
+def _summary(counts, users):
+    return {"items": len(counts), "users": users}
+
+
+def _stages():
+    return [
+        Stage("summary", _summary, inputs=("counts", "users"), outputs=("summary",)),
+        Stage("counts", _counts, inputs=("ratings",), outputs=("counts",)),
+        Stage("users", _users, inputs=("ratings",), outputs=("users",)),
+        Stage("ratings", _ratings, outputs=("ratings",), local=True),
+    ]
+
+
+def test_stages_run_in_dependency_order():
+    """Producers come first, ties keep the given order, and broken graphs are rejected."""
+
+    names = [stage.name for stage in topological_order(_stages())]
+    assert names == ["ratings", "counts", "users", "summary"]
+
+    with pytest.raises(ValueError, match="no stage produces"):
+        topological_order([Stage("orphan", _users, inputs=("missing",), outputs=("x",))])
+    with pytest.raises(ValueError, match="cycle"):
+        topological_order(
+            [Stage("a", _users, inputs=("y",), outputs=("x",)), Stage("b", _users, inputs=("x",), outputs=("y",))]
+        )
+
+
+def test_parallel_run_matches_sequential_run():
+    """A process pool with shared-memory frames produces the same values as one process."""
+
+    sequential = run_stages(_stages(), jobs=1)
+    parallel = run_stages(_stages(), jobs=2)
+
+    assert sequential["summary"] == parallel["summary"] == {"items": 3, "users": 3}
+    assert sequential["counts"] == parallel["counts"]
+
+
+def test_shared_frame_round_trips_columns():
+    """Numeric columns go through read-only shared memory; the rebuilt frame equals the original."""
+
+    frame = _ratings().set_index(pd.Index([5, 6, 7, 8]))
+    shared = SharedFrame(frame)
+    try:
+        attached = shared.attach()
+        pd.testing.assert_frame_equal(attached, frame, check_index_type=False)
+        assert not attached["userId"].to_numpy().flags.writeable
+        assert shared.nbytes >= frame["userId"].to_numpy().nbytes
+    finally:
+        shared.release()
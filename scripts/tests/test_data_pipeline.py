@@ -0,0 +1,34 @@
+"""
+Tests for the end-to-end offline pipeline run.
+"""
+
+from __future__ import annotations
+
+import json
+
+from scripts.config import ArtifactConfig, DatasetConfig, PipelineConfig
+from scripts.data_pipeline import pipeline_stages, run_pipeline
+from scripts.synthetic_data import SyntheticSpec, generate_dataset
+
+
+def test_run_report_records_resource_usage_per_stage(tmp_path):
+    """``profile_resources`` writes every stage's wall time and resource usage to ``run_report.json``."""
+
+    paths = generate_dataset(SyntheticSpec(ratings=2_000, users=40, movies=150), tmp_path / "raw", seed=1)
+    config = PipelineConfig(
+        dataset=DatasetConfig(ratings_path=paths["ratings"], movies_path=paths["movies"]),
+        artifacts=ArtifactConfig(output_dir=tmp_path / "artifacts"),
+        topk_neighbors=10,
+        profile_resources=True,
+        profile_dir=tmp_path / "profiles",
+    )
+    run_pipeline(config)
+
+    report = json.loads(config.artifacts.run_report_path.read_text())
+    assert report["config"]["topk_neighbors"] == 10 and report["reused_stages"] == []
+    stages = {stage["name"]: stage for stage in report["stages"]}
+    assert set(stages) == {stage.name for stage in pipeline_stages(config)}
+    for stage in stages.values():
+        assert stage["wall_seconds"] >= 0 and stage["cpu_seconds"] >= 0
+        assert stage["python_peak_mb"] >= 0 and "peak_rss_delta_mb" in stage
+        assert (tmp_path / "profiles" / f"{stage['name']}.prof").exists()
@@ -0,0 +1,81 @@
+"""
+Tests for EASE item pruning under a memory budget and the chunked closed form.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts import ease
+from scripts.ease import build_ease_neighbors, gram_matrix, max_items_for_budget, select_items
+
+
+def _ratings(seed=0):
+    rng = np.random.default_rng(seed)
+    users = rng.integers(0, 50, size=600)
+    movies = rng.zipf(1.5, size=600) % 40 + 1
+    ratings = rng.integers(1, 6, size=600).astype(float)
+    return pd.DataFrame({"userId": users, "movieId": movies, "rating": ratings})
+
+
+def test_budget_bounds_the_two_dense_matrices():
+    """The item limit is the largest count whose Gram matrix and inverse fit the budget."""
+
+    for budget_mb in (0.01, 1.0, 37.5):
+        limit = max_items_for_budget(budget_mb)
+        budget = budget_mb * 1024**2
+        assert 2 * 4 * limit**2 <= budget < 2 * 4 * (limit + 1) ** 2
+
+
+def test_selection_drops_rare_items_then_keeps_the_most_supported():
+    """``min_support`` applies first; the budget then keeps the best supported, ties by order."""
+
+    support = pd.Series([5, 1, 9, 5, 2, 7], index=[60, 50, 40, 30, 20, 10])
+    assert np.array_equal(select_items(support, 2, 1024.0), [10, 20, 30, 40, 60])
+
+    budget_mb = 2 * 4 * 3**2 / 1024**2
+    assert max_items_for_budget(budget_mb) == 3
+    # 60 and 30 tie on support; the first listed one is kept.
+    assert np.array_equal(select_items(support, 2, budget_mb), [10, 40, 60])
+
+
+def test_chunked_gram_matrix_matches_the_dense_product(monkeypatch):
+    """Filling ``X^T X`` in column blocks gives the same matrix as one product."""
+
+    interactions = sparse.random(30, 11, density=0.3, random_state=3, format="csr", dtype=np.float32)
+    monkeypatch.setattr(ease, "GRAM_CHUNK_ITEMS", 4)
+    dense = interactions.toarray()
+    assert np.allclose(gram_matrix(interactions), dense.T @ dense)
+
+
+def test_pruned_model_matches_the_closed_form_on_the_kept_items(monkeypatch):
+    """Under a tight budget only the most supported items are trained, with exact EASE weights."""
+
+    ratings = _ratings()
+    monkeypatch.setattr(ease, "GRAM_CHUNK_ITEMS", 3)
+    monkeypatch.setattr(ease, "TOPK_CHUNK_ROWS", 4)
+    budget_mb = 2 * 4 * 10**2 / 1024**2
+    model = build_ease_neighbors(ratings, k=4, min_rating=3.0, regularization=5.0, memory_budget_mb=budget_mb)
+
+    positive = ratings[ratings["rating"] >= 3.0]
+    support = positive.groupby("movieId")["userId"].nunique()
+    kept = np.sort(support.sort_values(ascending=False, kind="stable").index[:10].to_numpy())
+    assert np.array_equal(sorted(model["movie_index"]), kept)
+
+    positive = positive[positive["movieId"].isin(kept)]
+    dense = pd.crosstab(positive["userId"], positive["movieId"]).reindex(columns=kept).to_numpy() > 0
+    inverse = np.linalg.inv(dense.T.astype(float) @ dense + 5.0 * np.eye(kept.size))
+    weights = -inverse / np.diag(inverse)
+    np.fill_diagonal(weights, 0.0)
+
+    matrix = model["matrix"]
+    assert matrix.shape == (kept.size, kept.size)
+    for row in range(kept.size):
+        start, stop = matrix.indptr[row], matrix.indptr[row + 1]
+        cols, values = matrix.indices[start:stop], matrix.data[start:stop]
+        assert len(cols) <= 4 and np.all(values > 0)
+        assert np.allclose(values, weights[row, cols], rtol=1e-4, atol=1e-6)
+        expected = np.sort(weights[row])[::-1][: len(cols)]
+        assert np.allclose(np.sort(values)[::-1], expected, rtol=1e-4, atol=1e-6)
@@ -0,0 +1,28 @@
+"""
+Tests for the vectorized ranking metrics.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from scripts.evaluate import evaluate_model, ndcg_at_k, precision_at_k, recall_at_k
+
+
+def test_evaluate_model_matches_per_user_metrics_and_keeps_its_columns():
+    """Vectorized precision/recall/NDCG equal the per-user helpers; the frame layout is unchanged."""
+
+    rng = np.random.default_rng(0)
+    recommendations = {user: rng.choice(50, size=12, replace=False).tolist() for user in range(30)}
+    ground_truth = {user: rng.choice(50, size=rng.integers(1, 6), replace=False).tolist() for user in range(30)}
+    ground_truth[0] = []
+
+    result = evaluate_model(recommendations, ground_truth, k_values=(5, 10))
+
+    assert result.columns.tolist() == ["k", "precision", "recall", "ndcg"]
+    users = [user for user in recommendations if ground_truth[user]]
+    for row in result.to_dict("records"):
+        k = int(row["k"])
+        for name, metric in (("precision", precision_at_k), ("recall", recall_at_k), ("ndcg", ndcg_at_k)):
+            expected = np.mean([metric(recommendations[user], ground_truth[user], k) for user in users])
+            assert np.isclose(row[name], expected)
@@ -0,0 +1,68 @@
+"""
+Tests for vectorized top-k neighbor pruning.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from scipy import sparse
+
+from scripts.item_cf import head_per_row, keep_top_k, sort_rows_descending
+
+
+def _lil_top_k(matrix, k):
+    """The per-row pruning loop item-CF used before vectorization."""
+
+    matrix = matrix.tolil()
+    for i in range(matrix.shape[0]):
+        row = matrix.data[i]
+        if len(row) > k:
+            idx = np.argpartition(row, -k)[:-k]
+            matrix.rows[i] = [col for j, col in enumerate(matrix.rows[i]) if j not in idx]
+            matrix.data[i] = [value for j, value in enumerate(row) if j not in idx]
+    return matrix.tocsr()
+
+
+def _lil_top_k_with_ties(matrix, k):
+    """The content-based pruning loop, which keeps every value tied with the k-th."""
+
+    matrix = matrix.tolil()
+    for i in range(matrix.shape[0]):
+        row = matrix.data[i]
+        if len(row) > k:
+            cutoff = sorted(row, reverse=True)[k - 1]
+            keep = [idx for idx, value in enumerate(row) if value >= cutoff]
+            matrix.rows[i] = [matrix.rows[i][j] for j in keep]
+            matrix.data[i] = [matrix.data[i][j] for j in keep]
+    return matrix.tocsr()
+
+
+def _row_values(matrix):
+    matrix = sparse.csr_matrix(matrix)
+    bounds = zip(matrix.indptr[:-1], matrix.indptr[1:])
+    return [sorted(matrix.data[start:stop].tolist()) for start, stop in bounds]
+
+
+def test_keep_top_k_matches_the_lil_pruning():
+    """Without ties the same entries survive; with ties the kept values agree and ties can be kept."""
+
+    rng = np.random.default_rng(0)
+    distinct = sparse.random(60, 80, density=0.3, format="csr", random_state=rng)
+    tied = distinct.copy()
+    tied.data = rng.integers(1, 5, size=tied.nnz).astype(np.float64)
+
+    for k in (1, 5, 20, 100):
+        assert (keep_top_k(distinct, k) != _lil_top_k(distinct, k)).nnz == 0
+        pruned = keep_top_k(tied, k)
+        assert _row_values(pruned) == _row_values(_lil_top_k(tied, k))
+        assert np.diff(pruned.indptr).max() <= k and pruned.has_sorted_indices
+        assert (keep_top_k(tied, k, keep_ties=True) != _lil_top_k_with_ties(tied, k)).nnz == 0
+
+
+def test_head_per_row_slices_many_cutoffs_from_one_sort():
+    """Every cutoff taken from one sorted matrix equals pruning the original matrix."""
+
+    matrix = sparse.random(40, 40, density=0.4, format="csr", random_state=3)
+    ordered = sort_rows_descending(matrix)
+    for k in (3, 10, 40):
+        assert (head_per_row(ordered, k) != keep_top_k(matrix, k)).nnz == 0
@@ -0,0 +1,81 @@
+"""
+Tests for batch scoring in the offline evaluation.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from scripts import offline_eval
+from scripts.config import ArtifactConfig, DatasetConfig, EvaluationConfig
+from scripts.offline_eval import (
+    ScoringArtifacts,
+    UserShard,
+    id_positions,
+    load_test_users,
+    profile_matrix,
+    score_candidates,
+)
+
+
+def test_candidate_scores_equal_the_full_score_rows(monkeypatch):
+    """Sampled scoring returns the candidates' entries of ``profile @ similarity`` across blocks."""
+
+    rng = np.random.default_rng(5)
+    catalog_ids = np.arange(100, 400, dtype=np.int64)
+    item_ids = np.sort(rng.choice(catalog_ids, size=250, replace=False))
+    content_ids = catalog_ids[::2]
+    artifacts = ScoringArtifacts(
+        catalog_ids=catalog_ids,
+        popularity=rng.random(catalog_ids.size),
+        item_ids=item_ids,
+        item_similarity=sparse.random(250, 250, density=0.05, format="csr", random_state=1),
+        content_ids=content_ids,
+        content_similarity=sparse.random(150, 150, density=0.1, format="csr", random_state=2),
+    )
+    liked = [rng.choice(catalog_ids, size=rng.integers(0, 8), replace=False) for _ in range(40)]
+    watched = [np.union1d(items, rng.choice(catalog_ids, size=5, replace=False)) for items in liked]
+    candidates = rng.integers(0, catalog_ids.size, size=(40, 21))
+    monkeypatch.setattr(offline_eval, "CANDIDATE_BLOCK_CELLS", 2_000)
+
+    scores = score_candidates(artifacts, UserShard(liked, watched, candidates))
+
+    assert np.array_equal(scores["popularity"], artifacts.popularity[candidates])
+    seeds = [items if len(items) else seen for items, seen in zip(liked, watched)]
+    for name, ids, similarity in (
+        ("item_cf", item_ids, artifacts.item_similarity),
+        ("content", content_ids, artifacts.content_similarity),
+    ):
+        full = (profile_matrix(seeds, ids) @ similarity).toarray()
+        positions = id_positions(ids, catalog_ids[candidates])
+        expected = np.where(positions >= 0, np.take_along_axis(full, np.maximum(positions, 0), axis=1), 0.0)
+        assert np.allclose(scores[name], expected)
+
+
+def test_test_users_include_the_rating_event_log(tmp_path):
+    """The held-out interactions come from the same ratings plus events the build read."""
+
+    columns = ["userId", "movieId", "rating", "timestamp"]
+    pd.DataFrame([(1, 10, 4.0, 1), (1, 11, 3.0, 2), (2, 10, 5.0, 1)], columns=columns).to_csv(
+        tmp_path / "ratings.csv", index=False
+    )
+    pd.DataFrame([(1, 12, 5.0, 3)], columns=columns).to_csv(tmp_path / "events.csv", index=False)
+    pd.DataFrame({"movieId": [10, 11, 12], "title": ["a", "b", "c"], "genres": ["x", "x", "x"]}).to_csv(
+        tmp_path / "movies.csv", index=False
+    )
+    artifacts = ArtifactConfig(output_dir=tmp_path / "artifacts")
+    pd.DataFrame({"userId": [1, 2], "liked_items": [[10], []], "watched_items": [[10, 11], []]}).to_parquet(
+        artifacts.user_history_path
+    )
+    dataset = DatasetConfig(
+        ratings_path=tmp_path / "ratings.csv",
+        movies_path=tmp_path / "movies.csv",
+        events_path=tmp_path / "events.csv",
+    )
+
+    test_df, history = load_test_users(EvaluationConfig(artifacts=artifacts, dataset=dataset))
+
+    assert test_df[["userId", "movieId"]].values.tolist() == [[1, 12], [2, 10]]
+    assert history["userId"].tolist() == [1, 2]
@@ -0,0 +1,127 @@
+"""
+Tests for content-addressed reuse of pipeline stage outputs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sys
+
+from scripts.config import ArtifactConfig, DatasetConfig, PipelineConfig
+from scripts.dag import Stage, run_stages
+from scripts.data_pipeline import pipeline_stages, read_raw_data
+from scripts.stage_cache import StageCache, _file_digest
+
+
+def test_param_change_reruns_only_the_affected_stages(tmp_path):
+    """Unchanged stages are reused; a new parameter reruns its stage and everything downstream."""
+
+    calls = []
+    exported = []
+
+    def numbers(scale):
+        calls.append("numbers")
+        return list(range(4 * scale))
+
+    def offset():
+        calls.append("offset")
+        return 10
+
+    def total(values, base):
+        calls.append("total")
+        return sum(values) + base
+
+    def stages(scale):
+        return [
+            Stage("numbers", numbers, outputs=("values",), params={"scale": scale}),
+            Stage("offset", offset, outputs=("base",)),
+            Stage("total", total, inputs=("values", "base"), outputs=("total",)),
+            Stage("export", exported.append, inputs=("total",)),
+        ]
+
+    run_stages(stages(1), cache=StageCache(tmp_path))
+    assert calls == ["numbers", "offset", "total"] and exported == [16]
+
+    calls.clear()
+    cache = StageCache(tmp_path)
+    run_stages(stages(1), cache=cache)
+    assert calls == [] and exported == [16, 16] and cache.reused == ["total"]
+
+    calls.clear()
+    run_stages(stages(2), cache=StageCache(tmp_path))
+    assert calls == ["numbers", "total"] and exported[-1] == 38
+
+
+def test_only_the_latest_entry_per_stage_is_kept(tmp_path):
+    """Storing a stage under a new key deletes its older entries; other stages keep theirs."""
+
+    exported = []
+
+    def export(total, label):
+        exported.append((label, total))
+
+    def stages(scale):
+        return [
+            Stage("numbers", lambda scale: list(range(scale)), outputs=("values",), params={"scale": scale}),
+            Stage("total", sum, inputs=("values",), outputs=("total",)),
+            Stage("label", lambda: "sum", outputs=("label",)),
+            Stage("export", export, inputs=("total", "label")),
+        ]
+
+    for scale in (1, 2, 3):
+        run_stages(stages(scale), cache=StageCache(tmp_path))
+
+    cache = StageCache(tmp_path)
+    keys = cache.compute_keys(stages(3))
+    for name in ("numbers", "total", "label"):
+        assert [path.stem for path in (tmp_path / name).glob("*.pkl")] == [keys[name]]
+    run_stages(stages(3), cache=cache)
+    assert exported[-1] == ("sum", 3) and cache.reused == ["total", "label"]
+
+
+def test_editing_an_imported_module_changes_the_key(tmp_path, monkeypatch):
+    """A stage's key covers the package modules its own module imports."""
+
+    package = tmp_path / "cachepkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "helpers.py").write_text("def factor():\n    return 2\n")
+    (package / "stages.py").write_text("from .helpers import factor\n\n\ndef answer():\n    return factor() * 21\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    try:
+        from cachepkg.stages import answer
+
+        stage = Stage("answer", answer, outputs=("answer",))
+        before = StageCache(tmp_path / "cache").compute_keys([stage])["answer"]
+        (package / "helpers.py").write_text("def factor():\n    return 3  # changed\n")
+        after = StageCache(tmp_path / "cache").compute_keys([stage])["answer"]
+    finally:
+        for name in ("cachepkg", "cachepkg.helpers", "cachepkg.stages"):
+            sys.modules.pop(name, None)
+
+    assert before != after
+    path = package / "helpers.py"
+    stat = path.stat()
+    assert _file_digest(path, stat.st_size, stat.st_mtime_ns) == hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def test_pipeline_is_fingerprinted_before_any_event_is_logged(tmp_path):
+    """A configured but absent event log is keyed as missing, and the key changes once it appears."""
+
+    ratings, movies, events = tmp_path / "ratings.csv", tmp_path / "movies.csv", tmp_path / "events.csv"
+    ratings.write_text("userId,movieId,rating,timestamp\n1,10,4.0,1\n2,10,3.0,2\n")
+    movies.write_text("movieId,title,genres\n10,Heat (1995),Action\n")
+    config = PipelineConfig(
+        dataset=DatasetConfig(ratings_path=ratings, movies_path=movies, events_path=events),
+        artifacts=ArtifactConfig(output_dir=tmp_path / "artifacts"),
+    )
+    stages = pipeline_stages(config)
+
+    before = StageCache(tmp_path / "cache").compute_keys(stages)
+    ratings_df, _ = read_raw_data(config)
+    assert len(ratings_df) == 2
+
+    events.write_text("userId,movieId,rating,timestamp\n3,10,5.0,3\n")
+    after = StageCache(tmp_path / "cache").compute_keys(stages)
+    assert before["read_raw_data"] != after["read_raw_data"]
+    assert before["build_item_cf"] != after["build_item_cf"]
@@ -0,0 +1,42 @@
+"""
+Tests for the synthetic MovieLens-style ratings generator.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from scripts.synthetic_data import MIN_RATINGS_PER_USER, SyntheticSpec, generate_dataset
+
+SPEC = SyntheticSpec(ratings=3_000, users=60, movies=200)
+
+
+def test_generated_tables_have_the_requested_shape(tmp_path):
+    """Exactly ``spec.ratings`` distinct ratings over ``spec.users`` users and known movies."""
+
+    paths = generate_dataset(SPEC, tmp_path, seed=3, users_per_chunk=25)
+    ratings, movies = pd.read_csv(paths["ratings"]), pd.read_csv(paths["movies"])
+
+    assert list(ratings.columns) == ["userId", "movieId", "rating", "timestamp"]
+    assert list(movies.columns) == ["movieId", "title", "genres"]
+    assert len(ratings) == SPEC.ratings and len(movies) == SPEC.movies
+    assert movies["movieId"].is_unique and ratings["movieId"].isin(movies["movieId"]).all()
+    assert not ratings.duplicated(["userId", "movieId"]).any()
+    counts = ratings.groupby("userId").size()
+    assert counts.index.tolist() == list(range(1, SPEC.users + 1))
+    assert counts.min() >= MIN_RATINGS_PER_USER
+    assert ratings["rating"].between(0.5, 5.0).all() and np.all(ratings["rating"] * 2 % 1 == 0)
+    assert ratings.groupby("userId")["timestamp"].apply(lambda ts: ts.is_monotonic_increasing).all()
+
+
+def test_generation_is_deterministic_for_a_seed(tmp_path):
+    """The same seed writes byte-identical files; another seed does not."""
+
+    first = generate_dataset(SPEC, tmp_path / "a", seed=7)
+    again = generate_dataset(SPEC, tmp_path / "b", seed=7)
+    other = generate_dataset(SPEC, tmp_path / "c", seed=8)
+
+    for name in ("ratings", "movies"):
+        assert first[name].read_bytes() == again[name].read_bytes()
+        assert first[name].read_bytes() != other[name].read_bytes()
@@ -0,0 +1,33 @@
+"""
+Tests for stage timing and the run report.
+"""
+
+from __future__ import annotations
+
+import json
+
+from scripts.utils import RunReport, time_block
+
+
+def test_report_lists_every_stage_with_its_measurements(tmp_path):
+    """Timed blocks are written in order with wall time, and resource fields only when requested."""
+
+    report = RunReport(resources=True)
+    with time_block("allocate", report) as stats:
+        buffer = bytearray(4 * 1024**2)
+    with time_block("untracked"):
+        pass
+    plain = RunReport()
+    with time_block("allocate", plain):
+        del buffer
+
+    report.write(tmp_path / "run_report.json", extra={"config": {"jobs": 1}})
+    payload = json.loads((tmp_path / "run_report.json").read_text())
+
+    assert payload["config"] == {"jobs": 1} and payload["total_seconds"] >= 0
+    assert [stage["name"] for stage in payload["stages"]] == ["allocate"]
+    stage = payload["stages"][0]
+    assert stage["wall_seconds"] == stats.wall_seconds > 0
+    assert {"cpu_seconds", "peak_rss_delta_mb", "python_peak_mb"} <= stage.keys()
+    assert stage["python_peak_mb"] >= 4
+    assert set(plain.stages[0].as_dict()) == {"name", "wall_seconds"}
@@ -4,13 +4,19 @@ Utility helpers shared by the offline scripts.
 
 from __future__ import annotations
 
+import cProfile
 import json
 import logging
+import sys
 import time
+import tracemalloc
 from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Dict, Iterator, List, Optional
 
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -22,19 +28,110 @@ def ensure_dir(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
+@dataclass(slots=True)
+class StageStats:
+    """Measurements captured for one pipeline stage."""
+
+    name: str
+    wall_seconds: float = 0.0
+    cpu_seconds: Optional[float] = None
+    peak_rss_delta_mb: Optional[float] = None
+    python_peak_mb: Optional[float] = None
+    profile_path: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+@dataclass
+class RunReport:
+    """
+    Collects :class:`StageStats` for a pipeline run.
+
+    ``resources`` enables CPU time, peak RSS and ``tracemalloc`` allocation
+    peaks per stage (``tracemalloc`` noticeably slows allocation-heavy stages,
+    so it is opt-in). ``profile_dir`` additionally dumps a cProfile file per
+    stage that can be inspected with ``pstats`` or snakeviz.
+    """
+
+    resources: bool = False
+    profile_dir: Optional[Path] = None
+    stages: List[StageStats] = field(default_factory=list)
+    started_at: float = field(default_factory=time.time)
+
+    def add(self, stats: StageStats) -> None:
+        self.stages.append(stats)
+
+    def write(self, path: Path, extra: Optional[Dict[str, object]] = None) -> None:
+        """Persist the report as JSON, e.g. ``run_report.json`` next to the artifacts."""
+
+        payload: Dict[str, object] = {
+            "started_at": datetime.fromtimestamp(self.started_at, tz=timezone.utc).isoformat(),
+            "total_seconds": round(time.time() - self.started_at, 3),
+            "stages": [stats.as_dict() for stats in self.stages],
+        }
+        payload.update(extra or {})
+        save_json(payload, path)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Process high-water RSS in MB, or ``None`` where ``resource`` is unavailable."""
+
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak / (1024**2) if sys.platform == "darwin" else peak / 1024
+
+
 @contextmanager
-def time_block(name: str) -> Iterator[None]:
+def time_block(name: str, report: Optional[RunReport] = None) -> Iterator[StageStats]:
     """
     Context manager to measure execution time.
 
-    Yields the elapsed seconds after the block finishes to allow the caller to
-    log the result or append it to a diagnostics table.
+    Yields a :class:`StageStats` whose fields are filled in once the block
+    finishes, so callers can log the result or append it to a diagnostics
+    table. When a ``report`` is given the stats are recorded on it, with
+    resource usage and profiles captured as the report requests.
     """
 
+    stats = StageStats(name=name)
+    resources = report is not None and report.resources
+    profiler = None
+    if resources:
+        cpu_start = time.process_time()
+        rss_start = _peak_rss_mb()
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    if report is not None and report.profile_dir is not None:
+        profiler = cProfile.Profile()
+        profiler.enable()
     start = time.perf_counter()
-    yield
-    elapsed = time.perf_counter() - start
-    logger.info("Stage %s completed in %.2fs", name, elapsed)
+    try:
+        yield stats
+    finally:
+        stats.wall_seconds = time.perf_counter() - start
+        if profiler is not None:
+            profiler.disable()
+            profile_path = report.profile_dir / f"{name}.prof"
+            ensure_dir(profile_path)
+            profiler.dump_stats(profile_path)
+            stats.profile_path = str(profile_path)
+        if resources:
+            stats.cpu_seconds = time.process_time() - cpu_start
+            rss_end = _peak_rss_mb()
+            if rss_start is not None and rss_end is not None:
+                stats.peak_rss_delta_mb = rss_end - rss_start
+            stats.python_peak_mb = tracemalloc.get_traced_memory()[1] / (1024**2)
+            if not tracing:
+                tracemalloc.stop()
+        if report is not None:
+            report.add(stats)
+        logger.info("Stage %s completed in %.2fs", name, stats.wall_seconds)
 
 
 def read_table(path: Path, column_names: Optional[List[str]] = None) -> pd.DataFrame:
@@ -54,6 +151,9 @@ def read_table(path: Path, column_names: Optional[List[str]] = None) -> pd.DataF
     if path.suffix == ".dat":
         header = None
         sep = "::"
+    elif path.suffix == ".csv":
+        # Plain CSV (MovieLens 20M/32M) can use the much faster C parser.
+        return _apply_column_names(pd.read_csv(path, encoding="latin-1"), column_names)
     try:
         df = pd.read_csv(
             path,
@@ -70,6 +170,10 @@ def read_table(path: Path, column_names: Optional[List[str]] = None) -> pd.DataF
             header=header,
             encoding="latin-1",
         )
+    return _apply_column_names(df, column_names)
+
+
+def _apply_column_names(df: pd.DataFrame, column_names: Optional[List[str]]) -> pd.DataFrame:
     if column_names and len(df.columns) == len(column_names):
         df.columns = column_names
     return df
@@ -116,3 +220,19 @@ def save_json(payload: Dict[str, object], path: Path) -> None:
     logger.info("Writing JSON: %s", path)
     with path.open("w", encoding="utf-8") as fp:
         json.dump(payload, fp, indent=2)
+
+
+def save_id_index(index_movie: Dict[int, int], path: Path) -> None:
+    """
+    Write a row -> movie id mapping as a sorted ``int32`` array.
+
+    The array position is the matrix row, so the API can resolve movie ids
+    with a binary search instead of rebuilding dictionaries at startup.
+    """
+
+    ids = np.asarray([index_movie[row] for row in range(len(index_movie))], dtype=np.int32)
+    if ids.size > 1 and np.any(np.diff(ids) <= 0):
+        raise ValueError(f"Id index for {path} must be strictly increasing.")
+    ensure_dir(path)
+    logger.info("Writing id index: %s", path)
+    np.save(path, ids)